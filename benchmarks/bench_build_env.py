@@ -0,0 +1,67 @@
+"""Benchmark cold vs. warm config.build_env latency.
+
+Usage: python benchmarks/bench_build_env.py [iterations]
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from xtp import config, toml_writer  # noqa: E402
+
+
+def _setup(root: Path) -> str:
+    config.CONFIG_DIR = root
+    config.PROFILES_DIR = root / "profiles"
+    config.GLOBAL_CONFIG = root / "config.toml"
+
+    name = "bench"
+    pdir = config.profile_dir(name)
+    pdir.mkdir(parents=True)
+    data = {
+        "profile": {"description": "Benchmark profile"},
+        "git": {
+            "author_name": "Bench Mark",
+            "author_email": "bench@example.com",
+            "ssh_key": "~/.ssh/id_ed25519_bench",
+        },
+        "chrome": {"profile_directory": "Profile 1"},
+        "aws": {"profile": "bench-dev"},
+        "npm": {"isolate": True},
+        "env": {f"BENCH_VAR_{i}": f"~/bench/{i}" for i in range(50)},
+    }
+    toml = config.profile_toml(name)
+    toml.write_text(toml_writer.dumps(data))
+    # Age the file so the warm path trusts its stat key.
+    st = toml.stat()
+    os.utime(toml, ns=(st.st_atime_ns, st.st_mtime_ns - 10_000_000_000))
+    return name
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    with tempfile.TemporaryDirectory() as tmp:
+        name = _setup(Path(tmp))
+        cache = config.env_cache_path(name)
+
+        def cold() -> None:
+            cache.unlink(missing_ok=True)
+            config.build_env(name)
+
+        def warm() -> None:
+            config.build_env(name)
+
+        for label, fn in (("cold", cold), ("warm", warm)):
+            fn()
+            total = timeit.timeit(fn, number=iterations)
+            print(f"{label:>5}: {total / iterations * 1e6:8.1f} us/call  ({iterations} calls)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Benchmark per-query latency with and without `xtp daemon`.
+
+Measures the query alone (in-process client call vs. loading directly)
+and the whole `xtp` invocation a prompt hook pays for, interpreter
+startup included.
+
+Usage: python benchmarks/bench_daemon.py [iterations]   (default: 200)
+"""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SRC = str(Path(__file__).resolve().parent.parent / "src")
+sys.path.insert(0, SRC)
+
+from xtp import config, daemon, toml_writer  # noqa: E402
+from xtp.commands import env as env_cmd  # noqa: E402
+from xtp.commands import list as list_cmd  # noqa: E402
+
+QUERIES = {
+    "list": (["list"], {"command": "list"}, list_cmd.run),
+    "env --export": (
+        ["env", "bench", "--export", "--shell", "zsh"],
+        {"command": "env", "name": "bench", "export": True, "shell": "zsh"},
+        lambda: env_cmd.run("bench", export=True, shell="zsh"),
+    ),
+}
+
+
+def _setup(home: Path) -> None:
+    config.CONFIG_DIR = home / ".config" / "xtp"
+    config.PROFILES_DIR = config.CONFIG_DIR / "profiles"
+    config.GLOBAL_CONFIG = config.CONFIG_DIR / "config.toml"
+    daemon.SOCKET = str(config.CONFIG_DIR / daemon.SOCKET_NAME)
+
+    old = time.time_ns() - 60_000_000_000
+    for i in range(50):
+        name = "bench" if i == 0 else f"client-{i:02d}"
+        pdir = config.profile_dir(name)
+        pdir.mkdir(parents=True)
+        toml = config.profile_toml(name)
+        toml.write_text(toml_writer.dumps({
+            "profile": {"description": f"Client {i}"},
+            "git": {"author_name": "Bench", "author_email": f"bench@client{i}.com"},
+            "env": {f"VAR_{j}": str(j) for j in range(20)},
+        }))
+        os.utime(toml, ns=(old, old))
+    os.utime(config.PROFILES_DIR, ns=(old, old))
+
+
+def _per_query(fn, iterations: int) -> float:
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn()  # warm caches
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def _per_process(argv: list[str], env: dict[str, str], runs: int = 15) -> float:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "xtp", *argv], env=env,
+                       stdout=subprocess.DEVNULL, check=True)
+        times.append(time.perf_counter() - start)
+    return sorted(times)[len(times) // 2] * 1000
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    with tempfile.TemporaryDirectory() as tmp:
+        home = Path(tmp)
+        _setup(home)
+        env = {**os.environ, "HOME": tmp, "PYTHONPATH": SRC, "SHELL": "/bin/zsh"}
+
+        direct = {label: _per_query(fn, iterations) for label, (_, _, fn) in QUERIES.items()}
+        direct_proc = {label: _per_process(argv, env) for label, (argv, _, _) in QUERIES.items()}
+
+        server = subprocess.Popen([sys.executable, "-m", "xtp", "daemon"], env=env,
+                                  stdout=subprocess.PIPE, text=True)
+        try:
+            server.stdout.readline()  # "listening on ..."
+            via = {
+                label: _per_query(lambda r=request: daemon.query(r), iterations)
+                for label, (_, request, _) in QUERIES.items()
+            }
+            via_proc = {label: _per_process(argv, env) for label, (argv, _, _) in QUERIES.items()}
+        finally:
+            daemon.query({"command": "stop"})
+            server.wait(timeout=5)
+
+    for label in QUERIES:
+        print(
+            f"{label:>13}: query direct {direct[label]:7.0f} us | daemon {via[label]:7.0f} us"
+            f"  ||  xtp process direct {direct_proc[label]:6.1f} ms | daemon {via_proc[label]:6.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
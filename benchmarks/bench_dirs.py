@@ -0,0 +1,41 @@
+"""Benchmark directory → profile resolution with the component trie.
+
+Usage: python benchmarks/bench_dirs.py [prefixes]   (default: 1000)
+"""
+
+from __future__ import annotations
+
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from xtp import directories  # noqa: E402
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    mapping = {f"/home/me/work/client-{i:04d}": f"client-{i:04d}" for i in range(count)}
+    mapping.update({f"/home/me/work/client-{i:04d}/oss": "personal" for i in range(0, count, 10)})
+    trie = directories.compile_trie(mapping)
+
+    deep = "/home/me/work/client-0500/services/api/src/handlers/v2/internal"
+    miss = "/usr/local/share/doc/some/deep/path/that/is/not/mapped"
+    linear = sorted(mapping, key=len, reverse=True)
+
+    def scan() -> str | None:
+        return next((mapping[p] for p in linear if deep == p or deep.startswith(p + "/")), None)
+
+    for label, fn in (
+        ("trie, deep hit", lambda: directories.resolve(trie, deep)),
+        ("trie, miss", lambda: directories.resolve(trie, miss)),
+        ("linear scan, deep hit", scan),
+    ):
+        runs = 20_000
+        per = min(timeit.repeat(fn, number=runs, repeat=5)) / runs * 1e6
+        print(f"{len(mapping):>5} prefixes  {label:<22} {per:7.2f} us")
+
+
+if __name__ == "__main__":
+    main()
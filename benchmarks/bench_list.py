@@ -0,0 +1,73 @@
+"""Benchmark `xtp list` lookups: parsing every profile.toml vs. the profile index.
+
+Usage: python benchmarks/bench_list.py [count ...]   (default: 1000 10000)
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from xtp import config, index, toml_writer  # noqa: E402
+
+
+def _setup(root: Path, count: int) -> None:
+    config.CONFIG_DIR = root
+    config.PROFILES_DIR = root / "profiles"
+    config.GLOBAL_CONFIG = root / "config.toml"
+    config.PROFILES_DIR.mkdir(parents=True)
+
+    old = time.time_ns() - 60_000_000_000
+    for i in range(count):
+        name = f"client-{i:05d}"
+        pdir = config.profile_dir(name)
+        pdir.mkdir()
+        toml = config.profile_toml(name)
+        toml.write_text(toml_writer.dumps({
+            "profile": {"description": f"Client {i}"},
+            "git": {"author_name": "Bench", "author_email": f"bench@client{i}.com"},
+            "aws": {"profile": f"client-{i}"},
+        }))
+        os.utime(toml, ns=(old, old))
+    os.utime(config.PROFILES_DIR, ns=(old, old))
+
+
+def _parse_all() -> list[tuple[str, str]]:
+    """The pre-index implementation: stat every dir, parse every toml."""
+    names = sorted(
+        d.name for d in config.PROFILES_DIR.iterdir()
+        if d.is_dir() and (d / "profile.toml").is_file()
+    )
+    return [
+        (name, config.load_profile(name).get("profile", {}).get("description", ""))
+        for name in names
+    ]
+
+
+def _timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def main() -> None:
+    counts = [int(a) for a in sys.argv[1:]] or [1000, 10000]
+    for count in counts:
+        with tempfile.TemporaryDirectory() as tmp:
+            _setup(Path(tmp), count)
+            parse = _timed(_parse_all)
+            cold = _timed(index.load)
+            warm = min(_timed(index.load) for _ in range(5))
+            print(
+                f"{count:>6} profiles: parse-all {parse:8.1f} ms | "
+                f"index cold {cold:8.1f} ms | index warm {warm:7.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
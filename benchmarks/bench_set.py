@@ -0,0 +1,62 @@
+"""Benchmark `xtp set --all`: planning and applying one change to many profiles.
+
+Usage: python benchmarks/bench_set.py [count ...]   (default: 100 500 1000)
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from xtp import bulk, config, index, toml_writer  # noqa: E402
+
+
+def _setup(root: Path, count: int) -> None:
+    config.CONFIG_DIR = root
+    config.PROFILES_DIR = root / "profiles"
+    config.GLOBAL_CONFIG = root / "config.toml"
+    config.PROFILES_DIR.mkdir(parents=True)
+    for i in range(count):
+        name = f"client-{i:05d}"
+        config.profile_dir(name).mkdir()
+        config.profile_toml(name).write_text("# client config\n" + toml_writer.dumps({
+            "profile": {"description": f"Client {i}"},
+            "git": {"author_name": "Bench", "author_email": f"bench@client{i}.com"},
+            "aws": {"profile": f"client-{i}"},
+            "env": {f"VAR_{k}": str(k) for k in range(20)},
+        }))
+        # Real profiles aren't written moments before `xtp set`: age them
+        # past the racy window so apply() can trust their stat keys.
+        os.utime(config.profile_toml(name), (1_000_000_000, 1_000_000_000))
+    index.load()
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main() -> None:
+    counts = [int(a) for a in sys.argv[1:]] or [100, 500, 1000]
+    for count in counts:
+        with tempfile.TemporaryDirectory() as tmp:
+            _setup(Path(tmp), count)
+            names = config.list_profiles()
+            (changes, _), planned = _timed(
+                lambda: bulk.plan(names, ["git.author_name=Renamed", "env.NEW=1"])
+            )
+            _, applied = _timed(lambda: bulk.apply(changes))
+            print(
+                f"{count:>5} profiles: plan {planned:7.1f} ms | apply {applied:7.1f} ms | "
+                f"total {planned + applied:7.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Benchmark saving one changed key: re-serializing with dumps() vs. patch().
+
+Usage: python benchmarks/bench_toml_writer.py [env keys ...]   (default: 100 1000 10000)
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+import tomllib
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from xtp import toml_writer  # noqa: E402
+
+
+def _timed(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    counts = [int(a) for a in sys.argv[1:]] or [100, 1000, 10000]
+    for count in counts:
+        data = {
+            "profile": {"description": "Bench"},
+            "git": {"author_name": "Bench", "author_email": "bench@example.com"},
+            "env": {f"VAR_{i}": f"value-{i}" for i in range(count)},
+        }
+        text = "# hand-edited\n" + toml_writer.dumps(data)
+        changed = tomllib.loads(text)
+        changed["env"][f"VAR_{count // 2}"] = "changed"
+        changed["env"]["ADDED"] = "new"
+
+        parse = _timed(lambda: tomllib.loads(text))
+        dumps = _timed(lambda: toml_writer.dumps(changed))
+        patch = _timed(lambda: toml_writer.patch(text, changed))
+        kept = len(set(text.splitlines()) & set(toml_writer.patch(text, changed).splitlines()))
+        print(
+            f"{count:>6} env keys: tomllib.loads {parse:7.2f} ms | dumps {dumps:7.2f} ms | "
+            f"patch {patch:7.2f} ms | lines kept {kept}/{len(text.splitlines())}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""Shell activation scripts: eval-able exports and cached activate.<shell> files."""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Mapping
+from pathlib import Path
+
+from xtp import config
+
+SHELLS = ("zsh", "bash", "fish")
+
+# Variables removed on activation so they can't leak across profiles
+CLEARED_VARS = ("GITHUB_TOKEN",)
+
+# Space-separated names of the variables the active profile set, so the
+# next activation can unset the ones the new profile doesn't define
+KEYS_VAR = "XTP_ENV_KEYS"
+
+# SAVED_PREFIX + name holds the value a variable had before the active
+# profile overrode it (say the user's own EDITOR or PATH); switching away
+# puts it back instead of unsetting it.
+SAVED_PREFIX = "XTP_SAVED_"
+
+
+def _valid_name(key: str) -> bool:
+    """True for portable shell variable names ([A-Za-z_][A-Za-z0-9_]*)."""
+    return key.isascii() and key.isidentifier()
+
+
+def default_shell(environ: Mapping[str, str] = os.environ) -> str:
+    """Return the user's shell if supported, else zsh."""
+    shell = Path(environ.get("SHELL", "")).name
+    return shell if shell in SHELLS else "zsh"
+
+
+def script_path(name: str, shell: str) -> Path:
+    return config.profile_dir(name) / f"activate.{shell}"
+
+
+def quote(value: str, shell: str) -> str:
+    """Quote *value* as a single-quoted word for *shell*."""
+    if shell == "fish":
+        return "'" + value.replace("\\", "\\\\").replace("'", "\\'") + "'"
+    return "'" + value.replace("'", "'\\''") + "'"
+
+
+def export_line(key: str, value: str, shell: str) -> str:
+    if shell == "fish":
+        return f"set -gx {key} {quote(value, shell)}"
+    return f"export {key}={quote(value, shell)}"
+
+
+def unset_line(key: str, shell: str) -> str:
+    if shell == "fish":
+        return f"set -e {key}"
+    return f"unset {key}"
+
+
+def with_keys(env: dict[str, str]) -> dict[str, str]:
+    """Return *env* plus the KEYS_VAR entry recording its variable names."""
+    names = sorted(key for key in env if _valid_name(key))
+    return {**env, KEYS_VAR: " ".join(names)}
+
+
+def active_keys(environ: dict[str, str]) -> list[str]:
+    """Return the variables set by the profile active in *environ*.
+
+    Uses KEYS_VAR when present; otherwise rebuilds the active profile's env.
+    """
+    keys = environ.get(KEYS_VAR)
+    if keys is not None:
+        return [*keys.split(), KEYS_VAR]
+    current = environ.get("XTP_PROFILE")
+    if not current:
+        return []
+    try:
+        return list(config.build_env(current))
+    except FileNotFoundError:
+        return []
+
+
+def _savable(key: str) -> bool:
+    """True if *key*'s value from before activation is kept for restoring."""
+    return _valid_name(key) and not key.startswith("XTP_") and key not in CLEARED_VARS
+
+
+def strip_active(environ: dict[str, str]) -> dict[str, str]:
+    """Return a copy of *environ* as it was before the active profile.
+
+    The active profile's variables go back to their saved values, or are
+    removed if they didn't exist before; CLEARED_VARS are removed too.
+    """
+    active = set(active_keys(environ))
+    result = {
+        k: v for k, v in environ.items()
+        if k not in active and k not in CLEARED_VARS and not k.startswith(SAVED_PREFIX)
+    }
+    for key in active:
+        saved = environ.get(SAVED_PREFIX + key)
+        if saved is not None:
+            result[key] = saved
+    return result
+
+
+def switched(environ: dict[str, str], env: dict[str, str]) -> dict[str, str]:
+    """Return *environ* with profile *env* activated in place of the active one.
+
+    Variables *env* overrides keep their pre-activation value under
+    SAVED_PREFIX, so the next switch can restore them.
+    """
+    result = strip_active(environ)
+    target = with_keys(env)
+    for key in target:
+        if key in result and _savable(key):
+            result[SAVED_PREFIX + key] = result[key]
+    result.update(target)
+    return result
+
+
+def diff(environ: dict[str, str], env: dict[str, str]) -> tuple[list[str], dict[str, str]]:
+    """Return (names to unset, names to export) to move *environ* to *env*."""
+    new = switched(environ, env)
+    unset = [key for key in environ if key not in new]
+    changed = {
+        key: value for key, value in new.items()
+        if _valid_name(key) and environ.get(key) != value
+    }
+    return unset, changed
+
+
+def render(env: dict[str, str], shell: str) -> str:
+    """Render an eval-able script that exports *env* in *shell*.
+
+    Variables left behind by a previously activated profile (listed in
+    KEYS_VAR) are restored from SAVED_PREFIX or unset first, and the
+    values this profile overrides are saved, so the script can be sourced
+    in place.
+    """
+    if shell not in SHELLS:
+        raise ValueError(f"Unsupported shell: {shell}")
+    target = with_keys(env)
+    own = target[KEYS_VAR]
+    saved = " ".join(key for key in own.split() if _savable(key))
+    if shell == "fish":
+        lines = [
+            f"for _xtp_k in (string split -n ' ' -- \"${KEYS_VAR}\")",
+            f"    contains -- $_xtp_k {own}; and continue",
+            f"    set -l _xtp_s {SAVED_PREFIX}$_xtp_k",
+            "    if set -q $_xtp_s",
+            "        set -gx $_xtp_k $$_xtp_s",
+            "        set -e $_xtp_s",
+            "    else",
+            "        set -e $_xtp_k",
+            "    end",
+            "end",
+        ]
+        if saved:
+            lines += [
+                f"for _xtp_k in {saved}",
+                f"    contains -- $_xtp_k (string split -n ' ' -- \"${KEYS_VAR}\"); and continue",
+                f"    set -l _xtp_s {SAVED_PREFIX}$_xtp_k",
+                "    if set -q $_xtp_k",
+                "        set -gx $_xtp_s $$_xtp_k",
+                "    else",
+                "        set -e $_xtp_s",
+                "    end",
+                "end",
+            ]
+    else:
+        split = f"${{={KEYS_VAR}}}" if shell == "zsh" else f"${KEYS_VAR}"
+        lines = [
+            f"for _xtp_k in {split}; do",
+            f'  case " {own} " in *" $_xtp_k "*) continue ;; esac',
+            f'  if eval "[ -n \\"\\${{{SAVED_PREFIX}$_xtp_k+x}}\\" ]"; then',
+            f'    eval "export $_xtp_k=\\"\\${SAVED_PREFIX}$_xtp_k\\""',
+            f'    unset "{SAVED_PREFIX}$_xtp_k"',
+            "  else",
+            '    unset "$_xtp_k"',
+            "  fi",
+            "done",
+        ]
+        if saved:
+            lines += [
+                f"for _xtp_k in {saved}; do",
+                f'  case " ${KEYS_VAR} " in *" $_xtp_k "*) continue ;; esac',
+                '  if eval "[ -n \\"\\${$_xtp_k+x}\\" ]"; then',
+                f'    eval "export {SAVED_PREFIX}$_xtp_k=\\"\\$$_xtp_k\\""',
+                "  else",
+                f'    unset "{SAVED_PREFIX}$_xtp_k"',
+                "  fi",
+                "done",
+            ]
+    lines.append(unset_line("_xtp_k", shell))
+    lines += [unset_line(key, shell) for key in CLEARED_VARS]
+    for key, value in target.items():
+        if not _valid_name(key):
+            lines.append(f"# skipped invalid variable name: {key!r}")
+            continue
+        lines.append(export_line(key, value, shell))
+    lines.append("")
+    return "\n".join(lines)
+
+
+def render_switch(environ: dict[str, str], env: dict[str, str], shell: str) -> str:
+    """Render only the unset/export lines needed to move *environ* to *env*."""
+    if shell not in SHELLS:
+        raise ValueError(f"Unsupported shell: {shell}")
+    unset, changed = diff(environ, env)
+    lines = [unset_line(key, shell) for key in unset]
+    lines += [export_line(key, value, shell) for key, value in changed.items()]
+    lines.append("")
+    return "\n".join(lines)
+
+
+def render_file(name: str, env: dict[str, str], shell: str) -> str:
+    """Render the cached activate.<shell> file for a profile.
+
+    The file re-checks profile.toml on every source and falls back to
+    ``xtp env --export`` (which regenerates it) when the toml is newer.
+    """
+    toml = quote(str(config.profile_toml(name)), shell)
+    script = quote(str(script_path(name, shell)), shell)
+    body = render(env, shell).rstrip("\n").splitlines()
+    header = [
+        f"# Auto-generated by xtp for profile: {name}",
+        f"# Source this file to activate the profile in the current {shell} shell.",
+    ]
+    if shell == "fish":
+        lines = [
+            *header,
+            f"if test {toml} -nt {script}",
+            f"    xtp env {quote(name, shell)} --export --shell fish | source",
+            "else",
+            *(f"    {line}" for line in body),
+            "end",
+        ]
+    else:
+        lines = [
+            *header,
+            f"if [ {toml} -nt {script} ]; then",
+            f'  eval "$(xtp env {quote(name, shell)} --export --shell {shell})"',
+            "else",
+            *(f"  {line}" for line in body),
+            "fi",
+        ]
+    lines.append("")
+    return "\n".join(lines)
+
+
+def write_scripts(name: str, shells: tuple[str, ...] = SHELLS) -> None:
+    """Write activate.<shell> files for *name*, rewriting only stale ones."""
+    env = config.build_env(name)
+    toml_mtime = config.profile_toml(name).stat().st_mtime_ns
+    for shell in shells:
+        path = script_path(name, shell)
+        text = render_file(name, env, shell)
+        try:
+            current = path.read_text()
+            mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            current, mtime = None, 0
+        if current != text:
+            config.write_atomic(path, text)
+        elif mtime <= toml_mtime:
+            # Same content but older than profile.toml: bump it so the
+            # staleness guard inside the script stops firing.
+            os.utime(path)
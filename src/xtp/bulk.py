@@ -0,0 +1,223 @@
+"""Change profile.toml keys across many profiles as one transaction.
+
+plan() reads and parses each selected profile once and computes its new
+text with toml_writer.patch from that parse, so nothing is written until
+every profile has been checked. apply() checks that a profile is still
+what plan() read by its stat key (or, if that was too recent to trust,
+its text) rather than reading it again, then records the old and new text of every
+change in a journal (CONFIG_DIR/set-journal.json, fsynced) before the
+first write and removes it after the last. If any write fails, the ones
+already made are undone; if the process dies instead, the journal is left
+behind and recover() (run by the next `xtp set`, or `xtp set --rollback`)
+undoes the run. A profile that was edited again since is never
+overwritten by a rollback.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from xtp import config, toml_writer
+from xtp.fileops import default_jobs
+
+JOURNAL_NAME = "set-journal.json"
+_VERSION = 1
+
+
+class Conflict(Exception):
+    """A profile changed between plan() and apply()."""
+
+
+@dataclass(frozen=True)
+class Condition:
+    path: list[str]
+    value: object
+    raw: str  # the value as typed, also matched against string values
+
+    @classmethod
+    def parse(cls, text: str) -> Condition:
+        path, value = config.parse_override(text)
+        return cls(path, value, text.partition("=")[2])
+
+    def matches(self, data: dict) -> bool:
+        for part in self.path:
+            if not isinstance(data, dict) or part not in data:
+                return False
+            data = data[part]
+        return data == self.value or data == self.raw
+
+
+@dataclass(frozen=True)
+class Change:
+    name: str
+    old: str
+    new: str
+    # config.stat_key of profile.toml as plan() read it; None if racy
+    stat: list[int] | None = None
+
+    def diff(self) -> list[str]:
+        import difflib
+
+        rel = f"{self.name}/profile.toml"
+        return list(difflib.unified_diff(
+            self.old.splitlines(keepends=True), self.new.splitlines(keepends=True),
+            fromfile=f"a/{rel}", tofile=f"b/{rel}", n=1,
+        ))
+
+
+def journal_path() -> Path:
+    return config.CONFIG_DIR / JOURNAL_NAME
+
+
+def _journal_lock():
+    return config.locked(config.CONFIG_DIR / f".{JOURNAL_NAME}.lock")
+
+
+def plan(
+    names: list[str], assignments: list[str], where: list[str] | None = None,
+) -> tuple[list[Change], list[str]]:
+    """Compute the change to each profile in *names* that matches *where*.
+
+    Returns (changes, errors). Profiles that don't match or that already
+    have the values are left out. Raises ValueError for a malformed
+    assignment or condition.
+    """
+    import tomllib
+
+    overrides = [config.parse_override(a) for a in assignments]
+    conditions = [Condition.parse(w) for w in where or []]
+    changes: list[Change] = []
+    errors: list[str] = []
+    for name in names:
+        try:
+            with open(config.profile_toml(name)) as f:
+                st = os.fstat(f.fileno())
+                text = f.read()
+            data = tomllib.loads(text)
+        except (OSError, ValueError) as e:  # TOMLDecodeError, UnicodeDecodeError
+            errors.append(f"{name}: {e}")
+            continue
+        if not all(c.matches(data) for c in conditions):
+            continue
+        try:
+            new = config.apply_overrides(_copy_paths(data, overrides), overrides)
+        except ValueError as e:
+            errors.append(f"{name}: {e}")
+            continue
+        if new != data:
+            stat = None if config.is_racy(st) else config.stat_key(st)
+            changes.append(Change(name, text, toml_writer.patch(text, new, old=data), stat))
+    return changes, errors
+
+
+def _copy_paths(data: dict, overrides: list[tuple[list[str], object]]) -> dict:
+    """Copy *data* deep enough that applying *overrides* leaves it untouched."""
+    new = dict(data)
+    for path, _ in overrides:
+        table = new
+        for part in path[:-1]:
+            if not isinstance(table.get(part), dict):
+                break
+            table[part] = table = dict(table[part])
+    return new
+
+
+def apply(changes: list[Change], jobs: int | None = None) -> None:
+    """Write *changes* all or nothing.
+
+    Raises Conflict if a profile changed since plan() read it, or OSError
+    if a write failed; either way no profile is left changed.
+    """
+    if not changes:
+        return
+    with _journal_lock():
+        _recover()
+        _write_journal(changes)
+        with ThreadPoolExecutor(max_workers=jobs or default_jobs()) as pool:
+            results = list(pool.map(_write_one, changes))
+        written = [c for c, r in zip(changes, results) if r is None]
+        failed = [r for r in results if r is not None]
+        if failed:
+            _rollback(written)
+        _remove_journal()
+        config.bump_generation()
+    if failed:
+        raise failed[0]
+
+
+def _write_one(change: Change) -> BaseException | None:
+    # Durable: the journal is removed once every write returned, so each
+    # must already be on disk. The fsyncs overlap across the pool's threads.
+    path = config.profile_toml(change.name)
+    try:
+        with config.profile_lock(change.name):
+            unchanged = change.stat is not None and config.stat_key(os.stat(path)) == change.stat
+            if not unchanged and path.read_text() != change.old:
+                raise Conflict(f"{change.name}: profile.toml changed since it was read")
+            config.write_atomic(path, change.new, durable=True)
+            config.bump_profile_generation(change.name)
+    except (OSError, Conflict) as e:
+        return e
+    return None
+
+
+def recover() -> list[str]:
+    """Undo an interrupted apply() from its journal; return the profiles restored."""
+    with _journal_lock():
+        return _recover()
+
+
+def _recover() -> list[str]:
+    try:
+        data = json.loads(journal_path().read_text())
+    except FileNotFoundError:
+        return []
+    except ValueError:
+        # The journal is replaced atomically, so this isn't one of ours.
+        _remove_journal()
+        return []
+    changes = [Change(c["name"], c["old"], c["new"]) for c in data.get("changes", [])]
+    restored = _rollback(changes)
+    _remove_journal()
+    if restored:
+        config.bump_generation()
+    return restored
+
+
+def _rollback(changes: list[Change]) -> list[str]:
+    """Put back the old text of every change still holding its new text."""
+    restored = []
+    for change in changes:
+        path = config.profile_toml(change.name)
+        try:
+            with config.profile_lock(change.name):
+                if path.read_text() != change.new:
+                    continue  # never written, or edited again since
+                config.write_atomic(path, change.old, durable=True)
+                config.bump_profile_generation(change.name)
+        except FileNotFoundError:
+            continue  # deleted since
+        restored.append(change.name)
+    return restored
+
+
+def _write_journal(changes: list[Change]) -> None:
+    config.CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+    data = {
+        "version": _VERSION,
+        "changes": [{"name": c.name, "old": c.old, "new": c.new} for c in changes],
+    }
+    config.write_atomic(journal_path(), json.dumps(data), durable=True)
+
+
+def _remove_journal() -> None:
+    journal_path().unlink(missing_ok=True)
+    fd = os.open(config.CONFIG_DIR, os.O_RDONLY)
+    try:
+        os.fsync(fd)  # a completed run must not be rolled back after a crash
+    finally:
+        os.close(fd)
@@ -1,16 +1,94 @@
-"""Argument parsing and command dispatch."""
+"""Argument parsing and command dispatch.
+
+The commands prompt hooks call on every prompt (``current``, ``list``,
+``env NAME [--export]`` and ``show [NAME]``) are matched by _fast_path
+before argparse is even imported, and are forwarded to ``xtp daemon``
+when one is listening; everything else, including any unusual spelling
+of those, goes through the full parser. tests/test_startup.py guards the
+import budget.
+"""
 
 from __future__ import annotations
 
-import argparse
 import os
-import subprocess
 import sys
 
 from xtp import __version__
 
+_SHELLS = ("zsh", "bash", "fish")
+
+
+def _hot_request(argv: list[str]) -> dict | None:
+    """Return the daemon request for a hot command line, or None."""
+    if argv == ["list"]:
+        return {"command": "list"}
+
+    if argv[:1] == ["show"] and len(argv) <= 2:
+        name = argv[1] if len(argv) == 2 else os.environ.get("XTP_PROFILE")
+        if not name or name.startswith("-"):
+            return None
+        return {"command": "show", "name": name}
+
+    if len(argv) >= 2 and argv[0] == "env" and not argv[1].startswith("-"):
+        name, opts = argv[1], argv[2:]
+        export = "--export" in opts[:1] + opts[-1:]
+        if opts[:1] == ["--export"]:
+            opts = opts[1:]
+        elif opts[-1:] == ["--export"]:
+            opts = opts[:-1]
+        shell = None
+        if export and len(opts) == 2 and opts[0] == "--shell":
+            shell = opts[1]
+        elif export and len(opts) == 1 and opts[0].startswith("--shell="):
+            shell = opts[0].partition("=")[2]
+        elif opts:
+            return None
+        if shell is not None and shell not in _SHELLS:
+            return None  # let argparse report the bad choice
+        return {"command": "env", "name": name, "export": export, "shell": shell}
+
+    return None
+
+
+def _fast_path(argv: list[str]) -> bool:
+    """Run *argv* without argparse if it is a hot command; return True if handled."""
+    if argv == ["current"]:
+        print(os.environ.get("XTP_PROFILE", "") or "none")
+        return True
+
+    request = _hot_request(argv)
+    if request is None:
+        return False
+
+    from xtp import daemon
+
+    reply = daemon.query(request)
+    if reply is not None:
+        sys.stdout.write(reply["out"])
+        sys.stderr.write(reply["err"])
+        if reply["code"]:
+            raise SystemExit(reply["code"])
+        return True
+
+    command = request["command"]
+    if command == "list":
+        from xtp.commands.list import run
+        run()
+    elif command == "show":
+        from xtp.commands.show import run
+        run(request["name"])
+    else:
+        from xtp.commands.env import run
+        run(request["name"], export=request["export"], shell=request["shell"])
+    return True
+
 
 def main() -> None:
+    if _fast_path(sys.argv[1:]):
+        return
+
+    import argparse
+
     parser = argparse.ArgumentParser(
         prog="xtp",
         description="Terminal profile manager for multi-client environment isolation",
@@ -23,6 +101,16 @@ def main() -> None:
     p = sub.add_parser("create", help="Create a new profile interactively")
     p.add_argument("name", help="Profile name")
 
+    # xtp clone <src> <dst> [--set KEY=VALUE ...] [--with-credentials]
+    p = sub.add_parser("clone", help="Copy a profile under a new name, with overrides")
+    p.add_argument("src", help="Profile to clone")
+    p.add_argument("dst", help="New profile name")
+    p.add_argument("--set", dest="overrides", action="append", default=[], metavar="KEY=VALUE",
+                   help="Override a profile.toml field, e.g. git.author_email=me@new.com")
+    p.add_argument("--with-credentials", action="store_true",
+                   help="Also copy gh/aws/Claude logins and npm auth settings")
+    p.add_argument("--jobs", "-j", type=int, help="Parallel copies (default: up to 8)")
+
     # xtp list
     sub.add_parser("list", help="List all profiles")
 
@@ -30,6 +118,26 @@ def main() -> None:
     p = sub.add_parser("shell", help="Launch isolated shell with profile environment")
     p.add_argument("name", help="Profile name")
 
+    # xtp env <name> [--export] [--shell SHELL]
+    p = sub.add_parser("env", help="Print profile environment variables")
+    p.add_argument("name", help="Profile name")
+    p.add_argument("--export", action="store_true",
+                   help="Print an eval-able activation script")
+    p.add_argument("--shell", choices=_SHELLS,
+                   help="Target shell for --export (defaults to $SHELL)")
+
+    # xtp activate <name> [--shell SHELL]
+    p = sub.add_parser("activate", help="Refresh and print the path of a profile's activate script")
+    p.add_argument("name", help="Profile name")
+    p.add_argument("--shell", choices=_SHELLS,
+                   help="Target shell (defaults to $SHELL)")
+
+    # xtp switch <name> [--shell SHELL]
+    p = sub.add_parser("switch", help="Print commands that switch the current shell to a profile")
+    p.add_argument("name", help="Profile name")
+    p.add_argument("--shell", choices=_SHELLS,
+                   help="Target shell (defaults to $SHELL)")
+
     # xtp show [name]
     p = sub.add_parser("show", help="Show profile config and environment variables")
     p.add_argument("name", nargs="?", help="Profile name (defaults to active profile)")
@@ -38,9 +146,94 @@ def main() -> None:
     p = sub.add_parser("edit", help="Open profile.toml in $EDITOR")
     p.add_argument("name", help="Profile name")
 
-    # xtp delete <name>
-    p = sub.add_parser("delete", help="Delete a profile")
+    # xtp delete <name> [--undo]
+    p = sub.add_parser("delete", help="Delete a profile (moves it to the trash)")
     p.add_argument("name", help="Profile name")
+    p.add_argument("--undo", action="store_true", help="Restore a deleted profile from the trash")
+
+    # xtp set KEY=VALUE ... [--profiles GLOB | --all] [--where KEY=VALUE ...] [--dry-run] [--rollback]
+    p = sub.add_parser("set", help="Change profile.toml keys across profiles in one transaction")
+    p.add_argument("assignments", nargs="*", metavar="KEY=VALUE",
+                   help="Dotted profile.toml key and value (read as TOML, else a string)")
+    p.add_argument("--profiles", "-p", metavar="GLOB",
+                   help="Profiles whose names match GLOB (defaults to active profile)")
+    p.add_argument("--all", action="store_true", help="Every profile")
+    p.add_argument("--where", action="append", metavar="KEY=VALUE",
+                   help="Only profiles where KEY has VALUE (repeatable; all must hold)")
+    p.add_argument("--dry-run", "-n", action="store_true", help="Print the diff without writing")
+    p.add_argument("--rollback", action="store_true", help="Undo an interrupted xtp set run")
+    p.add_argument("--jobs", "-j", type=int, help="Profiles written at once (default: up to 8)")
+
+    # xtp gc [--now] [--dry-run] [--jobs N]
+    p = sub.add_parser("gc", help="Purge deleted profiles whose undo window has passed")
+    p.add_argument("--now", action="store_true", help="Purge everything in the trash")
+    p.add_argument("--dry-run", action="store_true", help="Only list what would be purged")
+    p.add_argument("--jobs", "-j", type=int, help="Parallel removal threads (default: up to 8)")
+    p.add_argument("--quiet", "-q", action="store_true", help="Print errors only")
+
+    # xtp import-claude <name> [--source DIR] [--hardlink] [--jobs N]
+    p = sub.add_parser("import-claude", help="Copy an existing ~/.claude into a profile (incremental)")
+    p.add_argument("name", help="Profile name")
+    p.add_argument("--source", metavar="DIR", help="Claude config dir to import (default: ~/.claude)")
+    p.add_argument("--hardlink", action="store_true",
+                   help="Hard-link files instead of copying (both copies then change together)")
+    p.add_argument("--jobs", "-j", type=int, help="Parallel copies (default: up to 8)")
+
+    # xtp du [name] [--all] [--rescan]
+    p = sub.add_parser("du", help="Show disk usage per profile subdirectory")
+    p.add_argument("name", nargs="?", help="Profile name (defaults to active profile)")
+    p.add_argument("--all", action="store_true", help="Report every profile")
+    p.add_argument("--rescan", action="store_true",
+                   help="Ignore the usage index and walk everything")
+
+    # xtp claude-gc [name] [--all] [--older-than DAYS] [--dry-run] [--list] [--extract SESSION]
+    p = sub.add_parser("claude-gc", help="Archive old Claude Code transcripts into compressed files")
+    p.add_argument("name", nargs="?", help="Profile name (defaults to active profile)")
+    p.add_argument("--all", action="store_true", help="Every profile, in parallel")
+    p.add_argument("--older-than", type=float, metavar="DAYS",
+                   help="Archive transcripts not modified for DAYS (default: 30)")
+    p.add_argument("--dry-run", action="store_true", help="Only report what would be archived")
+    p.add_argument("--list", action="store_true", help="List archived sessions")
+    p.add_argument("--extract", metavar="SESSION",
+                   help="Restore an archived session (id or project/file path)")
+    p.add_argument("--jobs", "-j", type=int, help="Profiles compacted at once (default: up to 8)")
+
+    # xtp search <query> [--profile NAME | --all] [--limit N] [--raw] [--reindex]
+    p = sub.add_parser("search", help="Full-text search of Claude Code transcripts")
+    p.add_argument("query", help="Words to find (all must match)")
+    p.add_argument("--profile", "-p", help="Profile to search (defaults to active profile)")
+    p.add_argument("--all", action="store_true", help="Search every profile")
+    p.add_argument("--limit", "-n", type=int, default=20, help="Matches per profile (default: 20)")
+    p.add_argument("--raw", action="store_true",
+                   help="Treat the query as SQLite FTS5 syntax (phrases, OR, NOT, prefix*)")
+    p.add_argument("--reindex", action="store_true", help="Rebuild the index from scratch")
+
+    # xtp dirs [path] [--hook]
+    p = sub.add_parser("dirs", help="Show the directory to profile mapping")
+    p.add_argument("path", nargs="?", help="Print the profile PATH maps to")
+    p.add_argument("--hook", action="store_true",
+                   help="Regenerate the zsh chpwd hook and print its path")
+
+    # xtp hook install|uninstall|compile [--force]
+    p = sub.add_parser("hook", help="Manage the git identity guard hooks of this repo")
+    p.add_argument("action", choices=["install", "uninstall", "compile"],
+                   help="install/uninstall pre-commit and pre-push hooks, or recompile the guard")
+    p.add_argument("--force", action="store_true", help="Replace existing non-xtp hooks")
+
+    # xtp skills list|link|unlink|sync [name] [skill ...] [--all] [--hardlink]
+    p = sub.add_parser("skills", help="Link skills from the shared store into profiles")
+    p.add_argument("action", choices=["list", "link", "unlink", "sync"],
+                   help="list the store (or a profile's links), link/unlink skills, repair links")
+    p.add_argument("args", nargs="*", metavar="name skill",
+                   help="Profile name (defaults to active profile), then skill names")
+    p.add_argument("--all", action="store_true",
+                   help="Apply to every profile (all arguments are then skill names)")
+    p.add_argument("--hardlink", action="store_true",
+                   help="Link skill files with hard links instead of a directory symlink")
+
+    # xtp daemon [--stop]
+    p = sub.add_parser("daemon", help="Serve list/env/show queries from memory (opt-in)")
+    p.add_argument("--stop", action="store_true", help="Stop the running daemon")
 
     # xtp chrome-profiles
     sub.add_parser("chrome-profiles", help="List available Chrome profiles")
@@ -56,9 +249,17 @@ def main() -> None:
     p = sub.add_parser("init-ssh", help="Generate SSH key pair for a profile")
     p.add_argument("name", help="Profile name")
 
-    # xtp verify <name>
+    # xtp verify <name> | --all [--match GLOB] [--jobs N]
     p = sub.add_parser("verify", help="Validate profile setup")
-    p.add_argument("name", help="Profile name")
+    p.add_argument("name", nargs="?", help="Profile name")
+    p.add_argument("--all", action="store_true", help="Verify every profile")
+    p.add_argument("--match", metavar="GLOB", help="Verify profiles whose name matches GLOB")
+    p.add_argument("--jobs", "-j", type=int, default=4,
+                   help="Profiles verified concurrently with --all/--match (default: 4)")
+    p.add_argument("--fresh", action="store_true",
+                   help="Ignore cached network check results")
+    p.add_argument("--ttl", type=float, metavar="SECONDS",
+                   help="Reuse successful network results this recent (default: 300)")
 
     args = parser.parse_args()
 
@@ -70,6 +271,10 @@ def main() -> None:
         from xtp.commands.create import run
         run(args.name)
 
+    elif args.command == "clone":
+        from xtp.commands.clone import run
+        run(args.src, args.dst, args.overrides, with_credentials=args.with_credentials, jobs=args.jobs)
+
     elif args.command == "list":
         from xtp.commands.list import run
         run()
@@ -78,6 +283,18 @@ def main() -> None:
         from xtp.commands.shell import run
         run(args.name)
 
+    elif args.command == "env":
+        from xtp.commands.env import run
+        run(args.name, export=args.export, shell=args.shell)
+
+    elif args.command == "activate":
+        from xtp.commands.env import run_activate
+        run_activate(args.name, shell=args.shell)
+
+    elif args.command == "switch":
+        from xtp.commands.switch import run
+        run(args.name, shell=args.shell)
+
     elif args.command == "show":
         name = args.name or os.environ.get("XTP_PROFILE")
         if not name:
@@ -93,7 +310,71 @@ def main() -> None:
 
     elif args.command == "delete":
         from xtp.commands.delete import run
-        run(args.name)
+        run(args.name, undo=args.undo)
+
+    elif args.command == "set":
+        pattern = args.profiles or os.environ.get("XTP_PROFILE")
+        if not args.rollback and not (args.assignments and (pattern or args.all)):
+            print("Error: nothing to set, or no profile given and not inside an xtp shell.",
+                  file=sys.stderr)
+            print("Usage: xtp set KEY=VALUE ... --profiles <glob>  or  --all", file=sys.stderr)
+            raise SystemExit(1)
+        from xtp.commands.set import run
+        run(args.assignments, pattern, all_profiles=args.all, where=args.where,
+            dry_run=args.dry_run, rollback=args.rollback, jobs=args.jobs)
+
+    elif args.command == "gc":
+        from xtp.commands.gc import run
+        run(now=args.now, dry_run=args.dry_run, jobs=args.jobs, quiet=args.quiet)
+
+    elif args.command == "import-claude":
+        from xtp.commands.import_claude import run
+        run(args.name, source=args.source, hardlink=args.hardlink, jobs=args.jobs)
+
+    elif args.command == "du":
+        name = args.name or os.environ.get("XTP_PROFILE")
+        if not name and not args.all:
+            print("Error: no profile name given and not inside an xtp shell.", file=sys.stderr)
+            print("Usage: xtp du <name>  or  xtp du --all", file=sys.stderr)
+            raise SystemExit(1)
+        from xtp.commands.du import run
+        run(name, all_profiles=args.all, rescan=args.rescan)
+
+    elif args.command == "claude-gc":
+        name = args.name or os.environ.get("XTP_PROFILE")
+        if not name and not args.all:
+            print("Error: no profile name given and not inside an xtp shell.", file=sys.stderr)
+            print("Usage: xtp claude-gc <name>  or  xtp claude-gc --all", file=sys.stderr)
+            raise SystemExit(1)
+        from xtp.commands.claude_gc import run
+        run(name, all_profiles=args.all, older_than=args.older_than, dry_run=args.dry_run,
+            list_sessions=args.list, extract=args.extract, jobs=args.jobs)
+
+    elif args.command == "search":
+        name = args.profile or os.environ.get("XTP_PROFILE")
+        if not name and not args.all:
+            print("Error: no profile given and not inside an xtp shell.", file=sys.stderr)
+            print("Usage: xtp search <query> --profile <name>  or  --all", file=sys.stderr)
+            raise SystemExit(1)
+        from xtp.commands.search import run
+        run(args.query, name, all_profiles=args.all, limit=args.limit, raw=args.raw,
+            reindex=args.reindex)
+
+    elif args.command == "dirs":
+        from xtp.commands.dirs import run
+        run(args.path, hook=args.hook)
+
+    elif args.command == "hook":
+        from xtp.commands.hook import run
+        run(args.action, force=args.force)
+
+    elif args.command == "skills":
+        from xtp.commands.skills import run
+        run(args.action, args.args, all_profiles=args.all, hardlink=args.hardlink)
+
+    elif args.command == "daemon":
+        from xtp.commands.daemon import run
+        run(stop=args.stop)
 
     elif args.command == "chrome-profiles":
         from xtp.commands.chrome import run
@@ -115,5 +396,12 @@ def main() -> None:
         run_ssh(args.name)
 
     elif args.command == "verify":
-        from xtp.commands.verify import run
-        run(args.name)
+        if args.all or args.match:
+            from xtp.commands.verify import run_all
+            run_all(args.match, jobs=args.jobs, fresh=args.fresh, ttl=args.ttl)
+        elif args.name:
+            from xtp.commands.verify import run
+            run(args.name, fresh=args.fresh, ttl=args.ttl)
+        else:
+            print("Error: give a profile name, --all or --match GLOB.", file=sys.stderr)
+            raise SystemExit(1)
@@ -1,38 +1,139 @@
-"""Chrome profile discovery."""
+"""Chrome profile discovery.
+
+Chrome's ``Local State`` file can be several megabytes; only its
+``profile.info_cache`` member is needed, so it is located in an mmap of
+the file with xtp.jsonscan and decoded on its own instead of decoding the
+whole document. Results are cached in-process and in CONFIG_DIR/cache/,
+keyed by the file's mtime and size.
+"""
 
 from __future__ import annotations
 
 import json
+import sys
 from pathlib import Path
 
+from xtp import config, jsonscan
 
 CHROME_LOCAL_STATE = (
     Path.home() / "Library" / "Application Support" / "Google" / "Chrome" / "Local State"
 )
 
+# Other Local State locations, in preference order, with the command that
+# launches the matching browser on Linux.
+LINUX_LOCATIONS: tuple[tuple[Path, str], ...] = (
+    (Path.home() / ".config" / "google-chrome" / "Local State", "google-chrome"),
+    (Path.home() / ".config" / "google-chrome-beta" / "Local State", "google-chrome-beta"),
+    (Path.home() / ".config" / "google-chrome-unstable" / "Local State", "google-chrome-unstable"),
+    (Path.home() / ".config" / "chromium" / "Local State", "chromium"),
+)
+
+CACHE_NAME = "chrome-profiles.json"
+
+_located: dict[tuple[Path, ...], Path | None] = {}
+_parsed: dict[Path, tuple[list[int], list[tuple[str, str]]]] = {}
+
+
+def candidates() -> tuple[Path, ...]:
+    return (CHROME_LOCAL_STATE, *(path for path, _ in LINUX_LOCATIONS))
+
+
+def find_local_state() -> Path | None:
+    """Return the first existing Local State file; scanned once per process."""
+    paths = candidates()
+    if paths not in _located:
+        _located[paths] = next((p for p in paths if p.is_file()), None)
+    return _located[paths]
+
+
+def launcher() -> list[str]:
+    """Return the command prefix that opens URLs in the detected browser."""
+    if sys.platform == "darwin":
+        return ["open", "-na", "Google Chrome", "--args"]
+    found = find_local_state()
+    for path, command in LINUX_LOCATIONS:
+        if path == found:
+            return [command]
+    return ["google-chrome"]
+
 
 def get_chrome_profiles() -> list[tuple[str, str]]:
     """Return list of (directory_name, display_name) for Chrome profiles."""
-    if not CHROME_LOCAL_STATE.is_file():
+    path = find_local_state()
+    if path is None:
+        return []
+    try:
+        st = path.stat()
+    except FileNotFoundError:
         return []
+    if config.is_racy(st):
+        return _parse(path)  # Chrome may still be writing it
+    key = config.stat_key(st)
 
+    hit = _parsed.get(path)
+    if hit is not None and hit[0] == key:
+        return hit[1]
+
+    profiles = _read_cache(path, key)
+    if profiles is None:
+        profiles = _parse(path)
+        _write_cache(path, key, profiles)
+    _parsed[path] = (key, profiles)
+    return profiles
+
+
+def _is_info_cache(value: object) -> bool:
+    # jsonscan.find matches "info_cache" at any depth; profile.info_cache is
+    # the one whose entries are all profiles, each with a display name.
+    return isinstance(value, dict) and all(
+        isinstance(v, dict) and isinstance(v.get("name"), str) for v in value.values()
+    )
+
+
+def _parse(path: Path) -> list[tuple[str, str]]:
     try:
-        data = json.loads(CHROME_LOCAL_STATE.read_text())
-        info_cache = data.get("profile", {}).get("info_cache", {})
-        profiles = []
-        for directory, info in sorted(info_cache.items()):
-            display_name = info.get("name", directory)
-            profiles.append((directory, display_name))
-        return profiles
-    except (json.JSONDecodeError, KeyError):
+        with jsonscan.mapped(path) as buf:
+            info_cache = jsonscan.find(buf, "info_cache", accept=_is_info_cache)
+    except (OSError, KeyError, ValueError):
         return []
+    profiles = []
+    for directory, info in sorted(info_cache.items()):
+        display_name = info.get("name", directory)
+        profiles.append((directory, display_name))
+    return profiles
+
+
+def _cache_path() -> Path:
+    return config.CONFIG_DIR / "cache" / CACHE_NAME
+
+
+def _read_cache(path: Path, key: list[int]) -> list[tuple[str, str]] | None:
+    try:
+        with open(_cache_path(), "rb") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("path") != str(path) or data.get("key") != key:
+        return None
+    return [tuple(p) for p in data.get("profiles", [])]
+
+
+def _write_cache(path: Path, key: list[int], profiles: list[tuple[str, str]]) -> None:
+    cache = _cache_path()
+    try:
+        cache.parent.mkdir(parents=True, exist_ok=True)
+        config.write_atomic(cache, json.dumps({"path": str(path), "key": key, "profiles": profiles}))
+    except OSError:
+        pass  # caching is best-effort
 
 
 def run() -> None:
     profiles = get_chrome_profiles()
     if not profiles:
         print("No Chrome profiles found.")
-        print(f"Looked in: {CHROME_LOCAL_STATE}")
+        print("Looked in:")
+        for path in candidates():
+            print(f"  {path}")
         return
 
     print("Chrome profiles:")
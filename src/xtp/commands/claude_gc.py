@@ -0,0 +1,106 @@
+"""Archive old Claude Code transcripts, and list or restore archived ones."""
+
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from xtp import config, transcripts
+from xtp.commands.du import format_size
+from xtp.fileops import default_jobs
+
+
+def run(
+    name: str | None = None,
+    all_profiles: bool = False,
+    older_than: float | None = None,
+    dry_run: bool = False,
+    list_sessions: bool = False,
+    extract: str | None = None,
+    jobs: int | None = None,
+) -> None:
+    if all_profiles:
+        names = config.list_profiles()
+        if not names:
+            print("No profiles found. Create one with: xtp create <name>")
+            return
+    else:
+        if not config.profile_toml(name).is_file():
+            print(f"Error: Profile '{name}' not found.")
+            raise SystemExit(1)
+        names = [name]
+
+    if list_sessions:
+        for i, profile in enumerate(names):
+            if i:
+                print()
+            _list(profile)
+        return
+    if extract:
+        _extract(names, extract)
+        return
+
+    before = transcripts.cutoff(older_than)
+    with ThreadPoolExecutor(max_workers=jobs or default_jobs()) as pool:
+        results = pool.map(lambda n: transcripts.compact(n, before, dry_run=dry_run), names)
+        failed = False
+        for profile, stats in zip(names, results):
+            _report(profile, stats, dry_run)
+            failed |= bool(stats.errors)
+    if failed:
+        raise SystemExit(1)
+
+
+def _report(name: str, stats: transcripts.GcStats, dry_run: bool) -> None:
+    if not stats.files:
+        print(f"{name}: nothing to archive")
+    elif dry_run:
+        print(f"{name}: would archive {stats.files} transcripts ({format_size(stats.bytes)})")
+    else:
+        print(
+            f"{name}: archived {stats.files} transcripts, {format_size(stats.bytes)}"
+            f" -> {format_size(stats.compressed)} ({stats.codec or 'already archived'})"
+        )
+    for error in stats.errors:
+        print(f"  Error: {error}")
+
+
+def _list(name: str) -> None:
+    try:
+        sessions = transcripts.sessions(name)
+    except ValueError as e:
+        print(f"Error: {e}")
+        raise SystemExit(1)
+    print(f"{name}")
+    if not sessions:
+        print("  (no archived sessions)")
+        return
+    for s in sessions:
+        date = time.strftime("%Y-%m-%d", time.localtime(s.mtime_ns / 1e9))
+        print(f"  {date}  {format_size(s.size):>9}  {s.key}")
+
+
+def _extract(names: list[str], query: str) -> None:
+    try:
+        matches = [(n, s) for n in names for s in transcripts.find(n, query)]
+    except ValueError as e:
+        print(f"Error: {e}")
+        raise SystemExit(1)
+    if not matches:
+        print(f"Error: no archived session '{query}'.")
+        raise SystemExit(1)
+    if len(matches) > 1:
+        print(f"Error: '{query}' matches several sessions; give the full path:")
+        for name, s in matches:
+            print(f"  {name}: {s.key}")
+        raise SystemExit(1)
+    name, session = matches[0]
+    try:
+        dest = transcripts.extract(name, session)
+    except FileExistsError as e:
+        print(f"Error: {e} already exists.")
+        raise SystemExit(1)
+    except ImportError as e:
+        print(f"Error: {session.archive} needs {e.name or 'a missing module'} to decompress.")
+        raise SystemExit(1)
+    print(f"Restored {dest}")
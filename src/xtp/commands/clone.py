@@ -0,0 +1,111 @@
+"""Clone a profile under a new name, with field overrides."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from xtp import activate, config, fileops
+from xtp.commands.du import format_size
+
+# Profile subtrees and files worth cloning; everything else in a profile
+# dir (activate scripts, caches, browser.sh, zdotdir/) is regenerated.
+CLONED = ("claude", "gh", "aws", "npmrc")
+
+# Left out unless --with-credentials: the clone gets its own logins
+CREDENTIALS = ("gh/hosts.yml", "aws/credentials", "claude/.credentials.json")
+
+# npmrc settings that hold registry credentials
+_NPM_AUTH_KEYS = ("_auth", "_authToken", "_password", "username", "email", "certfile", "keyfile")
+
+
+def run(
+    src: str, dst: str, overrides: list[str] | None = None,
+    with_credentials: bool = False, jobs: int | None = None,
+) -> None:
+    import tomllib
+
+    try:
+        # The clone's profile.toml is this text patched, keeping its
+        # comments and layout.
+        base = config.profile_toml(src).read_text()
+        data = tomllib.loads(base)
+    except FileNotFoundError:
+        print(f"Error: Profile '{src}' not found.")
+        raise SystemExit(1)
+    except ValueError as e:
+        print(f"Error: {config.profile_toml(src)}: {e}")
+        raise SystemExit(1)
+    if config.profile_toml(dst).exists():
+        print(f"Error: Profile '{dst}' already exists.")
+        raise SystemExit(1)
+    try:
+        config.apply_overrides(data, [config.parse_override(o) for o in overrides or []])
+    except ValueError as e:
+        print(f"Error: --set {e}")
+        raise SystemExit(1)
+
+    src_dir, dst_dir = config.profile_dir(src), config.profile_dir(dst)
+    config.ensure_profile_dirs(dst)
+    skipped: list[str] = []
+
+    def skip(rel: str) -> bool:
+        if with_credentials or rel not in CREDENTIALS:
+            return False
+        skipped.append(rel)
+        return True
+
+    stats = fileops.SyncStats()
+    for entry in CLONED:
+        source = src_dir / entry
+        if source.is_dir():
+            stats += fileops.sync_tree(
+                source, dst_dir / entry, link_readonly=True, jobs=jobs,
+                skip=lambda rel, entry=entry: skip(f"{entry}/{rel}"),
+            )
+        elif source.is_file():
+            if _clone_file(source, dst_dir / entry, entry, with_credentials, stats):
+                skipped.append(f"{entry} (auth settings)")
+
+    # profile.toml goes last: until it exists the clone can simply be re-run.
+    config.save_profile(dst, data, base=base)
+    if data.get("chrome", {}).get("profile_directory"):
+        config.generate_browser_script(dst)
+    activate.write_scripts(dst)
+
+    print(f"Cloned '{src}' to '{dst}' at {dst_dir}")
+    print(
+        f"  {stats.files:,} files, {format_size(stats.bytes)}: {stats.cloned:,} cloned, "
+        f"{stats.linked:,} hard-linked (read-only), {stats.copied:,} copied"
+    )
+    if skipped:
+        print(f"  Left out credentials: {', '.join(sorted(skipped))}")
+        if "gh/hosts.yml" in skipped:
+            print(f"  Authenticate with: xtp init-gh {dst}")
+    for error in stats.errors:
+        print(f"  Error: {error}")
+    if stats.errors:
+        raise SystemExit(1)
+
+
+def _clone_file(
+    source: Path, target: Path, rel: str, with_credentials: bool, stats: fileops.SyncStats,
+) -> bool:
+    """Clone one top-level file; return True if credentials were stripped from it."""
+    st = source.stat()
+    stats.files += 1
+    stats.bytes += st.st_size
+    if rel == "npmrc" and not with_credentials:
+        lines = source.read_text().splitlines(keepends=True)
+        kept = [line for line in lines if not _is_npm_auth(line)]
+        config.write_atomic(target, "".join(kept), mode=st.st_mode & 0o777)
+        stats.copied += 1
+        return len(kept) != len(lines)
+    how = fileops.copy_file(str(source), str(target), st, link_readonly=True)
+    setattr(stats, how, getattr(stats, how) + 1)
+    return False
+
+
+def _is_npm_auth(line: str) -> bool:
+    key = line.split("=", 1)[0].strip()
+    # Scoped keys look like //registry.npmjs.org/:_authToken
+    return key.rsplit(":", 1)[-1] in _NPM_AUTH_KEYS
@@ -5,7 +5,7 @@ from __future__ import annotations
 import subprocess
 from pathlib import Path
 
-from xtp import config
+from xtp import activate, config
 from xtp.commands.chrome import get_chrome_profiles
 
 
@@ -73,6 +73,8 @@ def run(name: str) -> None:
     if chrome_profile:
         config.generate_browser_script(name)
 
+    activate.write_scripts(name)
+
     # Create empty npmrc if needed
     if npm_isolate:
         npmrc = config.profile_dir(name) / "npmrc"
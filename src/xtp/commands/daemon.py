@@ -0,0 +1,197 @@
+"""xtp daemon: answer list/env/show/current queries from memory over a Unix socket.
+
+Parsed profiles and built environments are kept in memory and
+revalidated with a stat of profile.toml and the global config on every
+query, so an edit is picked up by the very next query without a watcher
+thread and without ever serving a stale answer.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import signal
+import socket
+import sys
+from contextlib import redirect_stderr, redirect_stdout
+
+from xtp import activate, config, daemon, index, model
+from xtp.commands import env as env_cmd
+from xtp.commands import list as list_cmd
+from xtp.commands import show as show_cmd
+
+
+class State:
+    """Per-profile memos, keyed by the stat of profile.toml and the global config."""
+
+    def __init__(self) -> None:
+        self.profiles: dict[str, tuple[tuple, model.Profile]] = {}
+        self.envs: dict[str, tuple[tuple, dict[str, str]]] = {}
+        self.scripts: dict[tuple[str, str], tuple] = {}
+
+    def key(self, name: str) -> tuple | None:
+        """Return the current inputs key for *name*, or None if it is too fresh to trust.
+
+        Raises FileNotFoundError if the profile doesn't exist.
+        """
+        st = config.profile_toml(name).stat()
+        try:
+            global_st = config.GLOBAL_CONFIG.stat()
+        except FileNotFoundError:
+            global_st = None
+        if config.is_racy(st) or (global_st is not None and config.is_racy(global_st)):
+            return None
+        return (*config.stat_key(st), *(config.stat_key(global_st) if global_st else ()))
+
+    def profile(self, name: str) -> model.Profile:
+        return self._memo(self.profiles, name, model.load)
+
+    def env(self, name: str) -> dict[str, str]:
+        return self._memo(self.envs, name, config.build_env)
+
+    def write_scripts(self, name: str, shell: str) -> None:
+        """Refresh activate.<shell> once per change instead of once per query."""
+        key = self.key(name)
+        if key is None or self.scripts.get((name, shell)) != key:
+            activate.write_scripts(name, (shell,))
+            if key is not None:
+                self.scripts[(name, shell)] = key
+
+    def _memo(self, table: dict, name: str, load):
+        key = self.key(name)
+        hit = table.get(name)
+        if key is not None and hit is not None and hit[0] == key:
+            return hit[1]
+        value = load(name)
+        if key is None:
+            table.pop(name, None)
+        else:
+            table[name] = (key, value)
+        return value
+
+
+def answer(state: State, request: dict) -> dict:
+    """Run one query and return {"code", "out", "err"} as the CLI would print them.
+
+    Raises KeyError for requests the daemon doesn't handle.
+    """
+    out, err = io.StringIO(), io.StringIO()
+    code = 0
+    with redirect_stdout(out), redirect_stderr(err):
+        try:
+            _dispatch(state, request, request.get("environ", {}))
+        except SystemExit as e:
+            # As the interpreter would: None is success, anything else
+            # that isn't a status is printed and exits 1.
+            if e.code is None or isinstance(e.code, int):
+                code = e.code or 0
+            else:
+                print(e.code, file=sys.stderr)
+                code = 1
+    return {"code": code, "out": out.getvalue(), "err": err.getvalue()}
+
+
+def _dispatch(state: State, request: dict, environ: dict[str, str]) -> None:
+    command = request["command"]
+    if command == "current":
+        print(environ.get("XTP_PROFILE", "") or "none")
+
+    elif command == "list":
+        list_cmd.report(index.load(), environ.get("XTP_PROFILE", ""))
+
+    elif command == "env":
+        name = request["name"]
+        try:
+            env = state.env(name)
+        except FileNotFoundError:
+            print(f"Error: Profile '{name}' not found.", file=sys.stderr)
+            raise SystemExit(1)
+        shell = None
+        if request.get("export"):
+            shell = request.get("shell") or activate.default_shell(environ)
+            state.write_scripts(name, shell)
+        env_cmd.report(env, shell)
+
+    elif command == "show":
+        name = request["name"]
+        try:
+            profile = state.profile(name)
+        except FileNotFoundError:
+            print(f"Error: Profile '{name}' not found.")
+            raise SystemExit(1)
+        show_cmd.report(profile, state.env(name))
+
+    else:
+        raise KeyError(command)
+
+
+def serve(server: socket.socket, state: State) -> None:
+    """Answer connections on *server* until a stop request arrives."""
+    while True:
+        conn, _ = server.accept()
+        with conn:
+            try:
+                conn.settimeout(daemon.TIMEOUT)
+                request = daemon.decode(daemon.recv_all(conn))
+                if request.get("command") == "stop":
+                    conn.sendall(daemon.encode({"code": 0, "out": "", "err": ""}))
+                    return
+                try:
+                    reply = answer(state, request)
+                except Exception:  # noqa: BLE001 — the client runs the query itself
+                    reply = {"fallback": True}
+                conn.sendall(daemon.encode(reply))
+            except (OSError, ValueError, AttributeError):
+                continue  # broken or malformed client; keep serving the others
+
+
+def _listening(path: str) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(path)
+        except OSError:
+            return False
+    return True
+
+
+def _terminate(signum, frame) -> None:
+    raise SystemExit(0)
+
+
+def run(stop: bool = False) -> None:
+    path = daemon.SOCKET
+    if stop:
+        if daemon.query({"command": "stop"}) is None:
+            print("No xtp daemon is running.")
+            raise SystemExit(1)
+        print("xtp daemon stopped.")
+        return
+
+    if _listening(path):
+        print(f"Error: an xtp daemon is already listening on {path}.")
+        raise SystemExit(1)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    try:
+        os.unlink(path)  # stale socket from a daemon that didn't exit cleanly
+    except FileNotFoundError:
+        pass
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    umask = os.umask(0o177)  # socket is private to the user
+    try:
+        server.bind(path)
+    finally:
+        os.umask(umask)
+    server.listen(64)
+    signal.signal(signal.SIGTERM, _terminate)
+    print(f"xtp daemon listening on {path}", flush=True)
+    try:
+        serve(server, State())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
@@ -1,13 +1,18 @@
-"""Delete a profile."""
+"""Delete a profile (into the trash), or bring one back."""
 
 from __future__ import annotations
 
-import shutil
+import subprocess
+import sys
 
-from xtp import config
+from xtp import config, trash
 
 
-def run(name: str) -> None:
+def run(name: str, undo: bool = False) -> None:
+    if undo:
+        _undo(name)
+        return
+
     pdir = config.profile_dir(name)
     if not pdir.is_dir():
         print(f"Error: Profile '{name}' not found.")
@@ -19,5 +24,32 @@ def run(name: str) -> None:
         print("Cancelled.")
         return
 
-    shutil.rmtree(pdir)
+    trash.move(name)
     print(f"Profile '{name}' deleted.")
+    print(f"Undo with: xtp delete {name} --undo  (kept {trash.keep_days():g} days, until `xtp gc`)")
+    if trash.purge(dry_run=True)[0]:
+        _purge_in_background()
+
+
+def _undo(name: str) -> None:
+    try:
+        trash.restore(name)
+    except KeyError:
+        print(f"Error: no deleted profile '{name}' in {trash.trash_dir()}.")
+        raise SystemExit(1)
+    except FileExistsError:
+        print(f"Error: Profile '{name}' exists again; rename or delete it first.")
+        raise SystemExit(1)
+    print(f"Profile '{name}' restored.")
+
+
+def _purge_in_background() -> None:
+    """Start `xtp gc` detached, so expired trash is removed without waiting."""
+    try:
+        subprocess.Popen(
+            [sys.executable, "-m", "xtp", "gc", "--quiet"],
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    except OSError:
+        pass  # the next `xtp gc` does it
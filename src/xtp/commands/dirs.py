@@ -0,0 +1,31 @@
+"""Show and compile the directory → profile mapping."""
+
+from __future__ import annotations
+
+import os
+
+from xtp import config, directories
+
+
+def run(path: str | None = None, hook: bool = False) -> None:
+    if hook:
+        print(directories.write_hook())
+        return
+
+    if path is not None:
+        trie = directories.compile_trie(directories.load_mapping())
+        print(directories.resolve(trie, path) or "none")
+        return
+
+    table = config.load_global().get("directories", {})
+    if not table:
+        print(f"No directories mapped. Add a [directories] table to {config.GLOBAL_CONFIG}")
+        return
+
+    width = max(len(prefix) for prefix in table)
+    for prefix, name in sorted(table.items()):
+        missing = "" if config.profile_toml(str(name)).is_file() else "  (profile not found)"
+        print(f"  {prefix:<{width}}  {name}{missing}")
+    here = directories.resolve(directories.compile_trie(directories.load_mapping()), os.getcwd())
+    if here:
+        print(f"\nCurrent directory: {here}")
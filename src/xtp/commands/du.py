@@ -0,0 +1,50 @@
+"""Report disk usage per profile subdirectory."""
+
+from __future__ import annotations
+
+from xtp import config, usage
+
+
+def run(name: str | None = None, all_profiles: bool = False, rescan: bool = False) -> None:
+    if all_profiles:
+        names = config.list_profiles()
+        if not names:
+            print("No profiles found. Create one with: xtp create <name>")
+            return
+    else:
+        if not config.profile_dir(name).is_dir():
+            print(f"Error: Profile '{name}' not found.")
+            raise SystemExit(1)
+        names = [name]
+
+    for i, profile in enumerate(names):
+        if i:
+            print()
+        _report(profile, rescan)
+
+
+def _report(name: str, rescan: bool) -> None:
+    totals = usage.scan(config.profile_dir(name), rescan=rescan)
+    rows = sorted(rel for rel in totals if rel.startswith("claude/") and rel.count("/") == 1)
+    rows += sorted(rel for rel in totals if rel and "/" not in rel and rel != "claude")
+
+    print(f"{name}")
+    width = max((len(r) for r in rows), default=5)
+    for rel in rows:
+        print(_line(rel, totals[rel], width))
+    print(_line("total", totals.get("", usage.Usage()), width))
+
+
+def _line(label: str, u: usage.Usage, width: int) -> str:
+    return f"  {label:<{width}}  {u.files:>9,} files  {format_size(u.bytes):>9}"
+
+
+def format_size(n: int) -> str:
+    if n < 1024:
+        return f"{n} B"
+    size = float(n)
+    for unit in ("KB", "MB", "GB", "TB"):
+        size /= 1024
+        if size < 1024 or unit == "TB":
+            break
+    return f"{size:.1f} {unit}"
@@ -5,6 +5,7 @@ from __future__ import annotations
 import os
 import subprocess
 import sys
+from pathlib import Path
 
 from xtp import config
 
@@ -16,5 +17,51 @@ def run(name: str) -> None:
         raise SystemExit(1)
 
     editor = os.environ.get("EDITOR", "vim")
-    result = subprocess.run([editor, str(path)])
+    # The editor works on a copy and the profile's lock is only taken to
+    # put it in place, so other xtp writers aren't held up while it is
+    # open; a change they make meanwhile is never overwritten.
+    original = path.read_bytes()
+    copy = path.with_name(f".{path.stem}.{os.getpid()}{path.suffix}")
+    fd = os.open(copy, os.O_WRONLY | os.O_CREAT | os.O_EXCL, path.stat().st_mode & 0o777)
+    with os.fdopen(fd, "wb") as f:
+        f.write(original)
+    keep = False
+    try:
+        result = subprocess.run([editor, str(copy)])
+        edited = copy.read_bytes()
+        if edited != original:
+            keep = not _commit(name, original, edited, copy)
+    finally:
+        if not keep:
+            copy.unlink(missing_ok=True)
+    if keep:
+        raise SystemExit(1)
     sys.exit(result.returncode)
+
+
+def _commit(name: str, original: bytes, edited: bytes, copy: Path) -> bool:
+    """Replace profile.toml with *edited* unless it changed since *original*."""
+    path = config.profile_toml(name)
+    try:
+        text = edited.decode()
+    except UnicodeDecodeError:
+        print(f"Error: the edited file isn't valid UTF-8; your version is in {copy}")
+        return False
+    with config.profile_lock(name):
+        try:
+            current = path.read_bytes()
+        except FileNotFoundError:
+            current = None
+        if current != original:
+            print(
+                f"Error: {path} was changed by someone else while you were editing;"
+                f" your version is in {copy}"
+            )
+            return False
+        config.write_atomic(path, text, durable=True, mode=os.stat(copy).st_mode & 0o777)
+        config.bump_generation(name)
+
+    from xtp import index
+
+    index.update(name)
+    return True
@@ -0,0 +1,40 @@
+"""Print profile environments: plain, eval-able exports, or cached activate scripts."""
+
+from __future__ import annotations
+
+import sys
+
+from xtp import activate, config
+
+
+def run(name: str, export: bool = False, shell: str | None = None) -> None:
+    try:
+        env = config.build_env(name)
+    except FileNotFoundError:
+        print(f"Error: Profile '{name}' not found.", file=sys.stderr)
+        raise SystemExit(1)
+
+    if export:
+        shell = shell or activate.default_shell()
+        activate.write_scripts(name, (shell,))
+    report(env, shell if export else None)
+
+
+def report(env: dict[str, str], shell: str | None = None) -> None:
+    """Print *env* as KEY=value lines, or as an activation script for *shell*."""
+    if shell is None:
+        for key in sorted(env):
+            print(f"{key}={env[key]}")
+    else:
+        sys.stdout.write(activate.render(env, shell))
+
+
+def run_activate(name: str, shell: str | None = None) -> None:
+    """Refresh the profile's activate.<shell> file and print its path."""
+    if not config.profile_toml(name).is_file():
+        print(f"Error: Profile '{name}' not found.", file=sys.stderr)
+        raise SystemExit(1)
+
+    shell = shell or activate.default_shell()
+    activate.write_scripts(name, (shell,))
+    print(activate.script_path(name, shell))
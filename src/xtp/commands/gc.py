@@ -0,0 +1,25 @@
+"""Purge deleted profiles from the trash."""
+
+from __future__ import annotations
+
+import time
+
+from xtp import trash
+
+
+def run(now: bool = False, dry_run: bool = False, jobs: int | None = None, quiet: bool = False) -> None:
+    purged, errors = trash.purge(0 if now else None, jobs=jobs, dry_run=dry_run)
+    if not quiet:
+        verb = "Would purge" if dry_run else "Purged"
+        for entry in purged:
+            deleted = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry.deleted_ns / 1e9))
+            print(f"{verb} '{entry.name}' (deleted {deleted})")
+        kept = [e for e in trash.entries() if e not in purged]
+        if kept:
+            print(f"{len(kept)} deleted profile(s) kept for undo; purge them with: xtp gc --now")
+        elif not purged:
+            print("Trash is empty.")
+    for error in errors:
+        print(f"Error: {error}")
+    if errors:
+        raise SystemExit(1)
@@ -0,0 +1,65 @@
+"""Install the git identity guard hooks into a repository."""
+
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+
+from xtp import config, gitguard
+
+
+def run(action: str, force: bool = False) -> None:
+    if action == "compile":
+        print(gitguard.write_guard())
+        return
+
+    hooks_dir = _hooks_dir()
+    paths = [hooks_dir / hook for hook in gitguard.HOOKS]
+
+    if action == "uninstall":
+        removed = [p for p in paths if gitguard.is_stub(p)]
+        for path in removed:
+            path.unlink()
+        print(f"Removed {len(removed)} xtp hook(s) from {hooks_dir}")
+        return
+
+    foreign = [p for p in paths if p.exists() and not gitguard.is_stub(p)]
+    if foreign and not force:
+        for path in foreign:
+            print(f"Error: {path} already exists and wasn't written by xtp.")
+        print("Use --force to replace it.")
+        raise SystemExit(1)
+
+    gitguard.write_guard()
+    hooks_dir.mkdir(parents=True, exist_ok=True)
+    for hook, path in zip(gitguard.HOOKS, paths):
+        config.write_atomic(path, gitguard.render_stub(hook), mode=0o755)
+    print(f"Installed {' and '.join(gitguard.HOOKS)} hooks in {hooks_dir}")
+
+    url = _git("remote", "get-url", "origin")
+    if url is None:
+        return
+    name = gitguard.match(url, gitguard.load_remotes())
+    canonical = gitguard.canonical_url(url)
+    if name:
+        print(f"origin ({canonical}) belongs to profile '{name}'.")
+    else:
+        print(f"origin ({canonical}) isn't mapped to a profile; add it to [remotes] in {config.GLOBAL_CONFIG}")
+
+
+def _hooks_dir() -> Path:
+    hooks = _git("rev-parse", "--git-path", "hooks")
+    if hooks is None:
+        print("Error: not inside a git repository.")
+        raise SystemExit(1)
+    return Path(hooks).absolute()
+
+
+def _git(*args: str) -> str | None:
+    try:
+        result = subprocess.run(["git", *args], capture_output=True, text=True)
+    except FileNotFoundError:
+        return None
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip()
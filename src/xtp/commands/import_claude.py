@@ -0,0 +1,62 @@
+"""Import an existing Claude Code config (~/.claude) into a profile."""
+
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+
+from xtp import config, fileops
+from xtp.commands.du import format_size
+
+
+def run(
+    name: str, source: str | None = None, hardlink: bool = False, jobs: int | None = None,
+) -> None:
+    if not config.profile_toml(name).is_file():
+        print(f"Error: Profile '{name}' not found.")
+        raise SystemExit(1)
+
+    src = Path(source).expanduser() if source else Path.home() / ".claude"
+    if not src.is_dir():
+        print(f"Error: {src} is not a directory.")
+        raise SystemExit(1)
+    dst = config.profile_dir(name) / "claude"
+
+    print(f"Importing {src} into profile '{name}'...")
+    stats = fileops.sync_tree(src, dst, hardlink=hardlink, jobs=jobs, progress=_progress())
+    config.seed_claude_config(name)
+
+    parts = [f"{stats.written:,} written"]
+    if stats.cloned:
+        parts.append(f"{stats.cloned:,} cloned")
+    if stats.linked:
+        parts.append(f"{stats.linked:,} hard-linked")
+    parts.append(f"{stats.unchanged:,} unchanged")
+    print(f"{stats.files:,} files: {', '.join(parts)} ({format_size(stats.bytes)})")
+
+    if stats.errors:
+        for error in stats.errors[:10]:
+            print(f"  Error: {error}")
+        if len(stats.errors) > 10:
+            print(f"  ... and {len(stats.errors) - 10} more")
+        print("Re-run to retry; files already imported are skipped.")
+        raise SystemExit(1)
+
+
+def _progress():
+    """Return a progress callback that redraws one stderr line, or None off a TTY."""
+    if not sys.stderr.isatty():
+        return None
+    last = 0.0
+
+    def report(done: int, total: int, nbytes: int) -> None:
+        nonlocal last
+        now = time.monotonic()
+        if done < total and now - last < 0.1:
+            return
+        last = now
+        end = "\n" if done == total else ""
+        print(f"\r  {done:,}/{total:,} files  {format_size(nbytes)}", end=end, file=sys.stderr, flush=True)
+
+    return report
@@ -7,7 +7,7 @@ import subprocess
 import sys
 from pathlib import Path
 
-from xtp import config
+from xtp import config, model
 
 
 def run_gh(name: str) -> None:
@@ -37,12 +37,11 @@ def run_gh(name: str) -> None:
 def run_ssh(name: str) -> None:
     """Generate a new SSH key pair for the profile."""
     try:
-        cfg = config.load_profile(name)
+        email = model.load(name).git.author_email
     except FileNotFoundError:
         print(f"Error: Profile '{name}' not found.")
         raise SystemExit(1)
 
-    email = cfg.get("git", {}).get("author_email", "")
     default_path = Path.home() / ".ssh" / f"id_ed25519_{name}"
 
     path_input = input(f"SSH key path [{default_path}]: ").strip()
@@ -61,9 +60,12 @@ def run_ssh(name: str) -> None:
     if result.returncode != 0:
         raise SystemExit(result.returncode)
 
-    # Update profile with the new key path
-    cfg.setdefault("git", {})["ssh_key"] = str(key_path)
-    config.save_profile(name, cfg)
+    # Update profile with the new key path. Re-read it under the lock: it
+    # may have been edited while ssh-keygen was prompting.
+    with config.profile_lock(name):
+        cfg = config.load_profile(name)
+        cfg.setdefault("git", {})["ssh_key"] = str(key_path)
+        config.save_profile(name, cfg)
 
     pub_key = key_path.with_suffix(".pub").read_text().strip()
     print(f"\nSSH key generated: {key_path}")
@@ -4,22 +4,21 @@ from __future__ import annotations
 
 import os
 
-from xtp import config
+from xtp import index
 
 
 def run() -> None:
-    profiles = config.list_profiles()
+    report(index.load(), os.environ.get("XTP_PROFILE", ""))
+
+
+def report(profiles: dict[str, dict], active: str) -> None:
+    """Print the profile list, marking *active*."""
     if not profiles:
         print("No profiles found. Create one with: xtp create <name>")
         return
 
-    active = os.environ.get("XTP_PROFILE", "")
-    for name in profiles:
-        try:
-            cfg = config.load_profile(name)
-            desc = cfg.get("profile", {}).get("description", "")
-        except Exception:
-            desc = ""
+    for name, entry in profiles.items():
+        desc = entry.get("description", "")
 
         marker = " *" if name == active else ""
         desc_part = f"  ({desc})" if desc else ""
@@ -0,0 +1,48 @@
+"""Search Claude Code transcripts, one profile's or every profile's."""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+
+from xtp import config, search
+from xtp.fileops import default_jobs
+
+
+def run(
+    query: str,
+    name: str | None = None,
+    all_profiles: bool = False,
+    limit: int = 20,
+    raw: bool = False,
+    reindex: bool = False,
+) -> None:
+    if all_profiles:
+        names = config.list_profiles()
+    else:
+        if not config.profile_toml(name).is_file():
+            print(f"Error: Profile '{name}' not found.")
+            raise SystemExit(1)
+        names = [name]
+
+    # Updating is mostly file reads and SQLite work, so profiles overlap well.
+    with ThreadPoolExecutor(max_workers=default_jobs()) as pool:
+        updates = list(pool.map(lambda n: search.update(n, rebuild=reindex), names))
+    for profile, stats in zip(names, updates):
+        for error in stats.errors:
+            print(f"Warning: {profile}: {error}")
+
+    found = 0
+    for profile in names:
+        try:
+            hits = search.search(profile, query, limit=limit, raw=raw)
+        except ValueError as e:
+            print(f"Error: invalid query: {e}")
+            raise SystemExit(1)
+        for hit in hits:
+            prefix = f"{profile}  " if all_profiles else ""
+            print(f"{prefix}{hit.path}:{hit.offset}  {hit.timestamp[:10]}  {hit.role}")
+            print(f"    {' '.join(hit.snippet.split())}")
+        found += len(hits)
+    if not found:
+        print("No matches.")
+        raise SystemExit(1)
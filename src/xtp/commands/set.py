@@ -0,0 +1,59 @@
+"""Change profile.toml keys across profiles, with a diff preview."""
+
+from __future__ import annotations
+
+import fnmatch
+
+from xtp import bulk, config
+
+
+def run(
+    assignments: list[str],
+    pattern: str | None = None,
+    all_profiles: bool = False,
+    where: list[str] | None = None,
+    dry_run: bool = False,
+    rollback: bool = False,
+    jobs: int | None = None,
+) -> None:
+    if rollback:
+        restored = bulk.recover()
+        for name in restored:
+            print(f"Restored '{name}'")
+        if not restored:
+            print("Nothing to roll back.")
+        return
+
+    names = config.list_profiles()
+    if not all_profiles:
+        names = [n for n in names if fnmatch.fnmatchcase(n, pattern)]
+        if not names:
+            print(f"Error: no profile matches '{pattern}'.")
+            raise SystemExit(1)
+    try:
+        changes, errors = bulk.plan(names, assignments, where)
+    except ValueError as e:
+        print(f"Error: {e}")
+        raise SystemExit(1)
+    for error in errors:
+        print(f"Error: {error}")
+    if errors:
+        print("Nothing changed.")
+        raise SystemExit(1)
+
+    for change in changes:
+        print("".join(change.diff()), end="")
+    if not changes:
+        print("No profile needs changing.")
+        return
+    if dry_run:
+        print(f"Would update {len(changes)} profile(s).")
+        return
+
+    try:
+        bulk.apply(changes, jobs=jobs)
+    except (bulk.Conflict, OSError) as e:
+        print(f"Error: {e}")
+        print("Nothing changed.")
+        raise SystemExit(1)
+    print(f"Updated {len(changes)} profile(s).")
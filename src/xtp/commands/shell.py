@@ -3,10 +3,42 @@
 from __future__ import annotations
 
 import os
-import subprocess
 import sys
+from pathlib import Path
 
-from xtp import config
+from xtp import activate, config
+
+# Startup files for the profile shell. zsh reads them from $ZDOTDIR; they
+# source the user's own files and add a zshexit hook that resets the iTerm2
+# tab, so no Python process needs to wait around for the shell to exit.
+_ZSHENV = """\
+# Auto-generated by xtp for profile: {name}
+_xtp_user_zdotdir="${{XTP_USER_ZDOTDIR:-$HOME}}"
+if [[ -f "$_xtp_user_zdotdir/.zshenv" ]]; then
+  _xtp_zdotdir="$ZDOTDIR"
+  ZDOTDIR="$_xtp_user_zdotdir"
+  source "$_xtp_user_zdotdir/.zshenv"
+  ZDOTDIR="$_xtp_zdotdir"
+  unset _xtp_zdotdir
+fi
+unset _xtp_user_zdotdir
+"""
+
+_ZSHRC = """\
+# Auto-generated by xtp for profile: {name}
+# Hand ZDOTDIR back to the user so nested shells use their own files.
+if [[ -n "$XTP_USER_ZDOTDIR" ]]; then
+  ZDOTDIR="$XTP_USER_ZDOTDIR"
+else
+  unset ZDOTDIR
+fi
+unset XTP_USER_ZDOTDIR
+[[ -f "${{ZDOTDIR:-$HOME}}/.zshrc" ]] && source "${{ZDOTDIR:-$HOME}}/.zshrc"
+
+# Reset iTerm2 tab color and title on exit
+_xtp_reset_tab() {{ print -n '\\e]6;1;bg;*;default\\a\\e]1;\\a'; }}
+zshexit_functions+=(_xtp_reset_tab)
+"""
 
 
 def run(name: str) -> None:
@@ -20,24 +52,37 @@ def run(name: str) -> None:
     # Regenerate browser script if Chrome profile is configured
     config.generate_browser_script(name)
 
-    # Build full environment: inherit current env, overlay profile vars
-    full_env = {**os.environ, **env}
-    # Always clear GITHUB_TOKEN so it can't leak across profiles;
+    # Build full environment: inherit current env with any variables set
+    # by an outer profile put back as they were, overlay profile vars.
+    # switched also clears GITHUB_TOKEN so it can't leak across profiles;
     # gh auth should come from GH_CONFIG_DIR/hosts.yml instead.
-    full_env.pop("GITHUB_TOKEN", None)
+    full_env = activate.switched(dict(os.environ), env)
+    full_env["XTP_USER_ZDOTDIR"] = os.environ.get("ZDOTDIR", "")
+    full_env["ZDOTDIR"] = str(write_zdotdir(name))
 
     print(f"Entering xtp shell: {name}")
     print(f"Type 'exit' to return to your normal shell.\n")
+    sys.stdout.flush()
 
     # Set iTerm2 tab title to the profile name
     os.write(1, f"\033]1;{name}\007".encode())
 
-    result = subprocess.run(
-        ["zsh"],
-        env=full_env,
-    )
+    # Replace this process with zsh: the shell's exit code becomes ours and
+    # no Python interpreter stays resident for the life of the shell.
+    try:
+        os.execvpe("zsh", ["zsh"], full_env)
+    except OSError as e:
+        print(f"Error: could not start zsh: {e}", file=sys.stderr)
+        raise SystemExit(127)
 
-    # Reset iTerm2 tab color and title on exit
-    os.write(1, b"\033]6;1;bg;*;default\007\033]1;\007")
 
-    sys.exit(result.returncode)
+def write_zdotdir(name: str) -> Path:
+    """Write the profile's ZDOTDIR startup files and return the directory."""
+    zdotdir = config.profile_dir(name) / "zdotdir"
+    zdotdir.mkdir(exist_ok=True)
+    for filename, template in ((".zshenv", _ZSHENV), (".zshrc", _ZSHRC)):
+        path = zdotdir / filename
+        text = template.format(name=name)
+        if not path.is_file() or path.read_text() != text:
+            config.write_atomic(path, text)
+    return zdotdir
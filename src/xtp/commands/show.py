@@ -2,39 +2,57 @@
 
 from __future__ import annotations
 
-from xtp import config
+from dataclasses import fields
+
+from xtp import config, model
 
 
 def run(name: str) -> None:
     try:
-        cfg = config.load_profile(name)
+        profile = model.load(name)
     except FileNotFoundError:
         print(f"Error: Profile '{name}' not found.")
         raise SystemExit(1)
+    report(profile, config.build_env(name))
+
 
-    desc = cfg.get("profile", {}).get("description", "")
+def report(profile: model.Profile, env: dict[str, str]) -> None:
+    """Print a loaded profile and the environment it builds."""
+    name = profile.name
+    desc = profile.profile.description
     print(f"Profile: {name}")
     if desc:
         print(f"Description: {desc}")
     print(f"Config: {config.profile_toml(name)}")
     print()
 
-    # Show config sections
-    for section in ("git", "chrome", "aws", "npm"):
-        if section in cfg and cfg[section]:
+    # Show config sections, leaving out unset values
+    for section in ("git", "chrome", "aws", "npm", "gcloud"):
+        values = getattr(profile, section)
+        defaults = type(values)()
+        items = [
+            (f.name, getattr(values, f.name)) for f in fields(values)
+            if getattr(values, f.name) != getattr(defaults, f.name)
+        ]
+        if items:
             print(f"[{section}]")
-            for key, value in cfg[section].items():
+            for key, value in items:
                 print(f"  {key} = {value}")
             print()
 
-    if "env" in cfg and cfg["env"]:
+    if profile.env:
         print("[env]")
-        for key, value in cfg["env"].items():
+        for key, value in profile.env.items():
             print(f"  {key} = {value}")
         print()
 
     # Show environment variables that would be set
-    env = config.build_env(name)
     print("Environment variables:")
     for key in sorted(env):
         print(f"  {key}={env[key]}")
+
+    if profile.diagnostics:
+        print()
+        print("Warnings (ignored in profile.toml):")
+        for diagnostic in profile.diagnostics:
+            print(f"  {diagnostic}")
@@ -0,0 +1,105 @@
+"""Link skills from the shared store into profiles."""
+
+from __future__ import annotations
+
+import os
+
+from xtp import config, skills
+
+
+def run(
+    action: str, args: list[str] | None = None, all_profiles: bool = False, hardlink: bool = False,
+) -> None:
+    args = list(args or [])
+    if action == "list" and not args and not all_profiles:
+        _list_store()
+        return
+
+    if all_profiles:
+        names = config.list_profiles()
+    else:
+        name = args.pop(0) if args else os.environ.get("XTP_PROFILE")
+        if not name:
+            print("Error: no profile name given and not inside an xtp shell.")
+            raise SystemExit(1)
+        if not config.profile_toml(name).is_file():
+            print(f"Error: Profile '{name}' not found.")
+            raise SystemExit(1)
+        names = [name]
+
+    if action in ("link", "unlink") and not args:
+        print(f"Error: name the skills to {action}. Available: {', '.join(skills.available()) or 'none'}")
+        raise SystemExit(1)
+
+    failed = False
+    for name in names:
+        if action == "list":
+            _list_profile(name)
+        elif action == "link":
+            failed |= _link(name, args, hardlink)
+        elif action == "unlink":
+            failed |= _unlink(name, args, strict=not all_profiles)
+        elif action == "sync":
+            for skill, what in skills.sync(name):
+                print(f"{name}: {skill} {what}")
+    if failed:
+        raise SystemExit(1)
+
+
+def _list_store() -> None:
+    available = skills.available()
+    if not available:
+        print(f"No shared skills. Put skill directories in {skills.store_dir()}")
+        return
+    users: dict[str, list[str]] = {skill: [] for skill in available}
+    for name in config.list_profiles():
+        for link in skills.links(name):
+            users.setdefault(link.skill, []).append(name)
+    width = max(len(skill) for skill in available)
+    for skill in available:
+        print(f"  {skill:<{width}}  {', '.join(users[skill]) or '-'}")
+
+
+def _list_profile(name: str) -> None:
+    links = skills.links(name)
+    print(f"{name}")
+    if not links:
+        print("  (no shared skills linked)")
+        return
+    width = max(len(link.skill) for link in links)
+    for link in links:
+        status = "" if link.status == skills.OK else f"  ({link.status})"
+        print(f"  {link.skill:<{width}}  {link.kind}{status}")
+
+
+def _link(name: str, names: list[str], hardlink: bool) -> bool:
+    failed = False
+    for skill in names:
+        try:
+            skills.link(name, skill, hardlink=hardlink)
+        except KeyError:
+            print(f"Error: no skill '{skill}' in {skills.store_dir()}")
+            failed = True
+        except FileExistsError as e:
+            print(f"Error: {e} is the profile's own skill; remove it first to link the shared one.")
+            failed = True
+        except OSError as e:
+            print(f"Error: linking {skill} into {name}: {e.strerror or e}")
+            failed = True
+        else:
+            print(f"{name}: linked {skill}")
+    return failed
+
+
+def _unlink(name: str, names: list[str], strict: bool) -> bool:
+    failed = False
+    for skill in names:
+        try:
+            skills.unlink(name, skill)
+        except KeyError:
+            if strict:
+                print(f"Error: {skill} isn't a shared skill linked into {name}.")
+                failed = True
+        else:
+            print(f"{name}: unlinked {skill}")
+    return failed
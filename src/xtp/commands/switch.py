@@ -0,0 +1,24 @@
+"""Switch the current shell to another profile in place."""
+
+from __future__ import annotations
+
+import os
+import sys
+
+from xtp import activate, config
+
+
+def run(name: str, shell: str | None = None) -> None:
+    try:
+        env = config.build_env(name)
+    except FileNotFoundError:
+        print(f"Error: Profile '{name}' not found.", file=sys.stderr)
+        raise SystemExit(1)
+
+    shell = shell or activate.default_shell()
+    if sys.stdout.isatty():
+        if shell == "fish":
+            print(f"# Run: xtp switch {name} --shell fish | source", file=sys.stderr)
+        else:
+            print(f'# Run: eval "$(xtp switch {name})"', file=sys.stderr)
+    sys.stdout.write(activate.render_switch(dict(os.environ), env, shell))
@@ -1,170 +1,520 @@
-"""Profile health check."""
+"""Profile health check.
+
+Checks are declared as units with dependencies and run on a thread pool:
+independent checks (notably the two network round-trips) run at the same
+time, a check whose dependency failed is skipped without running, and
+results are still printed in declaration order.
+
+``xtp verify --all`` verifies many profiles concurrently. Expensive
+lookups (Chrome's Local State, SSH and gh round-trips) go through a shared
+Lookups object, so they run once per distinct input rather than once per
+profile.
+
+Successful network results are also cached per profile for a TTL
+(``[verify] cache_ttl`` in the global config, default 300 s), keyed by
+everything that could change them; ``--fresh`` bypasses the cache.
+"""
 
 from __future__ import annotations
 
+import fnmatch
+import hashlib
+import json
 import os
+import shutil
 import subprocess
+import threading
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
 from pathlib import Path
 
-from xtp import config
+from xtp import config, model, skills, usage
 from xtp.commands.chrome import get_chrome_profiles
 
 PASS = "\u2713"  # ✓
 FAIL = "\u2717"  # ✗
 WARN = "!"
 
+CACHE_NAME = ".verify-cache.json"
+DEFAULT_CACHE_TTL = 300
 
-def run(name: str) -> None:
-    print(f"Verifying profile: {name}\n")
 
-    passed = 0
-    failed = 0
-    warned = 0
-
-    def check(label: str, ok: bool, detail: str = "", critical: bool = True) -> None:
-        nonlocal passed, failed, warned
-        if ok:
-            passed += 1
-            msg = f"  [{PASS}] {label}"
-            if detail:
-                msg += f" ({detail})"
-            print(msg)
-        elif critical:
-            failed += 1
-            msg = f"  [{FAIL}] {label}"
-            if detail:
-                msg += f" ({detail})"
-            print(msg)
+@dataclass(frozen=True)
+class Result:
+    label: str
+    ok: bool
+    detail: str = ""
+    critical: bool = True
+
+
+class Lookups:
+    """Memoized expensive lookups, shared by every profile in one run.
+
+    Concurrent callers asking for the same key wait for the first caller's
+    result instead of repeating the work.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_CACHE_TTL, fresh: bool = False) -> None:
+        self.ttl = ttl
+        self.fresh = fresh
+        self._lock = threading.Lock()
+        self._futures: dict[tuple, Future] = {}
+
+    def memo(self, key: tuple, func: Callable[[], object]) -> object:
+        with self._lock:
+            future = self._futures.get(key)
+            owner = future is None
+            if owner:
+                future = self._futures[key] = Future()
+        if owner:
+            try:
+                future.set_result(func())
+            except BaseException as e:
+                future.set_exception(e)
+        return future.result()
+
+    def chrome_profiles(self) -> list[tuple[str, str]]:
+        return self.memo(("chrome",), get_chrome_profiles)
+
+    def ssh_github(self, key_path: Path) -> tuple[bool, str]:
+        return self.memo(("ssh", key_fingerprint(key_path)), lambda: _ssh_github(key_path))
+
+    def gh_auth(self, gh_dir: Path) -> tuple[bool, str]:
+        return self.memo(("gh", str(gh_dir.resolve())), lambda: _gh_auth(gh_dir))
+
+    def tool(self, command: str) -> list | None:
+        """Identify the installed *command* by resolved path, mtime and size."""
+        return self.memo(("tool", command), lambda: _tool_key(command))
+
+
+def _tool_key(command: str) -> list | None:
+    path = shutil.which(command)
+    if path is None:
+        return None
+    path = os.path.realpath(path)
+    return [path, *config.stat_key(os.stat(path))]
+
+
+def _mtime(path: Path) -> int | None:
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+class ResultCache:
+    """Per-profile cache of successful network check results.
+
+    Failures are never cached, so a cached entry can only ever say that
+    something worked within the last TTL seconds with identical inputs.
+    """
+
+    def __init__(self, pdir: Path, ttl: float, fresh: bool = False) -> None:
+        self.path = pdir / CACHE_NAME
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._data: dict = {} if fresh or ttl <= 0 else self._read()
+
+    def get(self, check_id: str, key: list) -> tuple[str, float] | None:
+        """Return (detail, age in seconds) for a live entry matching *key*."""
+        with self._lock:
+            entry = self._data.get(check_id)
+        if not entry or entry.get("key") != key:
+            return None
+        age = time.time() - entry.get("time", 0)
+        if not 0 <= age < self.ttl:
+            return None
+        return entry.get("detail", ""), age
+
+    def put(self, check_id: str, key: list, detail: str) -> None:
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._data[check_id] = {"key": key, "time": time.time(), "detail": detail}
+            try:
+                config.write_atomic(self.path, json.dumps(self._data))
+            except OSError:
+                pass  # caching is best-effort
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path, "rb") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+
+def _age(seconds: float) -> str:
+    if seconds < 60:
+        return f"{int(seconds)}s"
+    return f"{int(seconds // 60)}m"
+
+
+def key_fingerprint(key_path: Path) -> str:
+    """Identify an SSH key by content, preferring its public half."""
+    pub = key_path.with_name(key_path.name + ".pub")
+    source = pub if pub.is_file() else key_path
+    return hashlib.sha256(source.read_bytes().strip()).hexdigest()
+
+
+@dataclass
+class Context:
+    """Inputs shared by all checks of one profile."""
+
+    name: str
+    profile: model.Profile
+    pdir: Path
+    lookups: Lookups = field(default_factory=Lookups)
+    cache: ResultCache | None = None
+
+    def cached(
+        self, check_id: str, key: list, label: str, compute: Callable[[], tuple[bool, str]],
+    ) -> Result:
+        """Return a cached successful result for *check_id*, or compute one."""
+        if self.cache is not None:
+            hit = self.cache.get(check_id, key)
+            if hit is not None:
+                detail, age = hit
+                return Result(label, True, f"{detail}, cached {_age(age)} ago", critical=False)
+        ok, detail = compute()
+        if ok and self.cache is not None:
+            self.cache.put(check_id, key, detail)
+        return Result(label, ok, detail, critical=False)
+
+    @property
+    def git(self) -> model.Git:
+        return self.profile.git
+
+    @property
+    def ssh_key(self) -> Path | None:
+        key = self.git.ssh_key
+        return Path(key).expanduser() if key else None
+
+
+@dataclass(frozen=True)
+class Check:
+    """A named check; *skipped* is reported if any of *requires* failed."""
+
+    id: str
+    func: Callable[[Context], Result]
+    requires: tuple[str, ...] = ()
+    skipped: Result | None = None
+
+
+# ── Checks ─────────────────────────────────────────────────────────────────
+
+def check_claude_dir(ctx: Context) -> Result:
+    claude_dir = ctx.pdir / "claude"
+    if not claude_dir.is_dir():
+        return Result("Claude Code config dir exists", False, "directory missing")
+    count = usage.scan(ctx.pdir).get("claude", usage.Usage()).files
+    return Result("Claude Code config dir exists", True, f"{count} files")
+
+
+def check_git_identity(ctx: Context) -> Result:
+    git_name = ctx.git.author_name
+    git_email = ctx.git.author_email
+    if git_name and git_email:
+        return Result("Git identity", True, f"{git_name} <{git_email}>")
+    return Result("Git identity", False, "author_name or author_email missing")
+
+
+def check_ssh_key(ctx: Context) -> Result:
+    key_path = ctx.ssh_key
+    if key_path is None:
+        return Result("SSH key configured", False, "no ssh_key in config")
+    return Result("SSH key exists", key_path.is_file(), str(key_path))
+
+
+def _ssh_github(key_path: Path) -> tuple[bool, str]:
+    try:
+        result = subprocess.run(
+            ["ssh", "-T", "-i", str(key_path), "-o", "IdentitiesOnly=yes",
+             "-o", "StrictHostKeyChecking=accept-new",
+             "git@github.com"],
+            capture_output=True, text=True, timeout=10,
+        )
+    except subprocess.TimeoutExpired:
+        return False, "timeout"
+    # ssh -T git@github.com exits 1 on success with "successfully authenticated"
+    auth_ok = "successfully authenticated" in result.stderr
+    return auth_ok, "authenticated" if auth_ok else result.stderr.strip()[:80]
+
+
+def check_ssh_github(ctx: Context) -> Result:
+    key_path = ctx.ssh_key
+    key = [key_fingerprint(key_path), _mtime(key_path), ctx.lookups.tool("ssh")]
+    return ctx.cached("ssh_github", key, "SSH connects to GitHub",
+                      lambda: ctx.lookups.ssh_github(key_path))
+
+
+def check_gh_dir(ctx: Context) -> Result:
+    return Result("GitHub CLI config dir exists", (ctx.pdir / "gh").is_dir())
+
+
+def _gh_auth(gh_dir: Path) -> tuple[bool, str]:
+    try:
+        gh_env = {**os.environ, "GH_CONFIG_DIR": str(gh_dir)}
+        result = subprocess.run(
+            ["gh", "auth", "status"],
+            capture_output=True, text=True, timeout=10, env=gh_env,
+        )
+    except (FileNotFoundError, subprocess.TimeoutExpired):
+        return False, "gh not found or timeout"
+    auth_ok = result.returncode == 0
+    return auth_ok, "logged in" if auth_ok else "not authenticated"
+
+
+def check_gh_auth(ctx: Context) -> Result:
+    gh_dir = ctx.pdir / "gh"
+    key = [str(gh_dir), _mtime(gh_dir / "hosts.yml"), ctx.lookups.tool("gh")]
+    return ctx.cached("gh_auth", key, "GitHub CLI authenticated",
+                      lambda: ctx.lookups.gh_auth(gh_dir))
+
+
+def check_chrome_profile(ctx: Context) -> Result:
+    chrome_dir = ctx.profile.chrome.profile_directory
+    if not chrome_dir:
+        return Result("Chrome profile configured", False, "no chrome section in config")
+    profiles = ctx.lookups.chrome_profiles()
+    profile_dirs = {d for d, _ in profiles}
+    display = dict(profiles).get(chrome_dir, chrome_dir)
+    return Result(f'Chrome profile "{chrome_dir}" exists', chrome_dir in profile_dirs, display)
+
+
+def check_browser_wrapper(ctx: Context) -> Result:
+    if not ctx.profile.chrome.profile_directory:
+        return Result("Browser wrapper script", False, "skipped (no chrome config)",
+                      critical=False)
+    browser_script = ctx.pdir / "browser.sh"
+    ok = browser_script.is_file() and os.access(browser_script, os.X_OK)
+    return Result("Browser wrapper script exists and is executable", ok)
+
+
+def check_aws(ctx: Context) -> Result:
+    if not ctx.profile.aws.profile:
+        return Result("AWS config", True, "not configured, skipped")
+    return Result("AWS config dir exists", (ctx.pdir / "aws").is_dir())
+
+
+def check_npm(ctx: Context) -> Result:
+    if not ctx.profile.npm.isolate:
+        return Result("npm config", True, "not configured, skipped")
+    return Result("npm config exists", (ctx.pdir / "npmrc").is_file())
+
+
+def check_skills(ctx: Context) -> Result:
+    links = skills.links(ctx.name)
+    if not links:
+        return Result("Shared skills", True, "none linked")
+    bad = [f"{link.skill} ({link.status})" for link in links if link.status != skills.OK]
+    if bad:
+        return Result("Shared skills linked", False,
+                      f"{', '.join(bad)}; run: xtp skills sync {ctx.name}", critical=False)
+    return Result("Shared skills linked", True, f"{len(links)} linked")
+
+
+CHECKS: tuple[Check, ...] = (
+    Check("claude_dir", check_claude_dir),
+    Check("git_identity", check_git_identity),
+    Check("ssh_key", check_ssh_key),
+    Check("ssh_github", check_ssh_github, requires=("ssh_key",),
+          skipped=Result("SSH connects to GitHub", False, "skipped (no key)", critical=False)),
+    Check("gh_dir", check_gh_dir),
+    Check("gh_auth", check_gh_auth, requires=("gh_dir",),
+          skipped=Result("GitHub CLI authenticated", False, "no gh config dir", critical=False)),
+    Check("chrome_profile", check_chrome_profile),
+    Check("browser_wrapper", check_browser_wrapper),
+    Check("aws", check_aws),
+    Check("npm", check_npm),
+    Check("skills", check_skills),
+)
+
+
+# ── Scheduler ──────────────────────────────────────────────────────────────
+
+def schedule(
+    checks: tuple[Check, ...], ctx: Context, executor: ThreadPoolExecutor,
+) -> Iterator[Result]:
+    """Run *checks* on *executor*, yielding results in declaration order.
+
+    A check is submitted as soon as all of its requirements passed; if any
+    requirement failed it is resolved to its *skipped* result immediately.
+    """
+    order = [c.id for c in checks]
+    by_id = {c.id: c for c in checks}
+    unknown = {r for c in checks for r in c.requires} - by_id.keys()
+    if unknown:
+        raise ValueError(f"Unknown check requirements: {sorted(unknown)}")
+
+    results: dict[str, Result] = {}
+    running: dict[Future, str] = {}
+    waiting = list(order)
+    emitted = 0
+
+    def _skip_result(check: Check) -> Result:
+        return check.skipped or Result(check.id, False, "skipped (requirement failed)")
+
+    while emitted < len(order):
+        # Resolve everything whose requirements are settled.
+        progressed = True
+        while progressed:
+            progressed = False
+            for cid in list(waiting):
+                check = by_id[cid]
+                if any(r not in results for r in check.requires):
+                    continue
+                waiting.remove(cid)
+                progressed = True
+                if all(results[r].ok for r in check.requires):
+                    running[executor.submit(check.func, ctx)] = cid
+                else:
+                    results[cid] = _skip_result(check)
+
+        while emitted < len(order) and order[emitted] in results:
+            yield results[order[emitted]]
+            emitted += 1
+
+        if running and emitted < len(order):
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                cid = running.pop(future)
+                try:
+                    results[cid] = future.result()
+                except Exception as e:
+                    results[cid] = Result(cid, False, f"check crashed: {e}")
+        elif waiting and not running:
+            raise ValueError(f"Circular check requirements: {waiting}")
+
+
+# ── Command ────────────────────────────────────────────────────────────────
+
+CONFIG_LABEL = "Profile config exists and is valid"
+
+
+@dataclass
+class Tally:
+    passed: int = 0
+    failed: int = 0
+    warned: int = 0
+
+    def add(self, result: Result) -> str:
+        """Count *result* and return its formatted output line."""
+        if result.ok:
+            self.passed += 1
+            mark = PASS
+        elif result.critical:
+            self.failed += 1
+            mark = FAIL
         else:
-            warned += 1
-            msg = f"  [{WARN}] {label}"
-            if detail:
-                msg += f" ({detail})"
-            print(msg)
+            self.warned += 1
+            mark = WARN
+        msg = f"  [{mark}] {result.label}"
+        if result.detail:
+            msg += f" ({result.detail})"
+        return msg
 
-    # 1. Profile config
+    def summary(self) -> str:
+        total = self.passed + self.failed + self.warned
+        summary = f"{self.passed}/{total} checks passed"
+        if self.warned:
+            summary += f", {self.warned} warnings"
+        if self.failed == 0:
+            summary += f" {PASS}"
+        else:
+            summary += f" ({self.failed} failed)"
+        return summary
+
+
+def verify_profile(
+    name: str, lookups: Lookups, executor: ThreadPoolExecutor,
+) -> Iterator[Result]:
+    """Yield the results for *name*; stops after the config check if it fails."""
+    # 1. Profile config — everything else needs it, so it runs first.
     try:
-        cfg = config.load_profile(name)
-        check("Profile config exists and is valid", True)
+        profile = model.load(name)
     except Exception as e:
-        check("Profile config exists and is valid", False, str(e))
-        print(f"\n  0 checks passed (config unreadable)")
-        raise SystemExit(1)
+        yield Result(CONFIG_LABEL, False, str(e))
+        return
+    yield Result(CONFIG_LABEL, True)
+    if profile.diagnostics:
+        yield Result("Profile config keys", False,
+                     "; ".join(str(d) for d in profile.diagnostics), critical=False)
 
     pdir = config.profile_dir(name)
+    cache = ResultCache(pdir, lookups.ttl, fresh=lookups.fresh)
+    ctx = Context(name=name, profile=profile, pdir=pdir, lookups=lookups, cache=cache)
+    yield from schedule(CHECKS, ctx, executor)
+
+
+def cache_ttl(ttl: float | None = None) -> float:
+    """Return *ttl* or the global config's [verify] cache_ttl."""
+    if ttl is not None:
+        return ttl
+    return config.load_global().get("verify", {}).get("cache_ttl", DEFAULT_CACHE_TTL)
+
+
+def run(name: str, fresh: bool = False, ttl: float | None = None) -> None:
+    print(f"Verifying profile: {name}\n")
+
+    tally = Tally()
+    lookups = Lookups(ttl=cache_ttl(ttl), fresh=fresh)
+    with ThreadPoolExecutor(max_workers=len(CHECKS)) as executor:
+        for result in verify_profile(name, lookups, executor):
+            print(tally.add(result), flush=True)
+            if result.label == CONFIG_LABEL and not result.ok:
+                print(f"\n  0 checks passed (config unreadable)")
+                raise SystemExit(1)
 
-    # 2. Claude config dir
-    claude_dir = pdir / "claude"
-    if claude_dir.is_dir():
-        count = sum(1 for _ in claude_dir.rglob("*") if _.is_file())
-        check("Claude Code config dir exists", True, f"{count} files")
-    else:
-        check("Claude Code config dir exists", False, "directory missing")
-
-    # 3. Git identity
-    git = cfg.get("git", {})
-    git_name = git.get("author_name", "")
-    git_email = git.get("author_email", "")
-    if git_name and git_email:
-        check("Git identity", True, f"{git_name} <{git_email}>")
-    else:
-        check("Git identity", False, "author_name or author_email missing")
-
-    # 4. SSH key
-    ssh_key = git.get("ssh_key", "")
-    if ssh_key:
-        key_path = Path(ssh_key).expanduser()
-        check("SSH key exists", key_path.is_file(), str(key_path))
-    else:
-        check("SSH key configured", False, "no ssh_key in config")
-
-    # 5. SSH GitHub connectivity
-    if ssh_key and Path(ssh_key).expanduser().is_file():
-        key_path = str(Path(ssh_key).expanduser())
-        try:
-            result = subprocess.run(
-                ["ssh", "-T", "-i", key_path, "-o", "IdentitiesOnly=yes",
-                 "-o", "StrictHostKeyChecking=accept-new",
-                 "git@github.com"],
-                capture_output=True, text=True, timeout=10,
-            )
-            # ssh -T git@github.com exits 1 on success with "successfully authenticated"
-            auth_ok = "successfully authenticated" in result.stderr
-            check("SSH connects to GitHub", auth_ok,
-                  "authenticated" if auth_ok else result.stderr.strip()[:80],
-                  critical=False)
-        except subprocess.TimeoutExpired:
-            check("SSH connects to GitHub", False, "timeout", critical=False)
-    else:
-        check("SSH connects to GitHub", False, "skipped (no key)", critical=False)
-
-    # 6. GH CLI config dir
-    gh_dir = pdir / "gh"
-    check("GitHub CLI config dir exists", gh_dir.is_dir())
-
-    # 7. GH CLI auth
-    if gh_dir.is_dir():
-        try:
-            gh_env = {**os.environ, "GH_CONFIG_DIR": str(gh_dir)}
-            result = subprocess.run(
-                ["gh", "auth", "status"],
-                capture_output=True, text=True, timeout=10, env=gh_env,
-            )
-            auth_ok = result.returncode == 0
-            check("GitHub CLI authenticated", auth_ok,
-                  "logged in" if auth_ok else "not authenticated",
-                  critical=False)
-        except (FileNotFoundError, subprocess.TimeoutExpired):
-            check("GitHub CLI authenticated", False, "gh not found or timeout", critical=False)
-    else:
-        check("GitHub CLI authenticated", False, "no gh config dir", critical=False)
-
-    # 8. Chrome profile
-    chrome = cfg.get("chrome", {})
-    chrome_dir = chrome.get("profile_directory", "")
-    if chrome_dir:
-        profiles = get_chrome_profiles()
-        profile_dirs = {d for d, _ in profiles}
-        display = dict(profiles).get(chrome_dir, chrome_dir)
-        check(f'Chrome profile "{chrome_dir}" exists', chrome_dir in profile_dirs, display)
-    else:
-        check("Chrome profile configured", False, "no chrome section in config")
-
-    # 9. Browser wrapper
-    browser_script = pdir / "browser.sh"
-    if chrome_dir:
-        ok = browser_script.is_file() and os.access(browser_script, os.X_OK)
-        check("Browser wrapper script exists and is executable", ok)
-    else:
-        check("Browser wrapper script", False, "skipped (no chrome config)", critical=False)
-
-    # 10. AWS config
-    aws = cfg.get("aws", {})
-    if aws.get("profile"):
-        aws_dir = pdir / "aws"
-        check("AWS config dir exists", aws_dir.is_dir())
-    else:
-        check("AWS config", True, "not configured, skipped")
-
-    # 11. npm config
-    npm = cfg.get("npm", {})
-    if npm.get("isolate"):
-        npmrc = pdir / "npmrc"
-        check("npm config exists", npmrc.is_file())
-    else:
-        check("npm config", True, "not configured, skipped")
-
-    # Summary
-    total = passed + failed + warned
     print(f"  {'─' * 35}")
-    summary = f"  {passed}/{total} checks passed"
-    if warned:
-        summary += f", {warned} warnings"
-    if failed == 0:
-        summary += f" {PASS}"
-    else:
-        summary += f" ({failed} failed)"
-    print(summary)
-
-    if failed > 0:
+    print(f"  {tally.summary()}")
+
+    if tally.failed > 0:
+        raise SystemExit(1)
+
+
+def run_all(
+    pattern: str | None = None, jobs: int = 4, fresh: bool = False, ttl: float | None = None,
+) -> None:
+    """Verify every profile (or those matching *pattern*) concurrently."""
+    names = [n for n in config.list_profiles() if pattern is None or fnmatch.fnmatch(n, pattern)]
+    if not names:
+        print("No profiles match." if pattern else "No profiles found.")
+        raise SystemExit(1)
+
+    jobs = max(1, jobs)
+    lookups = Lookups(ttl=cache_ttl(ttl), fresh=fresh)
+
+    def _verify(name: str) -> tuple[list[str], Tally]:
+        tally = Tally()
+        results = list(verify_profile(name, lookups, check_pool))
+        lines = [tally.add(r) for r in results]
+        return lines, tally
+
+    # Profiles and their checks use separate pools, so a profile waiting on
+    # its checks can never starve them of workers.
+    with ThreadPoolExecutor(max_workers=jobs * len(CHECKS)) as check_pool, \
+            ThreadPoolExecutor(max_workers=jobs) as profile_pool:
+        futures = [profile_pool.submit(_verify, name) for name in names]
+        tallies: list[Tally] = []
+        for name, future in zip(names, futures):
+            lines, tally = future.result()
+            tallies.append(tally)
+            print(f"Verifying profile: {name}\n")
+            print("\n".join(lines))
+            print(f"  {'─' * 35}")
+            print(f"  {tally.summary()}\n", flush=True)
+
+    width = max(len(n) for n in names)
+    failed = [n for n, t in zip(names, tallies) if t.failed]
+    print(f"Summary ({len(names)} profiles):")
+    for name, tally in zip(names, tallies):
+        print(f"  {name:<{width}}  {tally.summary()}")
+    print(f"  {'─' * 35}")
+    print(f"  {len(names) - len(failed)} ok, {len(failed)} failed")
+
+    if failed:
         raise SystemExit(1)
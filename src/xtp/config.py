@@ -2,11 +2,22 @@
 
 from __future__ import annotations
 
-import shutil
-import tomllib
+import json
+import os
+import sys
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pathlib import Path
 
-from xtp import toml_writer
+from xtp import __version__
+
+# xtp.model imports this module, so it is imported where it is used;
+# annotations naming it are never evaluated.
+
+# tomllib, hashlib, shutil and xtp.toml_writer are imported where they are
+# used: the warm build_env path behind `xtp env --export` and prompt hooks
+# needs none of them.
 
 # ── Paths ──────────────────────────────────────────────────────────────────
 
@@ -14,6 +25,13 @@ CONFIG_DIR = Path.home() / ".config" / "xtp"
 PROFILES_DIR = CONFIG_DIR / "profiles"
 GLOBAL_CONFIG = CONFIG_DIR / "config.toml"
 
+# Compiled build_env() output, stored beside each profile.toml
+ENV_CACHE_NAME = ".env-cache.json"
+
+# Advisory lock files, and the generation counters bumped on every change
+LOCK_NAME = ".lock"
+GENERATION_NAME = ".generation"
+
 
 def profile_dir(name: str) -> Path:
     return PROFILES_DIR / name
@@ -23,17 +41,21 @@ def profile_toml(name: str) -> Path:
     return profile_dir(name) / "profile.toml"
 
 
+def env_cache_path(name: str) -> Path:
+    return profile_dir(name) / ENV_CACHE_NAME
+
+
+def store_generation_path() -> Path:
+    return CONFIG_DIR / "generation"
+
+
 # ── Profile helpers ────────────────────────────────────────────────────────
 
 def list_profiles() -> list[str]:
     """Return sorted list of profile names that have a profile.toml."""
-    if not PROFILES_DIR.is_dir():
-        return []
-    return sorted(
-        d.name
-        for d in PROFILES_DIR.iterdir()
-        if d.is_dir() and (d / "profile.toml").is_file()
-    )
+    from xtp import index
+
+    return index.names()
 
 
 def load_profile(name: str) -> dict:
@@ -41,15 +63,194 @@ def load_profile(name: str) -> dict:
     path = profile_toml(name)
     if not path.is_file():
         raise FileNotFoundError(f"Profile '{name}' not found at {path}")
+    import tomllib
+
     with open(path, "rb") as f:
         return tomllib.load(f)
 
 
-def save_profile(name: str, data: dict) -> None:
-    """Write *data* as TOML to the profile's profile.toml."""
+def load_global() -> dict:
+    """Load the global config.toml, or return {} if it doesn't exist."""
+    import tomllib
+
+    try:
+        with open(GLOBAL_CONFIG, "rb") as f:
+            return tomllib.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_profile(name: str, data: dict, base: str | None = None) -> None:
+    """Write *data* as TOML to the profile's profile.toml.
+
+    An existing file is patched (toml_writer.patch), so its comments and
+    layout survive edits made through xtp; for a new profile, *base* (say
+    the text of the profile it is cloned from) is patched if given. The
+    write is durable and atomic (temp file, fsync, rename) and happens
+    under the profile's lock; the profile's generation is bumped with it.
+    """
     pdir = profile_dir(name)
     pdir.mkdir(parents=True, exist_ok=True)
-    profile_toml(name).write_text(toml_writer.dumps(data))
+    path = profile_toml(name)
+    from xtp import toml_writer
+
+    with profile_lock(name):
+        try:
+            text = toml_writer.patch(path.read_text(), data)
+        except FileNotFoundError:
+            text = toml_writer.dumps(data) if base is None else toml_writer.patch(base, data)
+        write_atomic(path, text, durable=True)
+        bump_generation(name)
+
+    from xtp import index
+
+    index.update(name)
+
+
+def parse_override(text: str) -> tuple[list[str], object]:
+    """Parse ``section.key=value``; the value is read as TOML, else taken as a string."""
+    key, sep, raw = text.partition("=")
+    path = key.strip().split(".")
+    if not sep or not all(path):
+        raise ValueError(f"expected KEY=VALUE (e.g. git.author_email=me@example.com), got '{text}'")
+    import tomllib
+
+    try:
+        value = tomllib.loads(f"v = {raw}")["v"]
+    except tomllib.TOMLDecodeError:
+        value = raw
+    return path, value
+
+
+def apply_overrides(data: dict, overrides: list[tuple[list[str], object]]) -> dict:
+    """Set each parsed override in *data*, creating tables on the way; returns *data*."""
+    for path, value in overrides:
+        table = data
+        for part in path[:-1]:
+            table = table.setdefault(part, {})
+            if not isinstance(table, dict):
+                raise ValueError(f"'{'.'.join(path)}': '{part}' is not a table")
+        table[path[-1]] = value
+    return data
+
+
+def write_atomic(path: Path, text: str, durable: bool = False, mode: int | None = None) -> None:
+    """Write *text* to *path* via a temp file and rename, so readers never see a partial file.
+
+    With *durable*, the file and the rename are also fsynced, so a crash
+    leaves either the old or the new content on disk. *mode* is set on the
+    temp file before anything is written to it, so a secret is never
+    readable with looser permissions.
+    """
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "w") as f:
+            if mode is not None:
+                os.fchmod(f.fileno(), mode)
+            f.write(text)
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    if durable:
+        fd = os.open(path.parent, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+# ── Locks and generations ──────────────────────────────────────────────────
+
+# Lock files this process holds, by (thread, path): taking one again nests.
+_held: dict[tuple[int, str], int] = {}
+
+
+@contextmanager
+def locked(path: Path) -> Iterator[None]:
+    """Hold an exclusive advisory lock (flock) on *path*, creating it if needed.
+
+    Re-entrant within a thread. If another process holds the lock, say so
+    on stderr and wait for it.
+    """
+    import fcntl
+    import threading
+
+    key = (threading.get_ident(), str(path))
+    if key in _held:
+        _held[key] += 1
+        try:
+            yield
+        finally:
+            _held[key] -= 1
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            print(f"Waiting for another xtp process to release {path} ...", file=sys.stderr)
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        _held[key] = 1
+        try:
+            yield
+        finally:
+            del _held[key]
+    finally:
+        os.close(fd)  # releases the lock
+
+
+def profile_lock(name: str):
+    """Lock profile *name* against concurrent writers; hold it across read-modify-write."""
+    return locked(profile_dir(name) / LOCK_NAME)
+
+
+def _read_generation(path: Path) -> int:
+    try:
+        return int(path.read_text())
+    except (FileNotFoundError, ValueError):
+        return 0
+
+
+def generation(name: str) -> int:
+    """Return profile *name*'s generation: it grows each time the profile changes."""
+    return _read_generation(profile_dir(name) / GENERATION_NAME)
+
+
+def store_generation() -> int:
+    """Return the store-wide generation: it grows when any profile changes.
+
+    store_generation_path() is replaced by a rename on every bump, so its
+    stat key alone also tells whether anything changed.
+    """
+    return _read_generation(store_generation_path())
+
+
+def bump_generation(name: str | None = None) -> int:
+    """Record a change to profile *name* (or just to the store); return the store generation.
+
+    Call this after changing a profile outside save_profile, e.g. after
+    deleting, restoring or hand-editing it.
+    """
+    if name is not None:
+        bump_profile_generation(name)
+    CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+    with locked(CONFIG_DIR / LOCK_NAME):
+        path = store_generation_path()
+        value = _read_generation(path) + 1
+        write_atomic(path, f"{value}\n")
+    return value
+
+
+def bump_profile_generation(name: str) -> None:
+    """Bump only profile *name*'s generation; a batch ends with one bump_generation()."""
+    with profile_lock(name):
+        path = profile_dir(name) / GENERATION_NAME
+        write_atomic(path, f"{_read_generation(path) + 1}\n")
 
 
 def ensure_profile_dirs(name: str) -> None:
@@ -60,90 +261,204 @@ def ensure_profile_dirs(name: str) -> None:
     (pdir / "aws").mkdir(parents=True, exist_ok=True)
 
 
+# Top-level keys of ~/.claude.json that let Claude skip the first-run
+# wizard; override with seed_keys in the [claude] table of the global config.
+CLAUDE_SEED_KEYS = (
+    "hasCompletedOnboarding",
+    "lastOnboardingVersion",
+    "oauthAccount",
+    "userID",
+    "theme",
+    "firstStartTime",
+    "installMethod",
+    "autoUpdates",
+)
+
+
 def seed_claude_config(name: str) -> None:
-    """Copy ~/.claude.json into the profile's claude dir to skip onboarding."""
+    """Seed the profile's .claude.json with the onboarding keys of ~/.claude.json.
+
+    The source also holds per-project history and caches, often many
+    megabytes, so only the allowlisted keys are decoded and written.
+    """
     source = Path.home() / ".claude.json"
-    if not source.is_file():
-        return
     dest = profile_dir(name) / "claude" / ".claude.json"
-    if not dest.exists():
-        shutil.copy2(source, dest)
+    if dest.exists() or not source.is_file():
+        return
+    from xtp import jsonscan
+
+    keys = load_global().get("claude", {}).get("seed_keys", CLAUDE_SEED_KEYS)
+    try:
+        with jsonscan.mapped(source) as buf:
+            seed = jsonscan.extract_keys(buf, keys)
+    except (OSError, ValueError):
+        return  # unreadable or malformed: let Claude run its own onboarding
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    write_atomic(dest, json.dumps(seed, indent=2) + "\n", mode=0o600)  # account details
 
 
 def build_env(name: str) -> dict[str, str]:
-    """Build the environment variable dict for a profile."""
-    cfg = load_profile(name)
-    pdir = profile_dir(name)
+    """Build the environment variable dict for a profile.
+
+    The result is cached in the profile dir and reused until profile.toml
+    or the global config changes, so the warm path is one small JSON read.
+    """
+    path = profile_toml(name)
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Profile '{name}' not found at {path}") from None
+
+    key = _env_cache_key(name, st)
+    cached = _read_env_cache(name)
+    if cached is not None and cached.get("key") == key:
+        return cached["env"]
+
+    import hashlib
+
+    raw = path.read_bytes()
+    digest = hashlib.sha256(raw).hexdigest()
+    if cached is not None and cached.get("sha256") == digest and _same_inputs(cached["key"], key):
+        # Touched but not changed: refresh the stat key and keep the env.
+        env = cached["env"]
+    else:
+        from xtp import model
+
+        env = _compile_env(model.load(name))
+    _write_env_cache(name, key, digest, env, st)
+    return env
+
+
+# Files modified this close to a cache write may change again without a
+# visible mtime/size change, so their stat key is not trusted (cf. "racy git").
+_RACY_WINDOW_NS = 2_000_000_000
+
+
+def stat_key(st: os.stat_result) -> list[int]:
+    """Return the [mtime_ns, size] pair used to key on-disk caches."""
+    return [st.st_mtime_ns, st.st_size]
+
+
+def is_racy(st: os.stat_result) -> bool:
+    """True if *st* is too recent for its stat key to be trusted yet."""
+    return time.time_ns() - st.st_mtime_ns < _RACY_WINDOW_NS
+
+
+def _env_cache_key(name: str, st: os.stat_result) -> dict:
+    try:
+        global_key = stat_key(GLOBAL_CONFIG.stat())
+    except FileNotFoundError:
+        global_key = None
+    return {
+        "version": __version__,
+        "home": str(Path.home()),
+        "dir": str(profile_dir(name)),
+        "global": global_key,
+        "toml": stat_key(st),
+    }
+
+
+def _same_inputs(old: dict, new: dict) -> bool:
+    """True if two cache keys differ only in the profile.toml stat."""
+    return {**old, "toml": None} == {**new, "toml": None}
+
+
+def _read_env_cache(name: str) -> dict | None:
+    try:
+        with open(env_cache_path(name), "rb") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or not isinstance(data.get("key"), dict):
+        return None
+    return data
+
+
+def _write_env_cache(
+    name: str, key: dict, digest: str, env: dict[str, str], st: os.stat_result,
+) -> None:
+    if is_racy(st):
+        key = {**key, "toml": None}
+    try:
+        write_atomic(
+            env_cache_path(name),
+            json.dumps({"key": key, "sha256": digest, "env": env}),
+        )
+    except OSError:
+        pass  # cache is best-effort; a read-only profile dir still works
+
+
+def _compile_env(profile: model.Profile) -> dict[str, str]:
+    pdir = profile_dir(profile.name)
     env: dict[str, str] = {}
 
     # Profile indicator
-    env["XTP_PROFILE"] = name
+    env["XTP_PROFILE"] = profile.name
     env["XTP_PROFILE_DIR"] = str(pdir)
 
     # Claude Code
     env["CLAUDE_CONFIG_DIR"] = str(pdir / "claude")
 
     # Git identity
-    git = cfg.get("git", {})
-    if git.get("author_name"):
-        env["GIT_AUTHOR_NAME"] = git["author_name"]
-        env["GIT_COMMITTER_NAME"] = git["author_name"]
-    if git.get("author_email"):
-        env["GIT_AUTHOR_EMAIL"] = git["author_email"]
-        env["GIT_COMMITTER_EMAIL"] = git["author_email"]
-    if git.get("ssh_key"):
-        key_path = str(Path(git["ssh_key"]).expanduser())
+    git = profile.git
+    if git.author_name:
+        env["GIT_AUTHOR_NAME"] = git.author_name
+        env["GIT_COMMITTER_NAME"] = git.author_name
+    if git.author_email:
+        env["GIT_AUTHOR_EMAIL"] = git.author_email
+        env["GIT_COMMITTER_EMAIL"] = git.author_email
+    if git.ssh_key:
+        key_path = str(Path(git.ssh_key).expanduser())
         env["GIT_SSH_COMMAND"] = f"ssh -i {key_path} -o IdentitiesOnly=yes"
 
     # GitHub CLI
     env["GH_CONFIG_DIR"] = str(pdir / "gh")
 
     # Chrome / Browser
-    chrome = cfg.get("chrome", {})
-    if chrome.get("profile_directory"):
+    if profile.chrome.profile_directory:
         browser_script = pdir / "browser.sh"
         env["BROWSER"] = str(browser_script)
 
     # AWS
-    aws = cfg.get("aws", {})
-    if aws.get("profile"):
-        env["AWS_PROFILE"] = aws["profile"]
+    if profile.aws.profile:
+        env["AWS_PROFILE"] = profile.aws.profile
         aws_dir = pdir / "aws"
         env["AWS_CONFIG_FILE"] = str(aws_dir / "config")
         env["AWS_SHARED_CREDENTIALS_FILE"] = str(aws_dir / "credentials")
 
     # npm
-    npm = cfg.get("npm", {})
-    if npm.get("isolate"):
+    if profile.npm.isolate:
         env["NPM_CONFIG_USERCONFIG"] = str(pdir / "npmrc")
 
     # gcloud
-    gcloud_dir = cfg.get("gcloud", {}).get("config_dir")
-    if gcloud_dir:
-        env["CLOUDSDK_CONFIG"] = str(Path(gcloud_dir).expanduser())
+    if profile.gcloud.config_dir:
+        env["CLOUDSDK_CONFIG"] = str(Path(profile.gcloud.config_dir).expanduser())
 
     # Custom env vars
-    for key, value in cfg.get("env", {}).items():
-        env[key] = str(Path(value).expanduser()) if "~" in str(value) else str(value)
+    for key, value in profile.env.items():
+        env[key] = str(Path(value).expanduser()) if "~" in value else value
 
     return env
 
 
 def generate_browser_script(name: str) -> None:
     """Generate the browser.sh wrapper for a profile's Chrome profile."""
-    cfg = load_profile(name)
-    chrome = cfg.get("chrome", {})
-    profile_directory = chrome.get("profile_directory")
+    from xtp import model
+
+    profile_directory = model.load(name).chrome.profile_directory
     if not profile_directory:
         return
 
+    from xtp.commands.chrome import launcher
+
+    command = " ".join(f'"{part}"' if " " in part else part for part in launcher())
     pdir = profile_dir(name)
     script = pdir / "browser.sh"
     script.write_text(
         f'#!/bin/bash\n'
         f'# Auto-generated by xtp for profile: {name}\n'
         f'# Opens URLs in Chrome with the correct profile\n'
-        f'exec open -na "Google Chrome" --args '
+        f'exec {command} '
         f'--profile-directory="{profile_directory}" "$@"\n'
     )
     script.chmod(0o755)
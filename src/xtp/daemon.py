@@ -0,0 +1,73 @@
+"""Client side of the optional xtp daemon (the server is xtp.commands.daemon).
+
+When `xtp daemon` is listening, the CLI forwards hot queries (list, env,
+show) to it over a Unix socket instead of loading profiles itself. A
+request is one dict; the reply is {"code", "out", "err"}, or
+{"fallback": True} when the daemon can't answer. Any failure here means
+"run directly", so a dead or stale daemon never breaks the CLI.
+
+The point is to skip imports, so the client uses only builtins: messages
+are marshal-encoded (both ends are this package, and json would pull in
+re) and the socket is a raw _socket (socket.py builds its enums on
+import). The socket is private to the user.
+"""
+
+from __future__ import annotations
+
+import marshal
+import os
+
+SOCKET_NAME = "daemon.sock"
+
+# Same directory as config.CONFIG_DIR, spelled with os.path so the client
+# doesn't have to import xtp.config (and pathlib) to find it.
+SOCKET = os.path.join(os.path.expanduser("~"), ".config", "xtp", SOCKET_NAME)
+
+TIMEOUT = 1.0
+
+# The parts of the client's environment an answer depends on
+ENV_KEYS = ("XTP_PROFILE", "SHELL")
+
+
+def query(request: dict) -> dict | None:
+    """Send *request* to the daemon; return its reply, or None to run directly."""
+    if not os.path.exists(SOCKET):
+        return None
+    import _socket
+
+    environ = {key: os.environ[key] for key in ENV_KEYS if key in os.environ}
+    payload = encode({**request, "environ": environ})
+    sock = _socket.socket(_socket.AF_UNIX, _socket.SOCK_STREAM)
+    try:
+        sock.settimeout(TIMEOUT)
+        sock.connect(SOCKET)
+        sock.sendall(payload)
+        sock.shutdown(_socket.SHUT_WR)
+        data = decode(recv_all(sock))
+    except (OSError, ValueError):
+        return None
+    finally:
+        sock.close()
+    if not isinstance(data, dict) or data.get("fallback") or not isinstance(data.get("code"), int):
+        return None
+    return data
+
+
+def encode(message: dict) -> bytes:
+    return marshal.dumps(message)
+
+
+def decode(data: bytes) -> object:
+    """Decode a message; raises ValueError if it isn't one."""
+    try:
+        return marshal.loads(data)
+    except (EOFError, TypeError) as e:
+        raise ValueError("malformed daemon message") from e
+
+
+def recv_all(sock) -> bytes:
+    """Read from *sock* until the peer shuts down its side."""
+    chunks = []
+    while chunk := sock.recv(65536):
+        chunks.append(chunk)
+    return b"".join(chunks)
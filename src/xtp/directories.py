@@ -0,0 +1,139 @@
+"""Directory-based profile selection.
+
+The global config maps directory prefixes to profiles::
+
+    [directories]
+    "~/work/acme" = "acme"
+    "~/work/acme/oss" = "personal"
+
+The deepest matching prefix wins. In Python the mapping is compiled into
+a trie of path components (resolve() is one dict lookup per component);
+for the shell it is compiled into CONFIG_DIR/chpwd.zsh, a zsh chpwd hook
+whose lookup is a single ``case`` over the prefixes, deepest first, so
+``cd`` never forks. The hook regenerates itself when config.toml is newer.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from xtp import activate, config
+
+HOOK_NAME = "chpwd.zsh"
+
+# Trie node key holding the profile mapped to the path ending at that node
+_LEAF = ""
+
+
+def normalize(prefix: str) -> str:
+    """Return the absolute, normalized form of a configured prefix."""
+    return os.path.normpath(os.path.abspath(os.path.expanduser(prefix)))
+
+
+def load_mapping() -> dict[str, str]:
+    """Return {absolute prefix: profile} from the [directories] table.
+
+    Prefixes are also registered under their symlink-resolved form, so a
+    mapping keeps working whether the shell reports the logical or the
+    physical path.
+    """
+    mapping: dict[str, str] = {}
+    for prefix, name in config.load_global().get("directories", {}).items():
+        if not isinstance(name, str):
+            continue
+        path = normalize(prefix)
+        mapping[path] = name
+        mapping.setdefault(os.path.realpath(path), name)
+    return mapping
+
+
+def compile_trie(mapping: dict[str, str]) -> dict:
+    """Build a trie keyed by path component from {prefix: profile}."""
+    root: dict = {}
+    for prefix, name in mapping.items():
+        node = root
+        for part in _parts(prefix):
+            node = node.setdefault(part, {})
+        node[_LEAF] = name
+    return root
+
+
+def resolve(trie: dict, path: str) -> str | None:
+    """Return the profile of the deepest prefix containing *path*, or None."""
+    node = trie
+    found = node.get(_LEAF)
+    for part in _parts(normalize(path)):
+        node = node.get(part)
+        if node is None:
+            break
+        found = node.get(_LEAF, found)
+    return found
+
+
+def _parts(path: str) -> list[str]:
+    return [part for part in path.split(os.sep) if part]
+
+
+def hook_path() -> Path:
+    return config.CONFIG_DIR / HOOK_NAME
+
+
+def render_hook(mapping: dict[str, str]) -> str:
+    """Render the zsh chpwd hook for *mapping*."""
+    cfg = activate.quote(str(config.GLOBAL_CONFIG), "zsh")
+    hook = activate.quote(str(hook_path()), "zsh")
+    arms = []
+    # Deepest prefix first: case takes the first matching arm.
+    for prefix in sorted(mapping, key=lambda p: (-len(_parts(p)), p)):
+        script = activate.quote(str(activate.script_path(mapping[prefix], "zsh")), "zsh")
+        pattern = activate.quote(prefix.rstrip("/"), "zsh")
+        arms.append(f"    {pattern}|{pattern}/*) print -r -- {script} ;;")
+    return "\n".join([
+        "# Auto-generated by xtp from the [directories] table of config.toml.",
+        '# Add to ~/.zshrc:  source "$(xtp dirs --hook)"',
+        "_xtp_dir_script() {",
+        '  case "$PWD" in',
+        *arms,
+        "    *) return 1 ;;",
+        "  esac",
+        "}",
+        "_xtp_chpwd() {",
+        f"  if [[ {cfg} -nt {hook} ]]; then",
+        '    source "$(command xtp dirs --hook)"',
+        "    return",
+        "  fi",
+        "  local script",
+        "  script=$(_xtp_dir_script) || return 0",
+        '  [[ "$script" == "${XTP_PROFILE_DIR:-}/activate.zsh" ]] && return 0',
+        '  source "$script"',
+        "}",
+        "autoload -Uz add-zsh-hook",
+        "add-zsh-hook chpwd _xtp_chpwd",
+        "_xtp_chpwd",
+        "",
+    ])
+
+
+def write_hook() -> Path:
+    """Regenerate the chpwd hook and the activate.zsh of every mapped profile.
+
+    Mappings to profiles that don't exist are left out.
+    """
+    mapping = {
+        prefix: name for prefix, name in load_mapping().items()
+        if config.profile_toml(name).is_file()
+    }
+    for name in sorted(set(mapping.values())):
+        activate.write_scripts(name, ("zsh",))
+    path = hook_path()
+    config.CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+    config.write_atomic(path, render_hook(mapping))
+    try:
+        cfg_mtime = config.GLOBAL_CONFIG.stat().st_mtime_ns
+    except FileNotFoundError:
+        cfg_mtime = 0
+    # Never older than config.toml, or the staleness check would loop.
+    mtime = max(path.stat().st_mtime_ns, cfg_mtime)
+    os.utime(path, ns=(mtime, mtime))
+    return path
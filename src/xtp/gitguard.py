@@ -0,0 +1,203 @@
+"""Git identity guard: refuse commits and pushes made as the wrong profile.
+
+The global config maps remote URL patterns to profiles::
+
+    [remotes]
+    "github.com/acme-corp" = "acme"        # an org (or a whole host)
+    "gitlab.acme.com/*/infra-*" = "acme"   # any glob; first match wins
+
+Remote URLs are canonicalized to ``host/path`` (no scheme, user, port or
+``.git``), and a pattern matches the URL itself or anything under it.
+
+The table and the GIT_AUTHOR_EMAIL / GIT_SSH_COMMAND each mapped profile's
+build_env produces are compiled into CONFIG_DIR/git-guard.sh, a POSIX sh
+script that the pre-commit and pre-push hooks exec. It costs a
+``git var`` and a ``case``, never a Python start, and recompiles itself
+when config.toml or a mapped profile.toml is newer than it.
+"""
+
+from __future__ import annotations
+
+import os
+from fnmatch import fnmatchcase
+from pathlib import Path
+
+from xtp import activate, config
+
+GUARD_NAME = "git-guard.sh"
+HOOKS = ("pre-commit", "pre-push")
+
+# First line after the shebang of the hook stubs `xtp hook install` writes
+STUB_MARKER = "# xtp identity guard"
+
+_GLOB_CHARS = "*?[]"
+
+
+def canonical_url(url: str) -> str:
+    """Reduce a git remote URL to ``host/path``.
+
+    git@github.com:acme/api.git, ssh://git@github.com:22/acme/api and
+    https://user@github.com/acme/api/ all become github.com/acme/api.
+    Must stay in step with the sh version in _CANONICAL_SH.
+    """
+    u = url.removesuffix("/").removesuffix(".git").removesuffix("/")
+    if "://" in u:
+        u = u.split("://", 1)[1]
+        hostport, _, path = u.partition("/")
+        host = hostport.rsplit("@", 1)[-1].split(":", 1)[0]
+        return f"{host}/{path}" if path else host
+    if ":" in u:
+        hostpart, _, path = u.partition(":")
+        return f"{hostpart.rsplit('@', 1)[-1]}/{path}"
+    return u
+
+
+def load_remotes() -> list[tuple[str, str]]:
+    """Return the (pattern, profile) pairs of the [remotes] table, in order."""
+    return [
+        (pattern.rstrip("/"), name)
+        for pattern, name in config.load_global().get("remotes", {}).items()
+        if isinstance(name, str)
+    ]
+
+
+def match(url: str, remotes: list[tuple[str, str]]) -> str | None:
+    """Return the profile the first matching pattern maps *url* to, or None."""
+    canonical = canonical_url(url)
+    for pattern, name in remotes:
+        if fnmatchcase(canonical, pattern) or fnmatchcase(canonical, f"{pattern}/*"):
+            return name
+    return None
+
+
+def guard_path() -> Path:
+    return config.CONFIG_DIR / GUARD_NAME
+
+
+def _q(value: str) -> str:
+    return activate.quote(value, "bash")  # POSIX single quoting
+
+
+def _sh_pattern(pattern: str) -> str:
+    """Escape everything in a case pattern except the glob characters."""
+    return "".join(c if c.isalnum() or c in _GLOB_CHARS else f"\\{c}" for c in pattern)
+
+
+_CANONICAL_SH = r"""u=${url%/}; u=${u%.git}; u=${u%/}
+case $u in
+  *://*)
+    u=${u#*://}; hostport=${u%%/*}; path=${u#"$hostport"}
+    hostport=${hostport##*@}; u=${hostport%%:*}$path
+    ;;
+  *:*)
+    hostpart=${u%%:*}; u=${hostpart##*@}/${u#*:}
+    ;;
+esac"""
+
+
+def render_guard(remotes: list[tuple[str, str]], envs: dict[str, dict[str, str]]) -> str:
+    """Render git-guard.sh for *remotes*, with expected values from *envs*."""
+    inputs = [str(config.GLOBAL_CONFIG), *(str(config.profile_toml(n)) for n in sorted(envs))]
+    arms = []
+    for pattern, name in remotes:
+        env = envs.get(name)
+        if env is None:
+            continue
+        p = _sh_pattern(pattern)
+        arms.append(
+            f"  {p}|{p}/*) profile={_q(name)}"
+            f" email={_q(env.get('GIT_AUTHOR_EMAIL', ''))}"
+            f" ssh={_q(env.get('GIT_SSH_COMMAND', ''))} ;;"
+        )
+    return "\n".join([
+        "#!/bin/sh",
+        "# Auto-generated by xtp from the [remotes] table of config.toml; do not edit.",
+        "# Usage: git-guard.sh pre-commit | git-guard.sh pre-push REMOTE URL",
+        f"self={_q(str(guard_path()))}",
+        f"for f in {' '.join(_q(i) for i in inputs)}; do",
+        '  if [ "$f" -nt "$self" ]; then',
+        '    command xtp hook compile >/dev/null 2>&1 && exec sh "$self" "$@"',
+        "    break",
+        "  fi",
+        "done",
+        'if [ "$1" = pre-push ]; then',
+        '  url=$3',
+        "else",
+        "  url=$(git remote get-url origin 2>/dev/null) || exit 0",
+        "fi",
+        _CANONICAL_SH,
+        'case $u in',
+        *arms,
+        "  *) exit 0 ;;",
+        "esac",
+        'if [ -n "$email" ]; then',
+        "  ident=$(git var GIT_AUTHOR_IDENT) || exit 1",
+        "  actual=${ident#*<}; actual=${actual%%>*}",
+        '  if [ "$actual" != "$email" ]; then',
+        '    echo "xtp: $u belongs to profile \'$profile\', which commits as <$email>," >&2',
+        '    echo "     but the author is <$actual>." >&2',
+        "    bad=1",
+        "  fi",
+        "fi",
+        'if [ "$1" = pre-push ] && [ -n "$ssh" ]; then',
+        "  case $url in",  # only ssh remotes use GIT_SSH_COMMAND
+        "    ssh://*|git+ssh://*|ssh+git://*) ;;",
+        "    *://*|/*) ssh= ;;",
+        "    *:*) ;;",
+        "    *) ssh= ;;",
+        "  esac",
+        '  actual=${GIT_SSH_COMMAND:-$(git config core.sshCommand)}',
+        '  if [ -n "$ssh" ] && [ "$actual" != "$ssh" ]; then',
+        '    echo "xtp: $u belongs to profile \'$profile\', which pushes with" >&2',
+        '    echo "     GIT_SSH_COMMAND=\'$ssh\', but it is \'${actual}\'." >&2',
+        "    bad=1",
+        "  fi",
+        "fi",
+        'if [ -n "$bad" ]; then',
+        '  echo "Switch with: xtp shell $profile  (or bypass once with --no-verify)" >&2',
+        "  exit 1",
+        "fi",
+        "exit 0",
+        "",
+    ])
+
+
+def write_guard() -> Path:
+    """Compile git-guard.sh from the [remotes] table and the mapped profiles."""
+    remotes = load_remotes()
+    envs = {}
+    for name in {name for _, name in remotes}:
+        try:
+            envs[name] = config.build_env(name)
+        except FileNotFoundError:
+            continue  # unmapped until the profile exists
+    path = guard_path()
+    config.CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+    config.write_atomic(path, render_guard(remotes, envs))
+    inputs = [config.GLOBAL_CONFIG, *(config.profile_toml(n) for n in envs)]
+    newest = max((p.stat().st_mtime_ns for p in inputs if p.exists()), default=0)
+    # Never older than its inputs, or the staleness check would loop.
+    mtime = max(path.stat().st_mtime_ns, newest)
+    os.utime(path, ns=(mtime, mtime))
+    return path
+
+
+def render_stub(hook: str) -> str:
+    """Render the .git/hooks/<hook> stub that execs the guard."""
+    guard = activate.quote(str(guard_path()), "bash")
+    return "\n".join([
+        "#!/bin/sh",
+        f"{STUB_MARKER} (installed by `xtp hook install`)",
+        f"[ -f {guard} ] || exit 0",
+        f'exec sh {guard} {hook} "$@"',
+        "",
+    ])
+
+
+def is_stub(path: Path) -> bool:
+    """True if *path* is a hook stub written by `xtp hook install`."""
+    try:
+        lines = path.read_text().splitlines()
+    except (OSError, UnicodeDecodeError):
+        return False
+    return len(lines) > 1 and lines[1].startswith(STUB_MARKER)
@@ -0,0 +1,156 @@
+"""Profile index: names and key fields of every profile in one JSON file.
+
+The index lives at CONFIG_DIR/index.json. save_profile and delete keep it
+up to date; on every load it is revalidated with a stat of PROFILES_DIR
+and of each profile.toml, so hand edits are picked up without parsing
+any file that didn't change.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+from xtp import config
+
+# xtp.model is imported where it is used, off the `xtp list` fast path;
+# annotations naming it are never evaluated.
+
+INDEX_NAME = "index.json"
+_VERSION = 1
+
+
+def index_path() -> Path:
+    return config.CONFIG_DIR / INDEX_NAME
+
+
+def summarize(profile: model.Profile) -> dict:
+    """Extract the fields the index keeps for a loaded profile."""
+    return {
+        "description": profile.profile.description,
+        "author_name": profile.git.author_name,
+        "author_email": profile.git.author_email,
+        "aws_profile": profile.aws.profile,
+        "chrome_profile": profile.chrome.profile_directory,
+    }
+
+
+def load() -> dict[str, dict]:
+    """Return {name: fields} for every profile, sorted by name.
+
+    Only profiles whose profile.toml changed since the index was written
+    are re-parsed; the index file is rewritten if anything changed.
+    """
+    data = _read()
+    entries: dict[str, dict] = data["profiles"] if data else {}
+    pending: list[str] = data["pending"] if data else []
+
+    try:
+        dir_st = config.PROFILES_DIR.stat()
+    except FileNotFoundError:
+        if data and entries:
+            _write(None, {}, [])
+        return {}
+    dir_key = None if config.is_racy(dir_st) else config.stat_key(dir_st)
+
+    if data and dir_key is not None and data["dir"] == dir_key:
+        candidates = [*entries, *pending]
+    else:
+        candidates = [e.name for e in os.scandir(config.PROFILES_DIR) if e.is_dir()]
+
+    # Plain string paths: pathlib overhead dominates with thousands of profiles.
+    root = str(config.PROFILES_DIR)
+    result: dict[str, dict] = {}
+    new_pending: list[str] = []
+    for name in candidates:
+        try:
+            st = os.stat(f"{root}/{name}/profile.toml")
+        except (FileNotFoundError, NotADirectoryError):
+            # A directory without profile.toml may get one later without
+            # PROFILES_DIR changing, so keep stat-ing it.
+            if os.path.isdir(f"{root}/{name}"):
+                new_pending.append(name)
+            continue
+        entry = entries.get(name)
+        if entry is None or entry["toml"] != [st.st_mtime_ns, st.st_size]:
+            entry = _entry(name, st)
+        result[name] = entry
+
+    result = dict(sorted(result.items()))
+    new_pending.sort()
+    if data is None or data["dir"] != dir_key or result != entries or new_pending != pending:
+        _write(dir_key, result, new_pending)
+    return result
+
+
+def names() -> list[str]:
+    """Return the sorted profile names from the index."""
+    return list(load())
+
+
+def update(name: str) -> None:
+    """Refresh the index entry for *name* after its profile.toml was written."""
+    data = _read()
+    if data is None:
+        load()
+        return
+    entries = data["profiles"]
+    try:
+        entries[name] = _entry(name, config.profile_toml(name).stat())
+    except FileNotFoundError:
+        entries.pop(name, None)
+    pending = [p for p in data["pending"] if p != name]
+    _write(data["dir"], dict(sorted(entries.items())), pending)
+
+
+def remove(name: str) -> None:
+    """Drop *name* from the index after the profile was deleted."""
+    data = _read()
+    if data is None:
+        return
+    data["profiles"].pop(name, None)
+    pending = [p for p in data["pending"] if p != name]
+    _write(data["dir"], data["profiles"], pending)
+
+
+def _entry(name: str, st: os.stat_result) -> dict:
+    # Only needed on a miss; keeps `xtp list` startup lean.
+    from xtp import model
+
+    toml_key = None if config.is_racy(st) else config.stat_key(st)
+    try:
+        fields = summarize(model.load(name))
+    except (OSError, ValueError) as e:  # TOMLDecodeError, UnicodeDecodeError
+        fields = {**summarize(model.Profile(name)), "error": str(e)}
+    return {**fields, "toml": toml_key}
+
+
+def _read() -> dict | None:
+    try:
+        with open(index_path(), "rb") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (
+        not isinstance(data, dict)
+        or data.get("version") != _VERSION
+        or data.get("root") != str(config.PROFILES_DIR)
+    ):
+        return None
+    return data
+
+
+def _write(dir_key: list[int] | None, entries: dict[str, dict], pending: list[str]) -> None:
+    data = {
+        "version": _VERSION,
+        "root": str(config.PROFILES_DIR),
+        "dir": dir_key,
+        "pending": pending,
+        "profiles": entries,
+    }
+    try:
+        config.CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+        config.write_atomic(index_path(), json.dumps(data))
+    except OSError:
+        pass  # index is best-effort; listing still works without it
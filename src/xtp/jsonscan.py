@@ -0,0 +1,141 @@
+"""Pull single values out of large JSON documents without decoding the rest.
+
+The input can be any bytes-like object, including an mmap of the file, and
+only the wanted value is ever decoded into Python objects.
+
+- extract_keys() decodes chosen top-level members, skipping the others
+  with regex scans.
+- find() jumps straight to candidate occurrences of a key with a byte
+  search and decodes only those, so it costs about one memchr pass over the
+  document. It matches the key at any depth: the caller's *accept* check
+  must tell the wanted member from look-alikes elsewhere in the document.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import re
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+_WS = re.compile(rb"[ \t\n\r]*")
+_STRING = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"', re.S)
+_SCALAR = re.compile(rb"[^,\]}\s]+")
+_TOKEN = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]{}]', re.S)
+
+
+class ScanError(ValueError):
+    """The document is not well-formed where the scanner looked."""
+
+
+def _ws(buf, pos: int) -> int:
+    return _WS.match(buf, pos).end()
+
+
+def skip_value(buf, pos: int) -> int:
+    """Return the end offset of the JSON value starting at *pos*."""
+    pos = _ws(buf, pos)
+    c = buf[pos:pos + 1]
+    if c == b'"':
+        m = _STRING.match(buf, pos)
+        if m is None:
+            raise ScanError(f"unterminated string at {pos}")
+        return m.end()
+    if c in (b"{", b"["):
+        depth = 0
+        for m in _TOKEN.finditer(buf, pos):
+            token = m.group()
+            if token in (b"{", b"["):
+                depth += 1
+            elif token in (b"}", b"]"):
+                depth -= 1
+                if depth == 0:
+                    return m.end()
+        raise ScanError(f"unterminated container at {pos}")
+    m = _SCALAR.match(buf, pos)
+    if m is None:
+        raise ScanError(f"expected a value at {pos}")
+    return m.end()
+
+
+def iter_members(buf, pos: int = 0) -> Iterator[tuple[str, int, int]]:
+    """Yield (key, value_start, value_end) for the object starting at *pos*."""
+    pos = _ws(buf, pos)
+    if buf[pos:pos + 1] != b"{":
+        raise ScanError(f"expected an object at {pos}")
+    pos = _ws(buf, pos + 1)
+    if buf[pos:pos + 1] == b"}":
+        return
+    while True:
+        m = _STRING.match(buf, pos)
+        if m is None:
+            raise ScanError(f"expected a key at {pos}")
+        key = json.loads(m.group())
+        pos = _ws(buf, m.end())
+        if buf[pos:pos + 1] != b":":
+            raise ScanError(f"expected ':' at {pos}")
+        start = _ws(buf, pos + 1)
+        end = skip_value(buf, start)
+        yield key, start, end
+        pos = _ws(buf, end)
+        c = buf[pos:pos + 1]
+        if c == b",":
+            pos = _ws(buf, pos + 1)
+        elif c == b"}":
+            return
+        else:
+            raise ScanError(f"expected ',' or '}}' at {pos}")
+
+
+def find(buf, key: str, accept: Callable[[object], bool] = lambda value: True) -> object:
+    """Decode the first member named *key*, at any depth, that *accept* approves.
+
+    The match is not anchored to a parent object: use it only where
+    *accept* can recognize the wanted value by its shape. Raises KeyError
+    if there is none.
+    """
+    needle = json.dumps(key).encode()
+    pos = buf.find(needle)
+    while pos != -1:
+        end = pos + len(needle)
+        before = pos - 1
+        while before >= 0 and buf[before:before + 1] in b" \t\n\r":
+            before -= 1
+        colon = _ws(buf, end)
+        # A real key follows '{' or ',' and precedes ':'; anything else is
+        # the same bytes inside a string value.
+        if buf[before:before + 1] in (b"{", b",") and buf[colon:colon + 1] == b":":
+            start = _ws(buf, colon + 1)
+            try:
+                value = json.loads(bytes(buf[start:skip_value(buf, start)]))
+            except ValueError:
+                value = None
+            else:
+                if accept(value):
+                    return value
+        pos = buf.find(needle, end)
+    raise KeyError(key)
+
+
+def extract_keys(buf, keys: Iterable[str]) -> dict:
+    """Decode only the top-level members named in *keys*."""
+    wanted = set(keys)
+    return {
+        key: json.loads(bytes(buf[start:end]))
+        for key, start, end in iter_members(buf)
+        if key in wanted
+    }
+
+
+@contextmanager
+def mapped(path: Path) -> Iterator[mmap.mmap | bytes]:
+    """Map *path* read-only for scanning (empty files can't be mapped)."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            yield buf
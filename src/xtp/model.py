@@ -0,0 +1,179 @@
+"""Typed view of profile.toml.
+
+load() parses and validates a profile once per process: the result is
+memoized by the file's inode, mtime and size (not while its mtime is too
+recent to trust, as for the on-disk caches). Sections are slotted, frozen
+dataclasses, so a loaded profile is a handful of small objects and
+thousands fit comfortably in a long-running process.
+
+Validation never rejects a profile. Unknown keys and values of the wrong
+type are reported as Diagnostics and otherwise ignored (the field keeps
+its default), so a typo shows up in `xtp verify` and `xtp show` instead
+of silently doing nothing.
+
+Writers still edit the raw dict from config.load_profile and save it with
+config.save_profile: the model is read-only.
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field, fields
+
+from xtp import config
+
+
+@dataclass(frozen=True, slots=True)
+class Diagnostic:
+    path: str  # dotted key, e.g. "git.author_email"
+    message: str
+
+    def __str__(self) -> str:
+        return f"{self.path}: {self.message}"
+
+
+@dataclass(frozen=True, slots=True)
+class Meta:
+    description: str = ""
+
+
+@dataclass(frozen=True, slots=True)
+class Git:
+    author_name: str = ""
+    author_email: str = ""
+    ssh_key: str = ""
+
+
+@dataclass(frozen=True, slots=True)
+class Chrome:
+    profile_directory: str = ""
+
+
+@dataclass(frozen=True, slots=True)
+class Aws:
+    profile: str = ""
+
+
+@dataclass(frozen=True, slots=True)
+class Npm:
+    isolate: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class Gcloud:
+    config_dir: str = ""
+
+
+@dataclass(frozen=True, slots=True)
+class Profile:
+    name: str
+    profile: Meta = field(default_factory=Meta)
+    git: Git = field(default_factory=Git)
+    chrome: Chrome = field(default_factory=Chrome)
+    aws: Aws = field(default_factory=Aws)
+    npm: Npm = field(default_factory=Npm)
+    gcloud: Gcloud = field(default_factory=Gcloud)
+    env: dict[str, str] = field(default_factory=dict)
+    diagnostics: tuple[Diagnostic, ...] = ()
+
+
+_SECTIONS = {"profile": Meta, "git": Git, "chrome": Chrome, "aws": Aws, "npm": Npm, "gcloud": Gcloud}
+
+# Field types per section class; annotations are strings under postponed evaluation.
+_TYPES = {"str": str, "bool": bool}
+_FIELDS = {cls: {f.name: _TYPES[f.type] for f in fields(cls)} for cls in _SECTIONS.values()}
+
+_TOML_TYPES = {
+    str: "a string", bool: "a boolean", int: "an integer", float: "a float",
+    list: "an array", dict: "a table",
+}
+
+# env values that are kept, converted with str()
+_SCALARS = (str, int, float, bool)
+
+
+def _kind(value: object) -> str:
+    return _TOML_TYPES.get(type(value), f"a {type(value).__name__}")
+
+
+def _unknown(path: str, key: str, known) -> Diagnostic:
+    import difflib
+
+    close = difflib.get_close_matches(key, list(known), n=1)
+    hint = f" (did you mean '{close[0]}'?)" if close else ""
+    return Diagnostic(path, f"unknown key{hint}")
+
+
+def parse(name: str, data: dict) -> Profile:
+    """Build a Profile from a parsed profile.toml, collecting diagnostics."""
+    diagnostics: list[Diagnostic] = []
+    sections: dict[str, object] = {}
+    for key, value in data.items():
+        if key == "env":
+            sections["env"] = _parse_env(value, diagnostics)
+        elif key in _SECTIONS:
+            sections[key] = _parse_section(key, _SECTIONS[key], value, diagnostics)
+        else:
+            diagnostics.append(_unknown(key, key, [*_SECTIONS, "env"]))
+    return Profile(name, **sections, diagnostics=tuple(diagnostics))
+
+
+def _parse_section(section: str, cls: type, value: object, diagnostics: list[Diagnostic]):
+    if not isinstance(value, dict):
+        diagnostics.append(Diagnostic(section, f"expected a table, got {_kind(value)}"))
+        return cls()
+    types = _FIELDS[cls]
+    values = {}
+    for key, item in value.items():
+        path = f"{section}.{key}"
+        want = types.get(key)
+        if want is None:
+            diagnostics.append(_unknown(path, key, types))
+        elif type(item) is not want:
+            diagnostics.append(Diagnostic(path, f"expected {_TOML_TYPES[want]}, got {_kind(item)}"))
+        else:
+            values[key] = item
+    return cls(**values)
+
+
+def _parse_env(value: object, diagnostics: list[Diagnostic]) -> dict[str, str]:
+    if not isinstance(value, dict):
+        diagnostics.append(Diagnostic("env", f"expected a table, got {_kind(value)}"))
+        return {}
+    env = {}
+    for key, item in value.items():
+        if isinstance(item, _SCALARS):
+            env[key] = str(item)
+        else:
+            diagnostics.append(Diagnostic(f"env.{key}", f"expected a string, got {_kind(item)}"))
+    return env
+
+
+# str(profile.toml path) -> ((inode, mtime_ns, size), Profile)
+_memo: dict[str, tuple[tuple[int, int, int], Profile]] = {}
+
+
+def load(name: str) -> Profile:
+    """Return profile *name*, parsing profile.toml only if it changed.
+
+    Raises FileNotFoundError if the profile doesn't exist and ValueError
+    (tomllib.TOMLDecodeError, UnicodeDecodeError) if it isn't valid TOML.
+    """
+    path = config.profile_toml(name)
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Profile '{name}' not found at {path}") from None
+    key = (st.st_ino, st.st_mtime_ns, st.st_size)
+    hit = _memo.get(str(path))
+    if hit is not None and hit[0] == key:
+        return hit[1]
+    import tomllib
+
+    with open(path, "rb") as f:
+        profile = parse(name, tomllib.load(f))
+    if config.is_racy(st):
+        _memo.pop(str(path), None)
+    else:
+        _memo[str(path)] = (key, profile)
+    return profile
@@ -0,0 +1,203 @@
+"""Full-text index of a profile's Claude Code transcripts.
+
+Each profile has its own SQLite FTS5 database, <profile>/.search-index.db,
+so one client's transcripts never reach another's results. update() brings
+it up to date incrementally: for every transcript it remembers the inode
+and the byte offset indexed so far, so a file that only grew is read from
+that offset, an unchanged one costs a stat, and only a file that was
+replaced or shrank is reindexed from the start.
+
+What is indexed is the conversation: the text of user and assistant
+messages and session summaries, one row per transcript line. Tool calls,
+tool output and thinking blocks are left out. Rows of transcripts that
+`xtp claude-gc` archived are kept, so archived sessions stay searchable.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+from dataclasses import dataclass, field
+
+from xtp import config, transcripts
+
+INDEX_NAME = ".search-index.db"
+_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    inode INTEGER NOT NULL,
+    offset INTEGER NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS messages USING fts5(
+    text, path UNINDEXED, offset UNINDEXED, role UNINDEXED, timestamp UNINDEXED,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+
+@dataclass
+class UpdateStats:
+    files: int = 0
+    read: int = 0
+    bytes: int = 0
+    rows: int = 0
+    errors: list[str] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class Hit:
+    path: str  # relative to claude/projects
+    offset: int  # byte offset of the transcript line
+    role: str
+    timestamp: str
+    snippet: str
+
+
+def index_path(name: str) -> str:
+    return str(config.profile_dir(name) / INDEX_NAME)
+
+
+def connect(name: str) -> sqlite3.Connection:
+    """Open the profile's index, creating it (or recreating an outdated one)."""
+    conn = sqlite3.connect(index_path(name))
+    if conn.execute("PRAGMA user_version").fetchone()[0] != _VERSION:
+        conn.executescript("DROP TABLE IF EXISTS files; DROP TABLE IF EXISTS messages;")
+        conn.executescript(_SCHEMA)
+        conn.execute(f"PRAGMA user_version = {_VERSION}")
+    conn.execute("PRAGMA journal_mode = WAL")
+    return conn
+
+
+def extract_text(record: dict) -> tuple[str, str] | None:
+    """Return (role, text) for an indexable transcript record, else None."""
+    kind = record.get("type")
+    if kind == "summary":
+        summary = record.get("summary")
+        return ("summary", summary) if isinstance(summary, str) and summary else None
+    if kind not in ("user", "assistant"):
+        return None
+    message = record.get("message")
+    content = message.get("content") if isinstance(message, dict) else None
+    if isinstance(content, str):
+        text = content
+    elif isinstance(content, list):
+        text = "\n".join(
+            block["text"] for block in content
+            if isinstance(block, dict) and block.get("type") == "text"
+            and isinstance(block.get("text"), str)
+        )
+    else:
+        return None
+    return (kind, text) if text.strip() else None
+
+
+def update(name: str, rebuild: bool = False) -> UpdateStats:
+    """Index what changed in profile *name*'s transcripts since the last update."""
+    stats = UpdateStats()
+    root = transcripts.projects_dir(name)
+    conn = connect(name)
+    try:
+        with conn:
+            if rebuild:
+                conn.execute("DELETE FROM files")
+                conn.execute("DELETE FROM messages")
+            known = {p: (ino, off) for p, ino, off in conn.execute("SELECT path, inode, offset FROM files")}
+            seen = set()
+            for dirpath, dirnames, filenames in os.walk(root):
+                dirnames.sort()
+                for filename in sorted(filenames):
+                    if not filename.endswith(".jsonl"):
+                        continue
+                    path = os.path.join(dirpath, filename)
+                    rel = os.path.relpath(path, root).replace(os.sep, "/")
+                    seen.add(rel)
+                    stats.files += 1
+                    try:
+                        _update_file(conn, path, rel, known.get(rel), stats)
+                    except OSError as e:
+                        stats.errors.append(f"{rel}: {e.strerror or e}")
+            gone = known.keys() - seen
+            try:
+                archived = transcripts.load_index(name)["sessions"] if gone else {}
+            except ValueError as e:
+                stats.errors.append(str(e))
+                gone = set()  # can't tell archived from deleted: keep their rows
+            if gone:
+                for rel in gone - archived.keys():
+                    conn.execute("DELETE FROM messages WHERE path = ?", (rel,))
+                    conn.execute("DELETE FROM files WHERE path = ?", (rel,))
+    finally:
+        conn.close()
+    return stats
+
+
+def _update_file(
+    conn: sqlite3.Connection, path: str, rel: str, known: tuple[int, int] | None,
+    stats: UpdateStats,
+) -> None:
+    st = os.stat(path)
+    if known is not None and known[0] == st.st_ino and known[1] == st.st_size:
+        return
+    offset = 0
+    if known is not None and known[0] == st.st_ino and known[1] < st.st_size:
+        offset = known[1]  # appended to: read only the new lines
+    elif known is not None:
+        conn.execute("DELETE FROM messages WHERE path = ?", (rel,))
+
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read()
+    end = data.rfind(b"\n") + 1  # a trailing partial line waits for the next update
+    rows = []
+    pos = offset
+    for line in data[:end].splitlines(keepends=True):
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        found = extract_text(record) if isinstance(record, dict) else None
+        if found:
+            role, text = found
+            rows.append((text, rel, pos, role, str(record.get("timestamp", ""))))
+        pos += len(line)
+    conn.executemany(
+        "INSERT INTO messages (text, path, offset, role, timestamp) VALUES (?, ?, ?, ?, ?)", rows,
+    )
+    conn.execute(
+        "INSERT OR REPLACE INTO files (path, inode, offset) VALUES (?, ?, ?)",
+        (rel, st.st_ino, offset + end),
+    )
+    stats.read += 1
+    stats.bytes += end
+    stats.rows += len(rows)
+
+
+def fts_query(text: str) -> str:
+    """Turn plain words into an FTS5 query matching all of them, in any order."""
+    return " ".join('"' + word.replace('"', '""') + '"' for word in text.split())
+
+
+def search(name: str, query: str, limit: int = 20, raw: bool = False) -> list[Hit]:
+    """Return the best matches for *query* in profile *name*'s index.
+
+    *query* is plain words unless *raw*, in which case it is FTS5 syntax
+    (phrases, OR, NOT, prefix*); raises ValueError if that doesn't parse.
+    """
+    match = query if raw else fts_query(query)
+    if not match:
+        return []
+    conn = connect(name)
+    try:
+        rows = conn.execute(
+            "SELECT path, offset, role, timestamp, snippet(messages, 0, '[', ']', '...', 16)"
+            " FROM messages WHERE messages MATCH ? ORDER BY rank LIMIT ?",
+            (match, limit),
+        ).fetchall()
+    except sqlite3.OperationalError as e:
+        raise ValueError(str(e)) from e
+    finally:
+        conn.close()
+    return [Hit(path, int(offset), role, timestamp, snippet) for path, offset, role, timestamp, snippet in rows]
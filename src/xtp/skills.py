@@ -0,0 +1,164 @@
+"""Shared skills store, linked into each profile's claude/skills/.
+
+Skills live once under CONFIG_DIR/skills/<skill>/ and are exposed to a
+profile as claude/skills/<skill>:
+
+- a symlink to the store directory (the default): edits in the store
+  show up everywhere at once and nothing is duplicated;
+- or a directory of hard links to the store's files (``hardlink=True``),
+  for tools that won't follow symlinks. It is marked with MARKER. Editors
+  that save by replacing a file break the link, so such a copy can go
+  stale; sync() relinks it.
+
+Anything else in claude/skills/ belongs to the profile and is left alone.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+
+from xtp import config
+
+STORE_NAME = "skills"
+MARKER = ".xtp-linked"
+
+OK = "ok"
+BROKEN = "broken"  # the skill is gone from the store
+STALE = "stale"  # hard-linked copy no longer matches the store
+
+
+@dataclass(frozen=True)
+class Link:
+    skill: str
+    kind: str  # "symlink" or "hardlink"
+    status: str
+
+
+def store_dir() -> Path:
+    return config.CONFIG_DIR / STORE_NAME
+
+
+def available() -> list[str]:
+    """Return the names of the skills in the store."""
+    try:
+        return sorted(
+            e.name for e in os.scandir(store_dir()) if e.is_dir() and not e.name.startswith(".")
+        )
+    except FileNotFoundError:
+        return []
+
+
+def skills_dir(name: str) -> Path:
+    return config.profile_dir(name) / "claude" / "skills"
+
+
+def links(name: str) -> list[Link]:
+    """Return the store skills linked into profile *name*, with their status."""
+    try:
+        entries = sorted(os.scandir(skills_dir(name)), key=lambda e: e.name)
+    except FileNotFoundError:
+        return []
+    result = []
+    for entry in entries:
+        link = _inspect(Path(entry.path))
+        if link is not None:
+            result.append(link)
+    return result
+
+
+def _inspect(path: Path) -> Link | None:
+    store = store_dir() / path.name
+    if path.is_symlink():
+        target = Path(os.readlink(path))
+        if target.parent != store_dir():
+            return None  # the profile's own symlink
+        return Link(path.name, "symlink", OK if target.is_dir() else BROKEN)
+    if not (path / MARKER).is_file():
+        return None
+    if not store.is_dir():
+        return Link(path.name, "hardlink", BROKEN)
+    return Link(path.name, "hardlink", OK if _same_files(store, path) else STALE)
+
+
+def _same_files(store: Path, copy: Path) -> bool:
+    """True if every file in *copy* is a hard link to the file at the same path in *store*."""
+    want = {rel: st for rel, st in _files(store)}
+    have = {rel: st for rel, st in _files(copy) if rel != MARKER}
+    if want.keys() != have.keys():
+        return False
+    return all(
+        (have[rel].st_dev, have[rel].st_ino) == (st.st_dev, st.st_ino) for rel, st in want.items()
+    )
+
+
+def _files(root: Path) -> list[tuple[str, os.stat_result]]:
+    found = []
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            found.append((os.path.relpath(path, root), os.stat(path, follow_symlinks=False)))
+    return found
+
+
+def link(name: str, skill: str, hardlink: bool = False) -> None:
+    """Expose store *skill* in profile *name*, replacing an earlier link.
+
+    Raises KeyError if the store has no such skill and FileExistsError if
+    the profile has its own skill of that name.
+    """
+    store = store_dir() / skill
+    if not store.is_dir():
+        raise KeyError(skill)
+    dest = skills_dir(name) / skill
+    if (dest.exists() or dest.is_symlink()) and _inspect(dest) is None:
+        raise FileExistsError(str(dest))
+    dest.parent.mkdir(parents=True, exist_ok=True)
+
+    tmp = dest.with_name(f".{skill}.xtp-partial")
+    _remove(tmp)
+    if hardlink:
+        shutil.copytree(store, tmp, copy_function=os.link, symlinks=True)
+        (tmp / MARKER).write_text(f"Hard links to {store}; managed by `xtp skills`.\n")
+    else:
+        tmp.symlink_to(store, target_is_directory=True)
+    if dest.is_dir() and not dest.is_symlink():
+        shutil.rmtree(dest)  # a directory can't be replaced by rename
+    os.replace(tmp, dest)
+
+
+def unlink(name: str, skill: str) -> None:
+    """Remove a linked skill from profile *name*; the store is untouched.
+
+    Raises KeyError if *skill* isn't linked into the profile.
+    """
+    dest = skills_dir(name) / skill
+    if _inspect(dest) is None:
+        raise KeyError(skill)
+    _remove(dest)
+
+
+def sync(name: str) -> list[tuple[str, str]]:
+    """Repair the profile's links; return (skill, what was done) for each change.
+
+    Stale hard-linked copies are relinked and links to skills that were
+    removed from the store are dropped.
+    """
+    changes = []
+    for item in links(name):
+        if item.status == BROKEN:
+            _remove(skills_dir(name) / item.skill)
+            changes.append((item.skill, "removed (no longer in the store)"))
+        elif item.status == STALE:
+            link(name, item.skill, hardlink=True)
+            changes.append((item.skill, "relinked"))
+    return changes
+
+
+def _remove(path: Path) -> None:
+    if path.is_symlink() or path.is_file():
+        path.unlink()
+    elif path.is_dir():
+        shutil.rmtree(path)
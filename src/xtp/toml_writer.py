@@ -1,46 +1,476 @@
-"""Minimal TOML serializer for writing profile configs.
+"""Minimal TOML writer for profile configs.
 
-Only supports flat key-value pairs and sections (tables) — no nested tables,
-arrays of tables, or inline tables. This is sufficient for profile.toml files.
+dumps() serializes a dict: scalars, arrays and inline tables as values,
+nested dicts as [a.b] tables and lists of dicts as [[a]] arrays of tables.
+
+patch() updates an existing document instead: it rewrites only the spans
+of the keys whose values changed, inserts added keys next to their
+siblings and removes deleted ones, so comments, ordering and formatting
+everywhere else survive. A patch that removes lines or adds tables is
+checked by parsing the result with tomllib; anything it can't express
+as a patch (say, a change inside an array of tables) falls back to
+dumps().
 """
 
 from __future__ import annotations
 
+import math
+
+_BARE_KEY = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_-")
+
+_ESCAPES = {'"': '\\"', "\\": "\\\\", "\b": "\\b", "\t": "\\t", "\n": "\\n", "\f": "\\f", "\r": "\\r"}
+
+
+# ── Serializing ────────────────────────────────────────────────────────────
 
 def dumps(data: dict) -> str:
     """Serialize a dict to a TOML string.
 
-    Top-level string keys without dict values are written first as bare key-value pairs.
-    Dict values become [section] tables.
+    Each table's own keys come first, then its sub-tables: dict values
+    become [section] tables and lists of dicts [[section]] entries.
     """
     lines: list[str] = []
+    _emit_table((), data, lines, array=False)
+    lines.append("")  # trailing newline
+    return "\n".join(lines)
+
+
+def _is_table_array(value: object) -> bool:
+    return isinstance(value, list) and bool(value) and all(isinstance(v, dict) for v in value)
 
-    # Write top-level bare key-value pairs first
-    for key, value in data.items():
-        if not isinstance(value, dict):
-            lines.append(f"{key} = {_format_value(value)}")
 
-    # Write sections
-    for key, value in data.items():
+def _emit_table(path: tuple[str, ...], table: dict, lines: list[str], array: bool) -> None:
+    simple = [
+        (k, v) for k, v in table.items() if not isinstance(v, dict) and not _is_table_array(v)
+    ]
+    nested = len(simple) < len(table)
+    if array or (path and (simple or not nested)):
+        if lines:
+            lines.append("")
+        header = format_path(path)
+        lines.append(f"[[{header}]]" if array else f"[{header}]")
+    for key, value in simple:
+        lines.append(f"{format_key(key)} = {format_value(value)}")
+    for key, value in table.items():
         if isinstance(value, dict):
-            if lines:
-                lines.append("")
-            lines.append(f"[{key}]")
-            for k, v in value.items():
-                lines.append(f"{k} = {_format_value(v)}")
+            _emit_table((*path, key), value, lines, array=False)
+        elif _is_table_array(value):
+            for item in value:
+                _emit_table((*path, key), item, lines, array=True)
+
+
+def format_key(key: str) -> str:
+    if key and all(c in _BARE_KEY for c in key):
+        return key
+    return _format_string(key)
 
-    lines.append("")  # trailing newline
-    return "\n".join(lines)
 
+def format_path(path: tuple[str, ...]) -> str:
+    return ".".join(format_key(k) for k in path)
 
-def _format_value(value: object) -> str:
+
+def _format_string(value: str) -> str:
+    out = []
+    for c in value:
+        escaped = _ESCAPES.get(c)
+        if escaped is None and (c < " " or c == "\x7f"):
+            escaped = f"\\u{ord(c):04x}"
+        out.append(escaped or c)
+    return f'"{"".join(out)}"'
+
+
+def format_value(value: object) -> str:
+    """Format *value* as it appears after ``key =``; tables go inline."""
     if isinstance(value, str):
-        escaped = value.replace("\\", "\\\\").replace('"', '\\"')
-        return f'"{escaped}"'
+        return _format_string(value)
     if isinstance(value, bool):
         return "true" if value else "false"
     if isinstance(value, int):
         return str(value)
     if isinstance(value, float):
-        return str(value)
+        if math.isnan(value):
+            return "nan"
+        if math.isinf(value):
+            return "inf" if value > 0 else "-inf"
+        return repr(value)
+    if isinstance(value, list):
+        return f"[{', '.join(format_value(v) for v in value)}]"
+    if isinstance(value, dict):
+        if not value:
+            return "{}"
+        items = ", ".join(f"{format_key(k)} = {format_value(v)}" for k, v in value.items())
+        return f"{{ {items} }}"
+    import datetime
+
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
     raise TypeError(f"Unsupported TOML value type: {type(value)}")
+
+
+# ── Patching ───────────────────────────────────────────────────────────────
+
+class _Unpatchable(Exception):
+    """The change can't be made as an in-place edit."""
+
+
+# Plain classes rather than dataclasses: importing dataclasses (and with
+# it inspect) would cost more than a whole `xtp list`.
+
+class _Section:
+    __slots__ = ("path", "start", "header_end", "end", "array", "in_array")
+
+    def __init__(
+        self, path: tuple[str, ...], start: int, header_end: int, end: int,
+        array: bool = False, in_array: bool = False,
+    ) -> None:
+        self.path = path
+        self.start = start  # start of the header line (0 for the root table)
+        self.header_end = header_end  # just past the header line
+        self.end = end  # just past the section's last key; comments after it belong to the next one
+        self.array = array  # [[header]]
+        self.in_array = in_array  # the header or one of its parents is an array of tables
+
+
+class _Entry:
+    __slots__ = ("path", "section", "start", "value_start", "value_end", "end")
+
+    def __init__(
+        self, path: tuple[str, ...], section: _Section, start: int,
+        value_start: int, value_end: int, end: int,
+    ) -> None:
+        self.path = path  # full key path
+        self.section = section
+        self.start = start  # start of the line
+        self.value_start = value_start
+        self.value_end = value_end
+        self.end = end  # just past the line's newline
+
+
+class _Doc:
+    __slots__ = ("text", "sections", "entries", "last", "edits", "tail", "reshaped")
+
+    def __init__(
+        self, text: str, sections: list[_Section],
+        entries: dict[tuple[str, ...], _Entry], last: dict[tuple[str, ...], _Entry],
+    ) -> None:
+        self.text = text
+        self.sections = sections
+        self.entries = entries
+        # table path -> the last key line adding to it (from its own section or a parent's)
+        self.last = last
+        self.edits: list[tuple[int, int, str]] = []  # (start, end, replacement)
+        # Tables appended at the end: path -> lines, headed by a blank line.
+        self.tail: dict[tuple[str, ...], list[str]] = {}
+        # Set by any edit other than rewriting a value or adding a key line
+        # after a sibling; only such patches need checking by a re-parse.
+        self.reshaped = False
+
+    def apply(self) -> str:
+        pieces = []
+        pos = 0
+        for start, end, replacement in sorted(self.edits, key=lambda e: (e[0], e[1])):
+            if start < pos:
+                continue  # inside a span that is already being removed
+            pieces.append(self.text[pos:start])
+            pieces.append(replacement)
+            pos = end
+        pieces.append(self.text[pos:])
+        if self.tail:
+            if pieces[-1] and not pieces[-1].endswith("\n"):
+                pieces.append("\n")
+            pieces.extend(line + "\n" for lines in self.tail.values() for line in lines)
+        return "".join(pieces)
+
+
+def _same(a: object, b: object) -> bool:
+    """Equality that also compares types, so 1 and True or 1 and 1.0 differ."""
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(_same(a[k], b[k]) for k in a)
+    if isinstance(a, list):
+        return len(a) == len(b) and all(_same(x, y) for x, y in zip(a, b))
+    if isinstance(a, float) and math.isnan(a):
+        return math.isnan(b)
+    return a == b
+
+
+def patch(text: str, data: dict, old: dict | None = None) -> str:
+    """Return *text* edited so that it parses to *data*.
+
+    Only the lines of changed, added and removed keys are touched. *old*
+    is *text* already parsed, if the caller has it; then a patch that only
+    rewrites values and adds keys next to their siblings parses nothing.
+    """
+    import tomllib
+
+    if old is None:
+        try:
+            old = tomllib.loads(text)
+        except tomllib.TOMLDecodeError:
+            return dumps(data)
+    if _same(old, data):
+        return text
+    try:
+        doc = _Doc(text, *_scan(text))
+        _diff(doc, (), old, data)
+        result = doc.apply()
+        if not doc.reshaped or _same(tomllib.loads(result), data):
+            return result
+    except (_Unpatchable, tomllib.TOMLDecodeError):
+        pass
+    return dumps(data)
+
+
+def _diff(doc: _Doc, path: tuple[str, ...], old: dict, new: dict) -> None:
+    for key, value in new.items():
+        sub = (*path, key)
+        entry = doc.entries.get(sub)
+        if key not in old:
+            _add(doc, path, key, value)
+        elif _same(old[key], value):
+            continue
+        elif entry is not None:
+            doc.edits.append((entry.value_start, entry.value_end, format_value(value)))
+        elif isinstance(old[key], dict) and isinstance(value, dict):
+            _diff(doc, sub, old[key], value)
+            if not value and not _has_header(doc, sub):
+                # Emptied, and it was only defined through its contents.
+                doc.reshaped = True
+                doc.tail.setdefault(sub, ["", f"[{format_path(sub)}]"])
+        else:
+            # A table becoming a value or the other way round: redefine it.
+            _remove(doc, sub, old[key])
+            _add(doc, path, key, value)
+    for key in old.keys() - new.keys():
+        _remove(doc, (*path, key), old[key])
+
+
+def _remove(doc: _Doc, path: tuple[str, ...], old: object) -> None:
+    doc.reshaped = True
+    entry = doc.entries.get(path)
+    if entry is not None:
+        doc.edits.append((entry.start, entry.end, ""))
+        return
+    if not isinstance(old, (dict, list)):
+        raise _Unpatchable(path)
+    # A table, or an array of tables: every line and section under it.
+    n = len(path)
+    found = False
+    for entry in doc.entries.values():
+        if entry.path[:n] == path:
+            doc.edits.append((entry.start, entry.end, ""))
+            found = True
+    for section in doc.sections:
+        if section.path[:n] == path and section.start < section.header_end:
+            doc.edits.append((section.start, section.end, ""))
+            found = True
+    if not found:
+        raise _Unpatchable(path)
+
+
+def _add(doc: _Doc, parent: tuple[str, ...], key: str, value: object) -> None:
+    n = len(parent)
+    if n and any(s.in_array and s.path[:n] == parent for s in doc.sections):
+        raise _Unpatchable(parent)  # inside an array of tables
+    if isinstance(value, dict) or _is_table_array(value):
+        doc.reshaped = True
+        lines: list[str] = [""]
+        if isinstance(value, dict):
+            _emit_table((*parent, key), value, lines, array=False)
+            if len(lines) == 1:  # only implicit sub-tables: define the table itself
+                lines.append(f"[{format_path((*parent, key))}]")
+        else:
+            for item in value:
+                _emit_table((*parent, key), item, lines, array=True)
+        doc.tail[(*parent, key)] = lines
+        return
+
+    line = f"{format_key(key)} = {format_value(value)}"
+    # Next to the last key already in the parent table, in the same style
+    # (a dotted key if that's how the parent was defined).
+    last = doc.last.get(parent)
+    doc.reshaped |= last is None  # placed anywhere but after a sibling
+    if last is not None:
+        line = f"{format_path((*parent[len(last.section.path):], key))} = {format_value(value)}"
+        pos = last.end
+    elif n == 0:
+        # Root keys must come before the first header.
+        first = next((s for s in doc.sections if s.path), None)
+        pos = first.start if first else len(doc.text)
+    elif _has_header(doc, parent):
+        pos = next(s for s in doc.sections if s.path == parent and not s.array).header_end
+    else:
+        # The parent only exists implicitly ([parent.child] headers): define it.
+        doc.tail.setdefault(parent, ["", f"[{format_path(parent)}]"]).append(line)
+        return
+    if pos > 0 and doc.text[pos - 1] != "\n":
+        line = "\n" + line
+    doc.edits.append((pos, pos, line + "\n"))
+
+
+def _has_header(doc: _Doc, path: tuple[str, ...]) -> bool:
+    return any(s.path == path and not s.array and s.start < s.header_end for s in doc.sections)
+
+
+# ── Scanning ───────────────────────────────────────────────────────────────
+# Just enough of a TOML lexer to find where each header, key and value is;
+# the text is known to be valid (tomllib parsed it first).
+
+def _scan(text: str) -> tuple[list[_Section], dict[tuple, _Entry], dict[tuple, _Entry]]:
+    import re
+
+    # Fast path for the common line: a bare key and a one-line string or scalar.
+    simple = re.compile(
+        r'([A-Za-z0-9_-]+)[ \t]*=[ \t]*("(?:[^"\\\r\n]|\\.)*"|[A-Za-z0-9_+.:-]+)[ \t]*(?:#.*)?(?:\n|$)'
+    )
+    root = _Section((), 0, 0, 0)
+    sections = [root]
+    entries: dict[tuple, _Entry] = {}
+    last: dict[tuple, _Entry] = {}
+    arrays: set[tuple[str, ...]] = set()
+    section = root
+    pos = 0
+    while (pos := _skip_blank(text, pos)) < len(text):
+        line_start = text.rfind("\n", 0, pos) + 1
+        if text[pos] == "[":
+            array = text.startswith("[[", pos)
+            keys, p = _scan_key(text, pos + (2 if array else 1))
+            p += 2 if array else 1
+            path = tuple(keys)
+            in_array = array or any(path[:i] in arrays for i in range(1, len(path)))
+            if array:
+                arrays.add(path)
+            header_end = _line_end(text, p)
+            section = _Section(path, line_start, header_end, header_end, array, in_array)
+            sections.append(section)
+            pos = section.header_end
+        else:
+            m = simple.match(text, pos)
+            if m:
+                keys = [m[1]]
+                p, value_end = m.span(2)
+                end = m.end()
+            else:
+                keys, p = _scan_key(text, pos)
+                p = _skip_spaces(text, p + 1)  # past "="
+                value_end = _scan_value(text, p)
+                end = _line_end(text, value_end)
+            if not section.in_array:
+                path = (*section.path, *keys)
+                entry = entries[path] = _Entry(path, section, line_start, p, value_end, end)
+                for i in range(len(section.path), len(path)):
+                    last[path[:i]] = entry
+            section.end = pos = end
+    return sections, entries, last
+
+
+def _skip_spaces(text: str, pos: int) -> int:
+    while pos < len(text) and text[pos] in " \t":
+        pos += 1
+    return pos
+
+
+def _skip_blank(text: str, pos: int) -> int:
+    """Skip whitespace, newlines and comments."""
+    while pos < len(text):
+        c = text[pos]
+        if c in " \t\r\n":
+            pos += 1
+        elif c == "#":
+            nl = text.find("\n", pos)
+            pos = len(text) if nl < 0 else nl + 1
+        else:
+            break
+    return pos
+
+
+def _line_end(text: str, pos: int) -> int:
+    """Return the position just past the newline ending the line at *pos*."""
+    nl = text.find("\n", pos)
+    return len(text) if nl < 0 else nl + 1
+
+
+def _scan_key(text: str, pos: int) -> tuple[list[str], int]:
+    """Read a (dotted) key; return its parts and the position past its spaces."""
+    parts = []
+    while True:
+        pos = _skip_spaces(text, pos)
+        c = text[pos]
+        if c == '"':
+            end = _scan_string(text, pos)
+            parts.append(_decode(text[pos:end]))
+        elif c == "'":
+            end = text.index("'", pos + 1) + 1
+            parts.append(text[pos + 1:end - 1])
+        else:
+            end = pos
+            while end < len(text) and text[end] in _BARE_KEY:
+                end += 1
+            parts.append(text[pos:end])
+        pos = _skip_spaces(text, end)
+        if pos < len(text) and text[pos] == ".":
+            pos += 1
+            continue
+        return parts, pos
+
+
+def _decode(quoted: str) -> str:
+    import tomllib
+
+    return tomllib.loads(f"k = {quoted}")["k"]
+
+
+def _scan_string(text: str, pos: int) -> int:
+    """Return the position after the string starting at *pos*."""
+    quote = text[pos]
+    if text.startswith(quote * 3, pos):
+        i = pos + 3
+        while True:
+            if quote == '"' and text[i] == "\\":
+                i += 2
+            elif text.startswith(quote * 3, i):
+                j = i + 3
+                while j < len(text) and text[j] == quote and j - i < 5:
+                    j += 1  # up to two quotes may end the content
+                return j
+            else:
+                i += 1
+    i = pos + 1
+    while text[i] != quote:
+        i += 2 if quote == '"' and text[i] == "\\" else 1
+    return i + 1
+
+
+def _scan_value(text: str, pos: int) -> int:
+    """Return the position after the value starting at *pos*."""
+    c = text[pos]
+    if c in "\"'":
+        return _scan_string(text, pos)
+    if c == "[":
+        i = pos + 1
+        while True:
+            i = _skip_blank(text, i)
+            if text[i] == "]":
+                return i + 1
+            if text[i] == ",":
+                i += 1
+            else:
+                i = _scan_value(text, i)
+    if c == "{":
+        i = pos + 1
+        while True:
+            i = _skip_blank(text, i)
+            if text[i] == "}":
+                return i + 1
+            if text[i] == ",":
+                i += 1
+            else:
+                _, i = _scan_key(text, i)
+                i = _scan_value(text, _skip_spaces(text, i + 1))
+    i = pos
+    while i < len(text) and text[i] not in ",]}#\r\n":
+        i += 1
+    while i > pos and text[i - 1] in " \t":
+        i -= 1
+    return i
@@ -0,0 +1,307 @@
+"""Compaction of old Claude Code transcripts into per-project archives.
+
+Transcripts are the ``*.jsonl`` files under a profile's claude/projects/.
+compact() moves the ones older than a cutoff into
+<profile>/claude-archive/<project>.jsonl.zst (or ``.gz`` when the
+zstandard module isn't installed). An archive is a concatenation of
+independently compressed members, one per transcript, so archiving only
+appends and extracting one session reads only its member.
+
+claude-archive/index.json records where each session's member lives::
+
+    {"archives": {"<project>.jsonl.gz": {"size": ...}},
+     "sessions": {"<project>/<id>.jsonl": {"archive": ..., "offset": ...,
+                  "length": ..., "size": ..., "mtime_ns": ...}}}
+
+Members are written and synced before the index, and a transcript is
+deleted only once the index naming it is saved. An archive is truncated
+to its indexed size before appending, dropping whatever an interrupted
+run left behind, so an archive missing from the index (or an index that
+can't be read) is an error: compact() never appends to, or truncates,
+an archive the index doesn't account for.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from xtp import config
+
+ARCHIVE_DIR = "claude-archive"
+INDEX_NAME = "index.json"
+DEFAULT_OLDER_THAN_DAYS = 30
+
+
+@dataclass(frozen=True)
+class Codec:
+    name: str
+    suffix: str
+    compress: Callable[[bytes], bytes]
+    decompress: Callable[[bytes], bytes]
+
+
+def _zstd() -> Codec:
+    import zstandard
+
+    # Compressor objects aren't thread-safe; make one per call.
+    return Codec(
+        "zstd", ".zst",
+        lambda data: zstandard.ZstdCompressor(level=10).compress(data),
+        lambda data: zstandard.ZstdDecompressor().decompress(data),
+    )
+
+
+def _gzip() -> Codec:
+    import gzip
+
+    return Codec("gzip", ".gz", lambda data: gzip.compress(data, 6, mtime=0), gzip.decompress)
+
+
+_CODECS: dict[str, Callable[[], Codec]] = {".zst": _zstd, ".gz": _gzip}
+
+
+def default_codec() -> Codec:
+    """Return zstd if the zstandard module is installed, else gzip."""
+    try:
+        return _zstd()
+    except ImportError:
+        return _gzip()
+
+
+def codec_for(archive: str) -> Codec:
+    """Return the codec of *archive*; raises ImportError if it isn't installed."""
+    return _CODECS[Path(archive).suffix]()
+
+
+@dataclass
+class GcStats:
+    files: int = 0
+    bytes: int = 0
+    compressed: int = 0
+    codec: str = ""
+    errors: list[str] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class Session:
+    key: str  # "<project>/<path>.jsonl", relative to claude/projects
+    archive: str
+    size: int
+    mtime_ns: int
+
+
+def projects_dir(name: str) -> Path:
+    return config.profile_dir(name) / "claude" / "projects"
+
+
+def archive_dir(name: str) -> Path:
+    return config.profile_dir(name) / ARCHIVE_DIR
+
+
+def cutoff(days: float | None = None) -> float:
+    """Return the mtime before which transcripts are archived.
+
+    *days* defaults to ``[claude_gc] older_than_days`` in the global
+    config, or DEFAULT_OLDER_THAN_DAYS.
+    """
+    if days is None:
+        days = config.load_global().get("claude_gc", {}).get(
+            "older_than_days", DEFAULT_OLDER_THAN_DAYS,
+        )
+    return time.time() - days * 86400
+
+
+def load_index(name: str) -> dict:
+    """Return claude-archive/index.json, empty if there is none yet.
+
+    Raises ValueError if it exists but can't be read: the archives'
+    members can't be located without it.
+    """
+    path = archive_dir(name) / INDEX_NAME
+    try:
+        data = json.loads(path.read_text())
+    except FileNotFoundError:
+        data = {}
+    except (OSError, ValueError) as e:
+        raise ValueError(f"{path} is unreadable ({e}); archives left untouched") from None
+    if not isinstance(data, dict):
+        raise ValueError(f"{path} is not an archive index; archives left untouched")
+    data.setdefault("archives", {})
+    data.setdefault("sessions", {})
+    return data
+
+
+def _save_index(name: str, index: dict) -> None:
+    config.write_atomic(archive_dir(name) / INDEX_NAME, json.dumps(index, indent=1) + "\n")
+
+
+def candidates(name: str, before: float) -> dict[str, list[tuple[str, os.stat_result]]]:
+    """Return {project: [(key, stat)]} for transcripts last modified before *before*."""
+    found: dict[str, list[tuple[str, os.stat_result]]] = {}
+    root = projects_dir(name)
+    try:
+        projects = sorted(e.name for e in os.scandir(root) if e.is_dir(follow_symlinks=False))
+    except FileNotFoundError:
+        return found
+    for project in projects:
+        for dirpath, dirnames, filenames in os.walk(root / project):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                if not filename.endswith(".jsonl"):
+                    continue
+                path = os.path.join(dirpath, filename)
+                st = os.stat(path, follow_symlinks=False)
+                if st.st_mtime < before:
+                    key = os.path.relpath(path, root).replace(os.sep, "/")
+                    found.setdefault(project, []).append((key, st))
+    return found
+
+
+def compact(name: str, before: float, dry_run: bool = False) -> GcStats:
+    """Archive the transcripts of profile *name* last modified before *before*.
+
+    With *dry_run*, only count them.
+    """
+    stats = GcStats()
+    found = candidates(name, before)
+    for files in found.values():
+        stats.files += len(files)
+        stats.bytes += sum(st.st_size for _, st in files)
+    if dry_run or not found:
+        return stats
+
+    archive_dir(name).mkdir(parents=True, exist_ok=True)
+    try:
+        index = load_index(name)
+    except ValueError as e:
+        stats.errors.append(str(e))
+        return stats
+    for project, files in found.items():
+        try:
+            archive, codec = _archive_for(index, project)
+        except ImportError as e:
+            stats.errors.append(f"{project}: {e}")
+            continue
+        if archive not in index["archives"] and (archive_dir(name) / archive).exists():
+            stats.errors.append(f"{archive} is not in {INDEX_NAME}; left untouched")
+            continue
+        stats.codec = stats.codec or codec.name
+        done = _append(name, index, archive, codec, files, stats)
+        _save_index(name, index)
+        for key, size, mtime_ns in done:
+            path = projects_dir(name) / key
+            try:
+                st = os.stat(path, follow_symlinks=False)
+                if (st.st_size, st.st_mtime_ns) != (size, mtime_ns):
+                    continue  # written to since it was archived: keep it
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+        _prune_empty(projects_dir(name) / project)
+    return stats
+
+
+def _archive_for(index: dict, project: str) -> tuple[str, Codec]:
+    """Return the archive that *project* appends to: its existing one, else a new one."""
+    for suffix in _CODECS:
+        archive = f"{project}.jsonl{suffix}"
+        if archive in index["archives"]:
+            return archive, codec_for(archive)
+    codec = default_codec()
+    return f"{project}.jsonl{codec.suffix}", codec
+
+
+def _append(
+    name: str, index: dict, archive: str, codec: Codec,
+    files: list[tuple[str, os.stat_result]], stats: GcStats,
+) -> list[tuple[str, int, int]]:
+    """Append *files* to *archive*.
+
+    Returns (key, size, mtime_ns) of each transcript now archived, as it
+    was when read: it may be deleted only if it still looks the same.
+    """
+    root = projects_dir(name)
+    done = []
+    path = archive_dir(name) / archive
+    size = index["archives"].get(archive, {}).get("size", 0)
+    with open(path, "ab+") as f:
+        f.truncate(size)  # drop a member an interrupted run didn't index
+        for key, st in files:
+            entry = index["sessions"].get(key)
+            if entry and (entry["size"], entry["mtime_ns"]) == (st.st_size, st.st_mtime_ns):
+                done.append((key, st.st_size, st.st_mtime_ns))  # extracted earlier, unchanged
+                continue
+            try:
+                with open(root / key, "rb") as src:
+                    st = os.fstat(src.fileno())
+                    data = src.read()
+            except OSError as e:
+                stats.errors.append(f"{key}: {e.strerror or e}")
+                continue
+            if len(data) != st.st_size:
+                continue  # being written to; archive it next time
+            member = codec.compress(data)
+            f.write(member)
+            index["sessions"][key] = {
+                "archive": archive, "offset": size, "length": len(member),
+                "size": len(data), "mtime_ns": st.st_mtime_ns,
+            }
+            size += len(member)
+            stats.compressed += len(member)
+            done.append((key, st.st_size, st.st_mtime_ns))
+        f.flush()
+        os.fsync(f.fileno())
+    index["archives"][archive] = {"size": size}
+    return done
+
+
+def _prune_empty(project: Path) -> None:
+    """Remove directories left empty below *project* (the project dir stays)."""
+    for dirpath, _, _ in os.walk(project, topdown=False):
+        if dirpath != str(project):
+            try:
+                os.rmdir(dirpath)
+            except OSError:
+                pass
+
+
+def sessions(name: str) -> list[Session]:
+    """Return the archived sessions of profile *name*, oldest first."""
+    result = [
+        Session(key, e["archive"], e["size"], e["mtime_ns"])
+        for key, e in load_index(name)["sessions"].items()
+    ]
+    return sorted(result, key=lambda s: (s.mtime_ns, s.key))
+
+
+def find(name: str, query: str) -> list[Session]:
+    """Return archived sessions whose key or session id (file stem) is *query*."""
+    return [s for s in sessions(name) if query in (s.key, Path(s.key).stem)]
+
+
+def extract(name: str, session: Session) -> Path:
+    """Restore *session* to claude/projects with its original mtime.
+
+    The archive keeps its copy: compacting the restored file again while
+    it is unchanged only deletes it. Raises FileExistsError if the
+    transcript is already there.
+    """
+    dest = projects_dir(name) / session.key
+    if dest.exists():
+        raise FileExistsError(str(dest))
+    entry = load_index(name)["sessions"][session.key]
+    codec = codec_for(session.archive)
+    with open(archive_dir(name) / session.archive, "rb") as f:
+        f.seek(entry["offset"])
+        data = codec.decompress(f.read(entry["length"]))
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(f".{dest.name}.xtp-partial")
+    tmp.write_bytes(data)
+    os.utime(tmp, ns=(entry["mtime_ns"], entry["mtime_ns"]))
+    os.replace(tmp, dest)
+    return dest
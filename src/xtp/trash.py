@@ -0,0 +1,138 @@
+"""Deleted profiles, kept in CONFIG_DIR/.trash until purged.
+
+Deleting a profile renames its directory to .trash/<name>.<deleted at, ns>.
+The rename is atomic and instant however large the profile is: the profile
+is gone from list_profiles at once, and an interrupted delete leaves it
+either in place or in the trash, never half removed. restore() renames it
+back.
+
+purge() removes entries older than the retention (``[trash] keep_days``
+in the global config, default DEFAULT_KEEP_DAYS), with fileops.remove_tree.
+An entry is first claimed by renaming it into .trash/.purging/ under the
+purging process's pid, so two purges never work on the same tree and one
+that was interrupted is finished by the next.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from xtp import config, fileops, index
+
+TRASH_NAME = ".trash"
+PURGING_NAME = ".purging"
+DEFAULT_KEEP_DAYS = 7
+
+
+@dataclass(frozen=True)
+class Entry:
+    name: str
+    deleted_ns: int
+    path: Path
+
+
+def trash_dir() -> Path:
+    return config.CONFIG_DIR / TRASH_NAME
+
+
+def keep_days() -> float:
+    return config.load_global().get("trash", {}).get("keep_days", DEFAULT_KEEP_DAYS)
+
+
+def move(name: str) -> Entry:
+    """Move profile *name* into the trash."""
+    trash_dir().mkdir(parents=True, exist_ok=True)
+    deleted_ns = time.time_ns()
+    dest = trash_dir() / f"{name}.{deleted_ns}"
+    with config.profile_lock(name):
+        os.rename(config.profile_dir(name), dest)
+    index.remove(name)
+    config.bump_generation()
+    return Entry(name, deleted_ns, dest)
+
+
+def entries() -> list[Entry]:
+    """Return the trashed profiles, oldest first."""
+    found = []
+    try:
+        scan = list(os.scandir(trash_dir()))
+    except FileNotFoundError:
+        return found
+    for e in scan:
+        name, _, stamp = e.name.rpartition(".")
+        if name and stamp.isdigit() and e.is_dir(follow_symlinks=False):
+            found.append(Entry(name, int(stamp), Path(e.path)))
+    return sorted(found, key=lambda entry: entry.deleted_ns)
+
+
+def restore(name: str) -> Entry:
+    """Move the most recently deleted profile *name* back.
+
+    Raises KeyError if the trash has none and FileExistsError if a
+    profile of that name exists again.
+    """
+    matches = [e for e in entries() if e.name == name]
+    if not matches:
+        raise KeyError(name)
+    entry = matches[-1]
+    dest = config.profile_dir(name)
+    if dest.exists():
+        raise FileExistsError(str(dest))
+    os.rename(entry.path, dest)
+    index.update(name)
+    config.bump_generation(name)
+    return entry
+
+
+def purge(
+    older_than_days: float | None = None, jobs: int | None = None, dry_run: bool = False,
+) -> tuple[list[Entry], list[str]]:
+    """Remove trash entries deleted more than *older_than_days* ago.
+
+    Returns (entries purged, or to purge with *dry_run*; errors).
+    """
+    days = keep_days() if older_than_days is None else older_than_days
+    cutoff_ns = time.time_ns() - int(days * 86400e9)
+    due = [e for e in entries() if e.deleted_ns <= cutoff_ns]
+    if dry_run:
+        return due, []
+
+    purging = trash_dir() / PURGING_NAME
+    purging.mkdir(parents=True, exist_ok=True)
+    pid = os.getpid()
+    claimed = []
+    for entry in due:
+        try:
+            os.rename(entry.path, purging / f"{entry.path.name}.{pid}")
+        except FileNotFoundError:
+            continue  # another purge took it
+        claimed.append(entry)
+
+    errors: list[str] = []
+    for e in list(os.scandir(purging)):
+        base, _, owner = e.name.rpartition(".")
+        path = Path(e.path)
+        if owner != str(pid):
+            if owner.isdigit() and _alive(int(owner)):
+                continue
+            # Left by an interrupted purge: take it over.
+            path = purging / f"{base}.{pid}"
+            try:
+                os.rename(e.path, path)
+            except FileNotFoundError:
+                continue
+        errors += fileops.remove_tree(path, jobs=jobs)[1]
+    return claimed, errors
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
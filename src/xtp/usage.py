@@ -0,0 +1,105 @@
+"""Incremental disk usage index for profile directories.
+
+A full walk of a heavy profile's claude/ tree touches hundreds of
+thousands of transcript files. The index remembers, for every directory,
+its mtime, the count and size of the files directly inside it and its
+subdirectory names. On the next scan a directory whose mtime is unchanged
+is not listed again: only the directories themselves are stat-ed.
+
+A directory's mtime changes when entries are added, removed or renamed,
+but not when a file inside it is rewritten in place, so byte totals of
+appended-to files can lag until the directory changes; ``rescan=True``
+forces a full walk.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+from xtp import config
+
+INDEX_NAME = ".usage-index.json"
+_VERSION = 1
+
+
+@dataclass
+class Usage:
+    files: int = 0
+    bytes: int = 0
+
+    def __iadd__(self, other: Usage) -> Usage:
+        self.files += other.files
+        self.bytes += other.bytes
+        return self
+
+
+def scan(pdir: Path, rescan: bool = False) -> dict[str, Usage]:
+    """Return subtree totals for every directory under *pdir*.
+
+    Keys are paths relative to *pdir* using "/" ("" is *pdir* itself).
+    """
+    index_path = pdir / INDEX_NAME
+    old = {} if rescan else _read(index_path)
+    new: dict[str, list] = {}
+    totals: dict[str, Usage] = {}
+    _walk(str(pdir), "", old, new, totals)
+    if new != old:
+        try:
+            config.write_atomic(index_path, json.dumps({"version": _VERSION, "dirs": new}))
+        except OSError:
+            pass  # index is best-effort
+    return totals
+
+
+def _walk(
+    path: str, rel: str, old: dict[str, list], new: dict[str, list], totals: dict[str, Usage],
+) -> Usage:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return Usage()
+    mtime = None if config.is_racy(st) else st.st_mtime_ns
+
+    prev = old.get(rel)
+    if prev is not None and mtime is not None and prev[0] == mtime:
+        _, files, nbytes, subdirs = prev
+    else:
+        files = nbytes = 0
+        subdirs = []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    if not rel and (entry.name == INDEX_NAME or entry.name.startswith(f".{INDEX_NAME}.")):
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.name)
+                        elif entry.is_file():
+                            files += 1
+                            nbytes += entry.stat().st_size
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        subdirs.sort()
+
+    new[rel] = [mtime, files, nbytes, subdirs]
+    total = Usage(files, nbytes)
+    for sub in subdirs:
+        total += _walk(f"{path}/{sub}", f"{rel}/{sub}" if rel else sub, old, new, totals)
+    totals[rel] = total
+    return total
+
+
+def _read(path: Path) -> dict[str, list]:
+    try:
+        with open(path, "rb") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != _VERSION:
+        return {}
+    return data.get("dirs", {})
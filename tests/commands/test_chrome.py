@@ -3,10 +3,34 @@
 from __future__ import annotations
 
 import json
+import os
 
+import pytest
+
+from xtp.commands import chrome
 from xtp.commands.chrome import get_chrome_profiles
 
 
+@pytest.fixture(autouse=True)
+def _isolated(profiles_dir, tmp_path, monkeypatch):
+    """Keep discovery away from the real home dir and per-process memos."""
+    monkeypatch.setattr(chrome, "LINUX_LOCATIONS", (
+        (tmp_path / "linux" / "google-chrome" / "Local State", "google-chrome"),
+        (tmp_path / "linux" / "chromium" / "Local State", "chromium"),
+    ))
+    monkeypatch.setattr(chrome, "_located", {})
+    monkeypatch.setattr(chrome, "_parsed", {})
+
+
+def _write_local_state(path, info_cache, **extra):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({**extra, "profile": {"info_cache": info_cache}}))
+    # Age the file so its stat key is trusted by the caches.
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns - 10_000_000_000))
+    return path
+
+
 class TestGetChromeProfiles:
     def test_missing_file_returns_empty(self, tmp_path, monkeypatch):
         import xtp.commands.chrome as mod
@@ -31,3 +55,51 @@ class TestGetChromeProfiles:
         dirs = [p[0] for p in profiles]
         assert "Default" in dirs
         assert "Profile 1" in dirs
+
+    def test_skips_unrelated_members(self, tmp_path, monkeypatch):
+        local_state = _write_local_state(
+            tmp_path / "Local State",
+            {"Profile 2": {"name": "Client \"X\" {}"}},
+            big={"nested": [{"info_cache": "decoy"}, ']}"['] * 1000},
+        )
+        monkeypatch.setattr(chrome, "CHROME_LOCAL_STATE", local_state)
+        assert get_chrome_profiles() == [("Profile 2", 'Client "X" {}')]
+
+    def test_skips_nested_decoy_of_the_same_shape(self, tmp_path, monkeypatch):
+        local_state = _write_local_state(
+            tmp_path / "Local State",
+            {"Profile 2": {"name": "Work"}},
+            aaa={"sync": {"info_cache": {"cache-1": {"bytes": 12}}}},
+        )
+        monkeypatch.setattr(chrome, "CHROME_LOCAL_STATE", local_state)
+        assert get_chrome_profiles() == [("Profile 2", "Work")]
+
+    def test_malformed_returns_empty(self, tmp_path, monkeypatch):
+        local_state = tmp_path / "Local State"
+        local_state.write_text('{"profile": {"info_cache": {')
+        monkeypatch.setattr(chrome, "CHROME_LOCAL_STATE", local_state)
+        assert get_chrome_profiles() == []
+
+    def test_linux_location_found(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(chrome, "CHROME_LOCAL_STATE", tmp_path / "nope")
+        monkeypatch.setattr(chrome.sys, "platform", "linux")
+        _write_local_state(chrome.LINUX_LOCATIONS[1][0], {"Default": {"name": "Me"}})
+        assert get_chrome_profiles() == [("Default", "Me")]
+        assert chrome.launcher() == ["chromium"]
+
+    def test_cached_until_file_changes(self, tmp_path, monkeypatch):
+        local_state = _write_local_state(tmp_path / "Local State", {"Default": {"name": "A"}})
+        monkeypatch.setattr(chrome, "CHROME_LOCAL_STATE", local_state)
+        assert get_chrome_profiles() == [("Default", "A")]
+
+        calls = []
+        real_parse = chrome._parse
+        monkeypatch.setattr(chrome, "_parse", lambda p: calls.append(p) or real_parse(p))
+        get_chrome_profiles()
+        monkeypatch.setattr(chrome, "_parsed", {})  # a new process: disk cache only
+        get_chrome_profiles()
+        assert calls == []
+
+        _write_local_state(local_state, {"Default": {"name": "A"}, "Profile 1": {"name": "B"}})
+        assert len(get_chrome_profiles()) == 2
+        assert calls == [local_state]
@@ -0,0 +1,57 @@
+"""Tests for xtp.commands.claude_gc."""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+
+import pytest
+
+from xtp import transcripts
+from xtp.commands.claude_gc import run
+
+OLD = time.time() - 90 * 86400
+
+
+@pytest.fixture()
+def profiles(fake_profile, monkeypatch):
+    monkeypatch.setitem(sys.modules, "zstandard", None)
+    for name in ("acme", "personal"):
+        path = fake_profile(name, {}) / "claude" / "projects" / "-p" / f"{name}-s.jsonl"
+        path.parent.mkdir(parents=True)
+        path.write_text("x\n" * 100)
+        os.utime(path, (OLD, OLD))
+
+
+class TestClaudeGc:
+    def test_all_profiles(self, profiles, capsys):
+        run(all_profiles=True, older_than=30)
+        out = capsys.readouterr().out
+        assert "acme: archived 1 transcripts, 200 B" in out
+        assert "personal: archived 1 transcripts" in out
+        assert transcripts.find("personal", "personal-s")
+
+    def test_dry_run(self, profiles, capsys):
+        run("acme", dry_run=True)
+        assert "acme: would archive 1 transcripts (200 B)" in capsys.readouterr().out
+        assert transcripts.sessions("acme") == []
+
+    def test_list_and_extract(self, profiles, capsys):
+        run("acme")
+        capsys.readouterr()
+        run("acme", list_sessions=True)
+        assert "-p/acme-s.jsonl" in capsys.readouterr().out
+        run("acme", extract="acme-s")
+        assert "Restored" in capsys.readouterr().out
+
+    def test_extract_unknown_exits_1(self, profiles, capsys):
+        with pytest.raises(SystemExit) as exc:
+            run("acme", extract="nope")
+        assert exc.value.code == 1
+        assert "no archived session 'nope'" in capsys.readouterr().out
+
+    def test_missing_profile_exits_1(self, profiles_dir, capsys):
+        with pytest.raises(SystemExit):
+            run("ghost")
+        assert "Profile 'ghost' not found" in capsys.readouterr().out
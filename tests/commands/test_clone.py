@@ -0,0 +1,101 @@
+"""Tests for xtp.commands.clone."""
+
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from xtp import activate, config
+from xtp.commands.clone import run
+
+
+@pytest.fixture()
+def acme(fake_profile):
+    pdir = fake_profile("acme", {
+        "profile": {"description": "Acme"},
+        "git": {"author_name": "Alice", "author_email": "alice@acme.com"},
+        "npm": {"isolate": True},
+    })
+    (pdir / "claude" / "skills" / "deploy").mkdir(parents=True)
+    (pdir / "claude" / "skills" / "deploy" / "SKILL.md").write_text("# deploy\n")
+    (pdir / "claude" / ".credentials.json").write_text('{"token": "t"}')
+    (pdir / "gh").mkdir()
+    (pdir / "gh" / "config.yml").write_text("git_protocol: ssh\n")
+    (pdir / "gh" / "hosts.yml").write_text("github.com:\n  oauth_token: secret\n")
+    (pdir / "aws").mkdir()
+    (pdir / "aws" / "config").write_text("[profile acme]\n")
+    (pdir / "aws" / "credentials").write_text("[acme]\naws_secret_access_key = x\n")
+    (pdir / "npmrc").write_text("registry=https://npm.acme.com/\n//npm.acme.com/:_authToken=abc\n")
+    (pdir / ".env-cache.json").write_text("{}")
+    return pdir
+
+
+class TestClone:
+    def test_clone_with_override(self, acme, capsys):
+        run("acme", "acme2", ["git.author_email=bob@acme.com"])
+        data = config.load_profile("acme2")
+        assert data["git"] == {"author_name": "Alice", "author_email": "bob@acme.com"}
+        dst = config.profile_dir("acme2")
+        assert (dst / "claude" / "skills" / "deploy" / "SKILL.md").read_text() == "# deploy\n"
+        assert (dst / "gh" / "config.yml").is_file()
+        assert (dst / "aws" / "config").is_file()
+        assert activate.script_path("acme2", "zsh").is_file()
+        assert config.build_env("acme2")["GIT_AUTHOR_EMAIL"] == "bob@acme.com"
+        out = capsys.readouterr().out
+        assert "gh/hosts.yml" in out
+        assert "xtp init-gh acme2" in out
+
+    def test_keeps_source_comments_and_layout(self, acme):
+        text = (
+            "# Acme work identity\n"
+            "[profile]\n"
+            'description = "Acme"  # shown by xtp list\n'
+            "\n"
+            "[git]\n"
+            "author_name  = 'Alice'\n"
+            'author_email = "alice@acme.com"\n'
+        )
+        (acme / "profile.toml").write_text(text)
+        run("acme", "plain")
+        assert config.profile_toml("plain").read_text() == text
+        run("acme", "acme2", ["git.author_email=bob@acme.com"])
+        assert config.profile_toml("acme2").read_text() == text.replace("alice@", "bob@")
+
+    def test_credentials_left_out(self, acme):
+        run("acme", "acme2")
+        dst = config.profile_dir("acme2")
+        assert not (dst / "gh" / "hosts.yml").exists()
+        assert not (dst / "aws" / "credentials").exists()
+        assert not (dst / "claude" / ".credentials.json").exists()
+        assert (dst / "npmrc").read_text() == "registry=https://npm.acme.com/\n"
+        assert (dst / ".env-cache.json").read_text() != "{}"  # regenerated, not copied
+
+    def test_with_credentials(self, acme):
+        run("acme", "acme2", with_credentials=True)
+        dst = config.profile_dir("acme2")
+        assert (dst / "gh" / "hosts.yml").is_file()
+        assert "_authToken" in (dst / "npmrc").read_text()
+
+    def test_read_only_files_share_storage(self, acme):
+        skill = acme / "claude" / "skills" / "deploy" / "SKILL.md"
+        os.chmod(skill, 0o444)
+        run("acme", "acme2")
+        cloned = config.profile_dir("acme2") / "claude" / "skills" / "deploy" / "SKILL.md"
+        same = cloned.stat().st_ino == skill.stat().st_ino
+        assert same or cloned.read_text() == skill.read_text()
+        assert cloned.stat().st_mode & 0o222 == 0
+
+    def test_missing_source(self, profiles_dir):
+        with pytest.raises(SystemExit):
+            run("nope", "new")
+
+    def test_existing_destination(self, acme, fake_profile):
+        fake_profile("taken", {})
+        with pytest.raises(SystemExit):
+            run("acme", "taken")
+
+    def test_bad_override_creates_nothing(self, acme):
+        with pytest.raises(SystemExit):
+            run("acme", "acme2", ["nonsense"])
+        assert not config.profile_dir("acme2").exists()
@@ -0,0 +1,138 @@
+"""Tests for xtp.commands.daemon and the client in xtp.daemon."""
+
+from __future__ import annotations
+
+import os
+import socket
+import threading
+
+import pytest
+
+from xtp import activate, daemon
+from xtp.commands.daemon import State, answer, serve
+
+
+def _age(pdir):
+    old = 1_000_000_000
+    os.utime(pdir / "profile.toml", (old, old))
+
+
+@pytest.fixture()
+def server():
+    """Run serve() on daemon.SOCKET in a thread; stop it afterwards."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(daemon.SOCKET)
+    sock.listen()
+    state = State()
+    thread = threading.Thread(target=serve, args=(sock, state), daemon=True)
+    thread.start()
+    yield state
+    daemon.query({"command": "stop"})
+    thread.join(timeout=5)
+    sock.close()
+
+
+class TestState:
+    def test_env_memoized_until_toml_changes(self, fake_profile, monkeypatch):
+        pdir = fake_profile("demo", {"git": {"author_name": "Bob"}})
+        _age(pdir)
+        state = State()
+        assert state.env("demo")["GIT_AUTHOR_NAME"] == "Bob"
+
+        calls = []
+        monkeypatch.setattr("xtp.config.build_env", lambda name: calls.append(name) or {})
+        state.env("demo")
+        assert calls == []
+
+        fake_profile("demo", {"git": {"author_name": "Alice"}})
+        _age(pdir)
+        os.utime(pdir / "profile.toml", (1_000_000_100, 1_000_000_100))
+        state.env("demo")
+        assert calls == ["demo"]
+
+    def test_fresh_toml_not_memoized(self, fake_profile):
+        fake_profile("demo", {"git": {"author_name": "Bob"}})
+        state = State()
+        state.env("demo")
+        assert state.envs == {}
+
+    def test_missing_profile_raises(self, profiles_dir):
+        with pytest.raises(FileNotFoundError):
+            State().profile("nope")
+
+
+class TestAnswer:
+    def test_current_uses_client_env(self):
+        reply = answer(State(), {"command": "current", "environ": {"XTP_PROFILE": "acme"}})
+        assert reply == {"code": 0, "out": "acme\n", "err": ""}
+
+    def test_list_marks_client_profile(self, fake_profile):
+        fake_profile("alpha", {"profile": {"description": "A"}})
+        fake_profile("beta", {})
+        reply = answer(State(), {"command": "list", "environ": {"XTP_PROFILE": "beta"}})
+        assert "alpha  (A)" in reply["out"]
+        assert "beta *" in reply["out"]
+
+    def test_env_export_uses_client_shell(self, fake_profile):
+        fake_profile("demo", {"git": {"author_name": "Bob"}})
+        request = {"command": "env", "name": "demo", "export": True, "shell": None,
+                   "environ": {"SHELL": "/usr/bin/fish"}}
+        reply = answer(State(), request)
+        assert "set -gx GIT_AUTHOR_NAME 'Bob'" in reply["out"]
+        assert activate.script_path("demo", "fish").is_file()
+
+    def test_missing_profile(self, profiles_dir):
+        reply = answer(State(), {"command": "env", "name": "nope", "export": False})
+        assert reply["code"] == 1
+        assert "not found" in reply["err"]
+
+    def test_show(self, fake_profile):
+        fake_profile("demo", {"git": {"author_name": "Bob"}})
+        reply = answer(State(), {"command": "show", "name": "demo"})
+        assert "Profile: demo" in reply["out"]
+        assert "GIT_AUTHOR_NAME=Bob" in reply["out"]
+
+    @pytest.mark.parametrize(
+        ("exit_code", "code", "err"),
+        [(None, 0, ""), (0, 0, ""), (3, 3, ""), ("Error: boom", 1, "Error: boom\n")],
+    )
+    def test_exit_codes_follow_the_interpreter(self, monkeypatch, exit_code, code, err):
+        def dispatch(state, request, environ):
+            raise SystemExit(exit_code)
+
+        monkeypatch.setattr("xtp.commands.daemon._dispatch", dispatch)
+        reply = answer(State(), {"command": "current"})
+        assert (reply["code"], reply["err"]) == (code, err)
+
+    def test_unknown_command(self):
+        with pytest.raises(KeyError):
+            answer(State(), {"command": "create"})
+
+
+class TestClient:
+    def test_no_socket_runs_directly(self):
+        assert daemon.query({"command": "list"}) is None
+
+    def test_stale_socket_runs_directly(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(daemon.SOCKET)
+        sock.close()  # file left behind, nobody listening
+        assert daemon.query({"command": "list"}) is None
+
+    def test_round_trip(self, fake_profile, server, monkeypatch):
+        fake_profile("demo", {"git": {"author_name": "Bob"}})
+        monkeypatch.setenv("XTP_PROFILE", "demo")
+        reply = daemon.query({"command": "list"})
+        assert reply["code"] == 0
+        assert "demo *" in reply["out"]
+
+    def test_unhandled_request_falls_back(self, server):
+        assert daemon.query({"command": "create", "name": "x"}) is None
+
+    def test_edit_visible_on_next_query(self, fake_profile, server):
+        pdir = fake_profile("demo", {"git": {"author_name": "Bob"}})
+        _age(pdir)
+        request = {"command": "env", "name": "demo", "export": False}
+        assert "GIT_AUTHOR_NAME=Bob" in daemon.query(request)["out"]
+        fake_profile("demo", {"git": {"author_name": "Alice"}})
+        assert "GIT_AUTHOR_NAME=Alice" in daemon.query(request)["out"]
@@ -6,9 +6,17 @@ from unittest.mock import patch
 
 import pytest
 
+from xtp import config, trash
 from xtp.commands.delete import run
 
 
+@pytest.fixture(autouse=True)
+def no_background(monkeypatch):
+    calls = []
+    monkeypatch.setattr("xtp.commands.delete._purge_in_background", lambda: calls.append(1))
+    return calls
+
+
 class TestDelete:
     def test_missing_profile_exits_1(self, profiles_dir):
         with pytest.raises(SystemExit) as exc_info:
@@ -20,6 +28,7 @@ class TestDelete:
         with patch("builtins.input", return_value="y"):
             run("doomed")
         assert not pdir.is_dir()
+        assert [e.name for e in trash.entries()] == ["doomed"]
 
     def test_confirm_n_cancels(self, fake_profile, capsys):
         pdir = fake_profile("safe", {"name": "safe"})
@@ -27,3 +36,29 @@ class TestDelete:
             run("safe")
         assert pdir.is_dir()
         assert "Cancelled" in capsys.readouterr().out
+
+    def test_undo_restores(self, fake_profile, capsys):
+        pdir = fake_profile("oops", {"name": "oops"})
+        with patch("builtins.input", return_value="y"):
+            run("oops")
+        run("oops", undo=True)
+        assert (pdir / "profile.toml").is_file()
+        assert config.list_profiles() == ["oops"]
+        assert "restored" in capsys.readouterr().out
+
+    def test_undo_unknown_exits_1(self, profiles_dir, capsys):
+        with pytest.raises(SystemExit) as exc_info:
+            run("never", undo=True)
+        assert exc_info.value.code == 1
+        assert "no deleted profile 'never'" in capsys.readouterr().out
+
+    def test_background_purge_only_when_due(self, fake_profile, no_background):
+        fake_profile("a", {})
+        fake_profile("b", {})
+        with patch("builtins.input", return_value="y"):
+            run("a")
+        assert no_background == []
+        config.GLOBAL_CONFIG.write_text("[trash]\nkeep_days = 0\n")
+        with patch("builtins.input", return_value="y"):
+            run("b")
+        assert no_background == [1]
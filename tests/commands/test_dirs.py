@@ -0,0 +1,30 @@
+"""Tests for xtp.commands.dirs."""
+
+from __future__ import annotations
+
+from xtp import config
+from xtp.commands.dirs import run
+
+
+class TestDirs:
+    def test_no_mapping(self, profiles_dir, capsys):
+        run()
+        assert "No directories mapped" in capsys.readouterr().out
+
+    def test_lists_and_flags_missing(self, fake_profile, capsys):
+        fake_profile("acme", {})
+        config.GLOBAL_CONFIG.write_text('[directories]\n"/work/acme" = "acme"\n"/work/old" = "old"\n')
+        run()
+        out = capsys.readouterr().out
+        assert "/work/acme  acme\n" in out
+        assert "old  (profile not found)" in out
+
+    def test_resolve_path(self, profiles_dir, capsys):
+        config.GLOBAL_CONFIG.write_text('[directories]\n"/work/acme" = "acme"\n')
+        run("/work/acme/api")
+        run("/elsewhere")
+        assert capsys.readouterr().out.split() == ["acme", "none"]
+
+    def test_hook_prints_path(self, profiles_dir, capsys):
+        run(hook=True)
+        assert capsys.readouterr().out.strip().endswith("chpwd.zsh")
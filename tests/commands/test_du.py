@@ -0,0 +1,41 @@
+"""Tests for xtp.commands.du."""
+
+from __future__ import annotations
+
+import pytest
+
+from xtp.commands.du import format_size, run
+
+
+class TestDu:
+    def test_missing_profile_exits_1(self, profiles_dir):
+        with pytest.raises(SystemExit) as exc_info:
+            run("nonexistent")
+        assert exc_info.value.code == 1
+
+    def test_reports_subdirs(self, fake_profile, capsys):
+        pdir = fake_profile("acme", {"name": "acme"})
+        (pdir / "claude" / "projects").mkdir(parents=True)
+        (pdir / "claude" / "projects" / "t.jsonl").write_text("x" * 2048)
+        (pdir / "gh").mkdir()
+        run("acme")
+        out = capsys.readouterr().out
+        assert "claude/projects" in out
+        assert "2.0 KB" in out
+        assert "gh" in out
+        assert "total" in out
+
+    def test_all_profiles(self, fake_profile, capsys):
+        fake_profile("a", {"name": "a"})
+        fake_profile("b", {"name": "b"})
+        run(all_profiles=True)
+        out = capsys.readouterr().out
+        assert "a\n" in out and "b\n" in out
+
+
+class TestFormatSize:
+    @pytest.mark.parametrize("n,expected", [
+        (0, "0 B"), (1023, "1023 B"), (1024, "1.0 KB"), (5 * 1024**3, "5.0 GB"),
+    ])
+    def test_units(self, n, expected):
+        assert format_size(n) == expected
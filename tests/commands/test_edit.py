@@ -0,0 +1,73 @@
+"""Tests for xtp.commands.edit."""
+
+from __future__ import annotations
+
+import subprocess
+import threading
+
+import pytest
+
+from xtp import config
+from xtp.commands.edit import run
+
+
+def _editor(monkeypatch, edit):
+    """Replace the editor with *edit*, called with the path it was given."""
+    def fake_run(argv):
+        edit(argv[1])
+        return subprocess.CompletedProcess(argv, 0)
+
+    monkeypatch.setattr(subprocess, "run", fake_run)
+
+
+def _append(path: str, text: str) -> None:
+    with open(path, "a") as f:
+        f.write(text)
+
+
+def _exit_code(name: str) -> int:
+    with pytest.raises(SystemExit) as exc_info:
+        run(name)
+    return exc_info.value.code
+
+
+class TestEdit:
+    def test_missing_profile_exits_1(self, profiles_dir):
+        assert _exit_code("nonexistent") == 1
+
+    def test_edit_replaces_profile(self, fake_profile, monkeypatch):
+        pdir = fake_profile("acme", {"profile": {"description": "Old"}})
+        before = config.generation("acme")
+        _editor(monkeypatch, lambda p: _append(p, "# edited\n"))
+        assert _exit_code("acme") == 0
+        assert (pdir / "profile.toml").read_text().endswith("# edited\n")
+        assert config.generation("acme") > before
+        assert not list(pdir.glob(".profile.*"))
+
+    def test_unchanged_is_not_written(self, fake_profile, monkeypatch):
+        pdir = fake_profile("acme", {"profile": {"description": "Old"}})
+        ino = (pdir / "profile.toml").stat().st_ino
+        _editor(monkeypatch, lambda p: None)
+        assert _exit_code("acme") == 0
+        assert (pdir / "profile.toml").stat().st_ino == ino
+
+    def test_lock_free_while_editing_and_concurrent_change_kept(self, fake_profile, monkeypatch, capsys):
+        pdir = fake_profile("acme", {"profile": {"description": "Old"}})
+
+        def edit(path):
+            # Another writer gets through while the editor is open...
+            writer = threading.Thread(
+                target=config.save_profile, args=("acme", {"profile": {"description": "Theirs"}}),
+            )
+            writer.start()
+            writer.join(timeout=10)
+            assert not writer.is_alive()
+            _append(path, "# mine\n")
+
+        _editor(monkeypatch, edit)
+        assert _exit_code("acme") == 1
+        # ...and its change is not overwritten; the edit is kept aside.
+        assert config.load_profile("acme") == {"profile": {"description": "Theirs"}}
+        kept = list(pdir.glob(".profile.*.toml"))
+        assert len(kept) == 1 and kept[0].read_text().endswith("# mine\n")
+        assert str(kept[0]) in capsys.readouterr().out
@@ -0,0 +1,33 @@
+"""Tests for xtp.commands.env."""
+
+from __future__ import annotations
+
+import pytest
+
+from xtp import activate
+from xtp.commands.env import run, run_activate
+
+
+class TestEnv:
+    def test_missing_profile_exits_1(self, profiles_dir):
+        with pytest.raises(SystemExit) as exc_info:
+            run("nonexistent")
+        assert exc_info.value.code == 1
+
+    def test_plain_listing(self, fake_profile, capsys):
+        fake_profile("demo", {"git": {"author_name": "Bob"}})
+        run("demo")
+        assert "GIT_AUTHOR_NAME=Bob" in capsys.readouterr().out
+
+    def test_export_prints_script_and_caches_file(self, fake_profile, capsys):
+        fake_profile("demo", {"git": {"author_name": "Bob"}})
+        run("demo", export=True, shell="zsh")
+        assert "export GIT_AUTHOR_NAME='Bob'" in capsys.readouterr().out
+        assert activate.script_path("demo", "zsh").is_file()
+
+
+class TestActivate:
+    def test_prints_script_path(self, fake_profile, capsys):
+        fake_profile("demo", {"name": "demo"})
+        run_activate("demo", shell="fish")
+        assert capsys.readouterr().out.strip() == str(activate.script_path("demo", "fish"))
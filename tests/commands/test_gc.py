@@ -0,0 +1,33 @@
+"""Tests for xtp.commands.gc."""
+
+from __future__ import annotations
+
+from xtp import trash
+from xtp.commands.gc import run
+
+
+class TestGc:
+    def test_keeps_recent(self, fake_profile, capsys):
+        fake_profile("acme", {})
+        trash.move("acme")
+        run()
+        assert "1 deleted profile(s) kept for undo" in capsys.readouterr().out
+        assert len(trash.entries()) == 1
+
+    def test_now_purges(self, fake_profile, capsys):
+        fake_profile("acme", {})
+        trash.move("acme")
+        run(now=True)
+        assert "Purged 'acme'" in capsys.readouterr().out
+        assert trash.entries() == []
+
+    def test_dry_run(self, fake_profile, capsys):
+        fake_profile("acme", {})
+        trash.move("acme")
+        run(now=True, dry_run=True)
+        assert "Would purge 'acme'" in capsys.readouterr().out
+        assert len(trash.entries()) == 1
+
+    def test_empty(self, profiles_dir, capsys):
+        run()
+        assert "Trash is empty." in capsys.readouterr().out
@@ -0,0 +1,75 @@
+"""Tests for xtp.commands.hook."""
+
+from __future__ import annotations
+
+import os
+import subprocess
+
+import pytest
+
+from xtp import config, gitguard
+from xtp.commands.hook import run
+
+
+def _git(repo, *args, **env):
+    clean = {k: v for k, v in os.environ.items() if not k.startswith("GIT_")}
+    return subprocess.run(
+        ["git", "-C", str(repo), *args], capture_output=True, text=True,
+        env={**clean, "GIT_CONFIG_GLOBAL": os.devnull, "GIT_CONFIG_NOSYSTEM": "1", **env},
+    )
+
+
+@pytest.fixture()
+def repo(tmp_path, monkeypatch, fake_profile):
+    fake_profile("acme", {"git": {"author_name": "Alice", "author_email": "alice@acme.com"}})
+    config.GLOBAL_CONFIG.write_text('[remotes]\n"github.com/acme-corp" = "acme"\n')
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    _git(repo, "init", "-q")
+    _git(repo, "remote", "add", "origin", "git@github.com:acme-corp/api.git")
+    monkeypatch.chdir(repo)
+    return repo
+
+
+class TestHook:
+    def test_install_guards_commits(self, repo, capsys):
+        run("install")
+        assert "belongs to profile 'acme'" in capsys.readouterr().out
+
+        (repo / "f").write_text("x")
+        _git(repo, "add", "f")
+        wrong = _git(repo, "commit", "-qm", "x",
+                     GIT_AUTHOR_NAME="Al", GIT_AUTHOR_EMAIL="al@home.org",
+                     GIT_COMMITTER_NAME="Al", GIT_COMMITTER_EMAIL="al@home.org")
+        assert wrong.returncode != 0
+        assert "profile 'acme'" in wrong.stderr
+
+        right = _git(repo, "commit", "-qm", "x",
+                     GIT_AUTHOR_NAME="Alice", GIT_AUTHOR_EMAIL="alice@acme.com",
+                     GIT_COMMITTER_NAME="Alice", GIT_COMMITTER_EMAIL="alice@acme.com")
+        assert right.returncode == 0, right.stderr
+
+    def test_refuses_foreign_hook(self, repo):
+        hook = repo / ".git" / "hooks" / "pre-commit"
+        hook.write_text("#!/bin/sh\nmake lint\n")
+        with pytest.raises(SystemExit) as exc_info:
+            run("install")
+        assert exc_info.value.code == 1
+        assert "make lint" in hook.read_text()
+
+        run("install", force=True)
+        assert gitguard.is_stub(hook)
+
+    def test_uninstall_keeps_foreign_hooks(self, repo):
+        run("install")
+        foreign = repo / ".git" / "hooks" / "pre-push"
+        foreign.write_text("#!/bin/sh\nmake test\n")
+        run("uninstall")
+        assert not (repo / ".git" / "hooks" / "pre-commit").exists()
+        assert foreign.exists()
+
+    def test_outside_repo(self, profiles_dir, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setenv("GIT_CEILING_DIRECTORIES", str(tmp_path.parent))
+        with pytest.raises(SystemExit):
+            run("install")
@@ -0,0 +1,32 @@
+"""Tests for xtp.commands.import_claude."""
+
+from __future__ import annotations
+
+import pytest
+
+from xtp import config
+from xtp.commands.import_claude import run
+
+
+class TestImportClaude:
+    def test_missing_profile(self, profiles_dir):
+        with pytest.raises(SystemExit) as exc_info:
+            run("nope")
+        assert exc_info.value.code == 1
+
+    def test_missing_source(self, fake_profile, tmp_path):
+        fake_profile("demo", {})
+        with pytest.raises(SystemExit):
+            run("demo", source=str(tmp_path / "nothing"))
+
+    def test_imports_and_reruns(self, fake_profile, tmp_path, capsys):
+        fake_profile("demo", {})
+        source = tmp_path / "dot-claude"
+        (source / "projects").mkdir(parents=True)
+        (source / "projects" / "t.jsonl").write_text("{}\n")
+        run("demo", source=str(source))
+        assert (config.profile_dir("demo") / "claude" / "projects" / "t.jsonl").is_file()
+        assert "1 files: 1 written" in capsys.readouterr().out
+
+        run("demo", source=str(source))
+        assert "0 written" in capsys.readouterr().out
@@ -19,3 +19,11 @@ class TestList:
         assert "alpha *" in output
         assert "beta" in output
         assert "* = active profile" in output
+
+    def test_unreadable_profile_still_listed(self, profiles_dir, capsys):
+        for name in ("a", "b"):
+            (profiles_dir / name).mkdir()
+        (profiles_dir / "a" / "profile.toml").write_bytes(b'x = "\xff"\n')
+        (profiles_dir / "b" / "profile.toml").write_text('[profile]\ndescription = "ok"\n')
+        run()
+        assert capsys.readouterr().out == "  a\n  b  (ok)\n"
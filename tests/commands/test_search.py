@@ -0,0 +1,46 @@
+"""Tests for xtp.commands.search."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from xtp.commands.search import run
+
+
+@pytest.fixture()
+def profiles(fake_profile):
+    for name, text in (("acme", "acme invoice format"), ("personal", "personal invoice idea")):
+        path = fake_profile(name, {}) / "claude" / "projects" / "-p" / "s.jsonl"
+        path.parent.mkdir(parents=True)
+        path.write_text(json.dumps({"type": "user", "message": {"content": text}}) + "\n")
+
+
+class TestSearchCommand:
+    def test_scoped_to_profile(self, profiles, capsys):
+        run("invoice", "acme")
+        out = capsys.readouterr().out
+        assert "-p/s.jsonl:0" in out and "[invoice]" in out
+        assert "personal" not in out
+
+    def test_all_profiles(self, profiles, capsys):
+        run("invoice", all_profiles=True)
+        out = capsys.readouterr().out
+        assert "acme  -p/s.jsonl" in out and "personal  -p/s.jsonl" in out
+
+    def test_no_matches_exits_1(self, profiles, capsys):
+        with pytest.raises(SystemExit) as exc:
+            run("nothing", "acme")
+        assert exc.value.code == 1
+        assert "No matches." in capsys.readouterr().out
+
+    def test_bad_raw_query_exits_1(self, profiles, capsys):
+        with pytest.raises(SystemExit):
+            run('"open', "acme", raw=True)
+        assert "invalid query" in capsys.readouterr().out
+
+    def test_missing_profile_exits_1(self, profiles_dir, capsys):
+        with pytest.raises(SystemExit):
+            run("x", "ghost")
+        assert "Profile 'ghost' not found" in capsys.readouterr().out
@@ -0,0 +1,60 @@
+"""Tests for xtp.commands.set."""
+
+from __future__ import annotations
+
+import pytest
+
+from xtp import config
+from xtp.commands.set import run
+
+
+@pytest.fixture()
+def clients(fake_profile):
+    for name in ("acme", "acme-eu", "beta"):
+        fake_profile(name, {"aws": {"profile": name}, "git": {"author_email": f"a@{name}.com"}})
+
+
+class TestSet:
+    def test_glob_and_diff(self, clients, capsys):
+        run(["git.author_name=Alice"], "acme*")
+        out = capsys.readouterr().out
+        assert "+++ b/acme/profile.toml" in out
+        assert "+++ b/acme-eu/profile.toml" in out
+        assert "beta" not in out
+        assert "Updated 2 profile(s)." in out
+        assert config.load_profile("acme-eu")["git"]["author_name"] == "Alice"
+        assert "author_name" not in config.load_profile("beta")["git"]
+
+    def test_all_with_where(self, clients, capsys):
+        run(["aws.profile=shared"], all_profiles=True, where=["aws.profile=beta"])
+        assert "Updated 1 profile(s)." in capsys.readouterr().out
+        assert config.load_profile("beta")["aws"]["profile"] == "shared"
+        assert config.load_profile("acme")["aws"]["profile"] == "acme"
+
+    def test_dry_run_writes_nothing(self, clients, capsys):
+        before = config.profile_toml("beta").read_text()
+        run(["aws.profile=x"], "beta", dry_run=True)
+        out = capsys.readouterr().out
+        assert '+profile = "x"' in out
+        assert "Would update 1 profile(s)." in out
+        assert config.profile_toml("beta").read_text() == before
+
+    def test_no_match(self, clients, capsys):
+        with pytest.raises(SystemExit):
+            run(["aws.profile=x"], "zeta*")
+        assert "no profile matches 'zeta*'" in capsys.readouterr().out
+
+    def test_nothing_to_change(self, clients, capsys):
+        run(["aws.profile=beta"], "beta")
+        assert "No profile needs changing." in capsys.readouterr().out
+
+    def test_bad_profile_aborts_everything(self, clients, capsys):
+        config.profile_toml("acme-eu").write_text("[aws\n")
+        with pytest.raises(SystemExit):
+            run(["aws.profile=x"], all_profiles=True)
+        assert "Nothing changed." in capsys.readouterr().out
+        assert config.load_profile("acme")["aws"]["profile"] == "acme"
+
+    def test_rollback(self, clients, capsys):
+        run([], rollback=True)
+        assert "Nothing to roll back." in capsys.readouterr().out
@@ -0,0 +1,67 @@
+"""Tests for xtp.commands.shell."""
+
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import pytest
+
+from xtp.commands.shell import run
+
+
+class TestShell:
+    def test_missing_profile_exits_1(self, profiles_dir):
+        with pytest.raises(SystemExit) as exc_info:
+            run("nonexistent")
+        assert exc_info.value.code == 1
+
+    def test_execs_zsh_with_profile_env(self, fake_profile, monkeypatch):
+        pdir = fake_profile("acme", {"aws": {"profile": "acme-dev"}})
+        monkeypatch.setenv("GITHUB_TOKEN", "secret")
+        monkeypatch.setenv("ZDOTDIR", "/home/me/zsh")
+        with patch("os.execvpe") as execvpe, patch("os.write"):
+            run("acme")
+        file, argv, env = execvpe.call_args.args
+        assert (file, argv) == ("zsh", ["zsh"])
+        assert env["XTP_PROFILE"] == "acme"
+        assert env["AWS_PROFILE"] == "acme-dev"
+        assert "GITHUB_TOKEN" not in env
+        assert env["ZDOTDIR"] == str(pdir / "zdotdir")
+        assert env["XTP_USER_ZDOTDIR"] == "/home/me/zsh"
+
+    def test_zdotdir_sources_user_files_and_resets_tab(self, fake_profile):
+        pdir = fake_profile("acme", {"name": "acme"})
+        with patch("os.execvpe"), patch("os.write"):
+            run("acme")
+        zshrc = (pdir / "zdotdir" / ".zshrc").read_text()
+        assert '.zshrc"' in zshrc
+        assert "zshexit_functions+=(_xtp_reset_tab)" in zshrc
+        assert (pdir / "zdotdir" / ".zshenv").is_file()
+
+    def test_strips_outer_profile_vars(self, fake_profile, monkeypatch):
+        fake_profile("outer", {"npm": {"isolate": True}})
+        fake_profile("inner", {"name": "inner"})
+        monkeypatch.setenv("XTP_PROFILE", "outer")
+        monkeypatch.setenv("NPM_CONFIG_USERCONFIG", "/outer/npmrc")
+        monkeypatch.delenv("XTP_ENV_KEYS", raising=False)
+        with patch("os.execvpe") as execvpe, patch("os.write"):
+            run("inner")
+        env = execvpe.call_args.args[2]
+        assert "NPM_CONFIG_USERCONFIG" not in env
+
+    def test_saves_overridden_user_values(self, fake_profile, monkeypatch):
+        fake_profile("acme", {"env": {"EDITOR": "vim"}})
+        monkeypatch.setenv("EDITOR", "code")
+        monkeypatch.delenv("XTP_ENV_KEYS", raising=False)
+        monkeypatch.delenv("XTP_PROFILE", raising=False)
+        with patch("os.execvpe") as execvpe, patch("os.write"):
+            run("acme")
+        env = execvpe.call_args.args[2]
+        assert (env["EDITOR"], env["XTP_SAVED_EDITOR"]) == ("vim", "code")
+
+    def test_missing_zsh_exits_127(self, fake_profile):
+        fake_profile("acme", {"name": "acme"})
+        with patch("os.execvpe", side_effect=FileNotFoundError("zsh")), patch("os.write"):
+            with pytest.raises(SystemExit) as exc_info:
+                run("acme")
+        assert exc_info.value.code == 127
@@ -0,0 +1,60 @@
+"""Tests for xtp.commands.skills."""
+
+from __future__ import annotations
+
+import pytest
+
+from xtp import skills
+from xtp.commands.skills import run
+
+
+@pytest.fixture()
+def store(profiles_dir, fake_profile):
+    (skills.store_dir() / "pdf").mkdir(parents=True)
+    (skills.store_dir() / "pdf" / "SKILL.md").write_text("# pdf\n")
+    fake_profile("acme", {})
+    fake_profile("personal", {})
+    return skills.store_dir()
+
+
+class TestSkills:
+    def test_link_all_profiles_and_list(self, store, capsys):
+        run("link", ["pdf"], all_profiles=True)
+        assert "acme: linked pdf" in capsys.readouterr().out
+        run("list")
+        assert "pdf  acme, personal" in capsys.readouterr().out
+
+    def test_list_profile_shows_status(self, store, capsys):
+        run("link", ["acme", "pdf"], hardlink=True)
+        (store / "pdf" / "SKILL.md").unlink()
+        (store / "pdf" / "SKILL.md").write_text("new")
+        capsys.readouterr()
+        run("list", ["acme"])
+        assert "pdf  hardlink  (stale)" in capsys.readouterr().out
+        run("sync", ["acme"])
+        assert "acme: pdf relinked" in capsys.readouterr().out
+
+    def test_unknown_skill_exits_1(self, store, capsys):
+        with pytest.raises(SystemExit) as exc:
+            run("link", ["acme", "nope"])
+        assert exc.value.code == 1
+        assert "no skill 'nope'" in capsys.readouterr().out
+
+    def test_missing_profile_exits_1(self, store, capsys):
+        with pytest.raises(SystemExit):
+            run("link", ["ghost", "pdf"])
+        assert "Profile 'ghost' not found" in capsys.readouterr().out
+
+    def test_link_needs_skill_names(self, store, capsys):
+        with pytest.raises(SystemExit):
+            run("link", ["acme"])
+        assert "Available: pdf" in capsys.readouterr().out
+
+    def test_unlink_all_skips_unlinked_profiles(self, store, capsys):
+        run("link", ["acme", "pdf"])
+        run("unlink", ["pdf"], all_profiles=True)
+        assert skills.links("acme") == []
+
+    def test_empty_store(self, profiles_dir, capsys):
+        run("list")
+        assert "No shared skills" in capsys.readouterr().out
@@ -0,0 +1,26 @@
+"""Tests for xtp.commands.switch."""
+
+from __future__ import annotations
+
+import pytest
+
+from xtp import activate, config
+from xtp.commands.switch import run
+
+
+class TestSwitch:
+    def test_missing_profile_exits_1(self, profiles_dir):
+        with pytest.raises(SystemExit) as exc_info:
+            run("nonexistent")
+        assert exc_info.value.code == 1
+
+    def test_emits_only_diff(self, fake_profile, monkeypatch, capsys):
+        fake_profile("old", {"aws": {"profile": "old-dev"}, "git": {"author_name": "Bob"}})
+        fake_profile("new", {"git": {"author_name": "Bob"}})
+        for key, value in activate.with_keys(config.build_env("old")).items():
+            monkeypatch.setenv(key, value)
+        run("new", shell="bash")
+        out = capsys.readouterr().out
+        assert "unset AWS_PROFILE" in out
+        assert "export XTP_PROFILE='new'" in out
+        assert "export GIT_AUTHOR_NAME" not in out
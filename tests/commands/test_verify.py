@@ -0,0 +1,254 @@
+"""Tests for xtp.commands.verify."""
+
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from xtp import model
+from xtp.commands import verify
+from xtp.commands.verify import Check, Context, Result, schedule
+
+
+def _ctx() -> Context:
+    return Context(name="t", profile=model.Profile("t"), pdir=Path("/nonexistent"))
+
+
+def _run(checks, workers=4):
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(schedule(checks, _ctx(), executor))
+
+
+class TestSchedule:
+    def test_results_in_declaration_order(self):
+        def slow(ctx):
+            time.sleep(0.05)
+            return Result("slow", True)
+
+        checks = (Check("a", slow), Check("b", lambda ctx: Result("fast", True)))
+        assert [r.label for r in _run(checks)] == ["slow", "fast"]
+
+    def test_independent_checks_run_concurrently(self):
+        def sleeper(label):
+            def func(ctx):
+                time.sleep(0.2)
+                return Result(label, True)
+            return func
+
+        checks = tuple(Check(c, sleeper(c)) for c in "abc")
+        start = time.perf_counter()
+        _run(checks)
+        assert time.perf_counter() - start < 0.4
+
+    def test_failed_requirement_skips_without_running(self):
+        ran = threading.Event()
+
+        def dependent(ctx):
+            ran.set()
+            return Result("dependent", True)
+
+        skipped = Result("dependent", False, "skipped", critical=False)
+        checks = (
+            Check("base", lambda ctx: Result("base", False)),
+            Check("dep", dependent, requires=("base",), skipped=skipped),
+        )
+        assert _run(checks) == [Result("base", False), skipped]
+        assert not ran.is_set()
+
+    def test_passed_requirement_runs_dependent(self):
+        checks = (
+            Check("base", lambda ctx: Result("base", True)),
+            Check("dep", lambda ctx: Result("dep", True), requires=("base",)),
+        )
+        assert [r.ok for r in _run(checks)] == [True, True]
+
+    def test_crashing_check_reported_as_failure(self):
+        def crash(ctx):
+            raise RuntimeError("boom")
+
+        (result,) = _run((Check("crash", crash),))
+        assert not result.ok
+        assert "boom" in result.detail
+
+    def test_unknown_requirement_rejected(self):
+        with pytest.raises(ValueError, match="Unknown"):
+            _run((Check("a", lambda ctx: Result("a", True), requires=("nope",)),))
+
+
+class TestRun:
+    def test_missing_profile_exits_1(self, profiles_dir, capsys):
+        with pytest.raises(SystemExit) as exc_info:
+            verify.run("nonexistent")
+        assert exc_info.value.code == 1
+        assert "config unreadable" in capsys.readouterr().out
+
+    def test_full_profile_output_order(self, fake_profile, capsys):
+        pdir = fake_profile("ok", {
+            "git": {"author_name": "Alice", "author_email": "a@b.c"},
+        })
+        (pdir / "claude").mkdir()
+        (pdir / "gh").mkdir()
+        with patch("subprocess.run", side_effect=FileNotFoundError("gh")):
+            with pytest.raises(SystemExit):
+                verify.run("ok")
+        out = capsys.readouterr().out
+        labels = [
+            "Profile config exists", "Claude Code config dir exists", "Git identity",
+            "SSH key configured", "SSH connects to GitHub (skipped (no key))",
+            "GitHub CLI config dir exists", "GitHub CLI authenticated",
+            "Chrome profile configured", "Browser wrapper script", "AWS config",
+            "npm config", "Shared skills",
+        ]
+        positions = [out.index(label) for label in labels]
+        assert positions == sorted(positions)
+
+
+class TestLookups:
+    def test_memo_runs_once_per_key(self):
+        lookups = verify.Lookups()
+        calls = []
+
+        def work():
+            calls.append(1)
+            time.sleep(0.05)
+            return "value"
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            values = list(pool.map(lambda _: lookups.memo(("k",), work), range(8)))
+        assert values == ["value"] * 8
+        assert len(calls) == 1
+
+    def test_memo_propagates_errors(self):
+        lookups = verify.Lookups()
+        with pytest.raises(RuntimeError):
+            lookups.memo(("k",), lambda: (_ for _ in ()).throw(RuntimeError("x")))
+
+    def test_ssh_deduplicated_by_fingerprint(self, tmp_path):
+        key_a = tmp_path / "a"
+        key_b = tmp_path / "b"
+        for key in (key_a, key_b):
+            key.write_text("PRIVATE")
+            key.with_name(key.name + ".pub").write_text("ssh-ed25519 AAAA same\n")
+        lookups = verify.Lookups()
+        with patch.object(verify, "_ssh_github", return_value=(True, "authenticated")) as ssh:
+            lookups.ssh_github(key_a)
+            lookups.ssh_github(key_b)
+        assert ssh.call_count == 1
+
+
+class TestRunAll:
+    def test_aggregates_and_shares_lookups(self, fake_profile, capsys):
+        for name in ("acme", "beta", "other"):
+            pdir = fake_profile(name, {
+                "git": {"author_name": "A", "author_email": "a@b.c"},
+                "chrome": {"profile_directory": "Default"},
+            })
+            (pdir / "gh").mkdir()
+        with patch.object(verify, "get_chrome_profiles", return_value=[]) as chrome, \
+                patch.object(verify, "_gh_auth", return_value=(True, "logged in")):
+            with pytest.raises(SystemExit) as exc_info:
+                verify.run_all("[ab]*", jobs=2)
+        assert exc_info.value.code == 1
+        assert chrome.call_count == 1
+        out = capsys.readouterr().out
+        assert "Verifying profile: acme" in out
+        assert "Verifying profile: other" not in out
+        assert out.index("profile: acme") < out.index("profile: beta")
+        assert "Summary (2 profiles):" in out
+        assert "0 ok, 2 failed" in out
+
+    def test_no_matches_exits_1(self, fake_profile, capsys):
+        fake_profile("acme", {"name": "acme"})
+        with pytest.raises(SystemExit) as exc_info:
+            verify.run_all("zzz*")
+        assert exc_info.value.code == 1
+        assert "No profiles match" in capsys.readouterr().out
+
+
+class TestResultCache:
+    def _ctx(self, pdir, **kwargs):
+        lookups = verify.Lookups(**kwargs)
+        cache = verify.ResultCache(pdir, lookups.ttl, fresh=lookups.fresh)
+        return Context(name="c", profile=model.Profile("c"), pdir=pdir, lookups=lookups, cache=cache)
+
+    def test_success_cached_and_marked(self, tmp_path):
+        (tmp_path / "gh").mkdir()
+        with patch.object(verify, "_gh_auth", return_value=(True, "logged in")) as gh:
+            first = verify.check_gh_auth(self._ctx(tmp_path))
+            second = verify.check_gh_auth(self._ctx(tmp_path))
+        assert gh.call_count == 1
+        assert first.detail == "logged in"
+        assert second.ok
+        assert "cached" in second.detail
+
+    def test_failure_not_cached(self, tmp_path):
+        (tmp_path / "gh").mkdir()
+        with patch.object(verify, "_gh_auth", return_value=(False, "not authenticated")) as gh:
+            verify.check_gh_auth(self._ctx(tmp_path))
+            verify.check_gh_auth(self._ctx(tmp_path))
+        assert gh.call_count == 2
+
+    def test_fresh_bypasses_cache(self, tmp_path):
+        (tmp_path / "gh").mkdir()
+        with patch.object(verify, "_gh_auth", return_value=(True, "logged in")) as gh:
+            verify.check_gh_auth(self._ctx(tmp_path))
+            result = verify.check_gh_auth(self._ctx(tmp_path, fresh=True))
+        assert gh.call_count == 2
+        assert "cached" not in result.detail
+
+    def test_hosts_yml_change_invalidates(self, tmp_path):
+        (tmp_path / "gh").mkdir()
+        with patch.object(verify, "_gh_auth", return_value=(True, "logged in")) as gh:
+            verify.check_gh_auth(self._ctx(tmp_path))
+            (tmp_path / "gh" / "hosts.yml").write_text("github.com: {}\n")
+            verify.check_gh_auth(self._ctx(tmp_path))
+        assert gh.call_count == 2
+
+    def test_expired_entry_ignored(self, tmp_path):
+        (tmp_path / "gh").mkdir()
+        with patch.object(verify, "_gh_auth", return_value=(True, "logged in")) as gh:
+            verify.check_gh_auth(self._ctx(tmp_path, ttl=0.01))
+            time.sleep(0.02)
+            verify.check_gh_auth(self._ctx(tmp_path, ttl=0.01))
+        assert gh.call_count == 2
+
+    def test_ttl_from_global_config(self, profiles_dir):
+        from xtp import config
+
+        config.GLOBAL_CONFIG.write_text("[verify]\ncache_ttl = 42\n")
+        assert verify.cache_ttl() == 42
+        assert verify.cache_ttl(5) == 5
+
+
+class TestSkillsCheck:
+    def test_broken_link_warns(self, fake_profile):
+        import shutil
+
+        from xtp import skills
+
+        pdir = fake_profile("acme", {})
+        (skills.store_dir() / "pdf").mkdir(parents=True)
+        ctx = verify.Context("acme", model.Profile("acme"), pdir)
+        assert verify.check_skills(ctx).detail == "none linked"
+
+        skills.link("acme", "pdf")
+        assert verify.check_skills(ctx).ok
+        shutil.rmtree(skills.store_dir() / "pdf")
+        result = verify.check_skills(ctx)
+        assert not result.ok and not result.critical
+        assert "pdf (broken)" in result.detail
+
+
+class TestConfigKeys:
+    def test_unknown_keys_warn(self, fake_profile, capsys):
+        fake_profile("typo", {"git": {"author_emial": "a@b.c"}})
+        with patch("subprocess.run", side_effect=FileNotFoundError("gh")):
+            with pytest.raises(SystemExit):
+                verify.run("typo")
+        out = capsys.readouterr().out
+        assert "git.author_emial: unknown key (did you mean 'author_email'?)" in out
@@ -7,6 +7,14 @@ from pathlib import Path
 import pytest
 
 
+@pytest.fixture(autouse=True)
+def _no_daemon(tmp_path, monkeypatch):
+    """Keep the CLI from talking to a real xtp daemon."""
+    from xtp import daemon
+
+    monkeypatch.setattr(daemon, "SOCKET", str(tmp_path / "daemon.sock"))
+
+
 @pytest.fixture()
 def profiles_dir(tmp_path, monkeypatch):
     """Redirect xtp.config paths to a temp directory."""
@@ -18,6 +26,7 @@ def profiles_dir(tmp_path, monkeypatch):
 
     monkeypatch.setattr(cfg, "CONFIG_DIR", config_dir)
     monkeypatch.setattr(cfg, "PROFILES_DIR", profiles)
+    monkeypatch.setattr(cfg, "GLOBAL_CONFIG", config_dir / "config.toml")
     return profiles
 
 
@@ -0,0 +1,170 @@
+"""Tests for xtp.activate — script rendering and the cached activate files."""
+
+from __future__ import annotations
+
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from xtp import activate, config
+
+
+class TestQuote:
+    def test_posix_single_quote(self):
+        assert activate.quote("it's", "zsh") == "'it'\\''s'"
+
+    def test_fish_single_quote(self):
+        assert activate.quote("it's \\ ok", "fish") == "'it\\'s \\\\ ok'"
+
+
+class TestRender:
+    def test_exports_and_clears_token(self):
+        text = activate.render({"XTP_PROFILE": "acme"}, "bash")
+        assert "unset GITHUB_TOKEN" in text
+        assert "export XTP_PROFILE='acme'" in text
+
+    def test_fish_syntax(self):
+        text = activate.render({"XTP_PROFILE": "acme"}, "fish")
+        assert "set -e GITHUB_TOKEN" in text
+        assert "set -gx XTP_PROFILE 'acme'" in text
+
+    def test_skips_invalid_names(self):
+        text = activate.render({"BAD-NAME": "x"}, "zsh")
+        assert "export BAD-NAME" not in text
+
+    def test_unsupported_shell(self):
+        with pytest.raises(ValueError, match="Unsupported shell"):
+            activate.render({}, "tcsh")
+
+
+class TestDiff:
+    def test_unsets_stale_and_exports_changed(self, fake_profile):
+        fake_profile("old", {"aws": {"profile": "old-dev"}, "npm": {"isolate": True}})
+        fake_profile("new", {"git": {"author_name": "Bob"}})
+        environ = {"PATH": "/bin", **activate.with_keys(config.build_env("old"))}
+        unset, changed = activate.diff(environ, config.build_env("new"))
+        assert "AWS_PROFILE" in unset
+        assert "NPM_CONFIG_USERCONFIG" in unset
+        assert "PATH" not in unset
+        assert changed["GIT_AUTHOR_NAME"] == "Bob"
+        assert changed["XTP_PROFILE"] == "new"
+
+    def test_same_profile_is_a_no_op(self, fake_profile):
+        fake_profile("same", {"git": {"author_name": "Bob"}})
+        environ = activate.with_keys(config.build_env("same"))
+        assert activate.diff(environ, config.build_env("same")) == ([], {})
+
+    def test_falls_back_to_building_active_env(self, fake_profile):
+        fake_profile("old", {"aws": {"profile": "old-dev"}})
+        fake_profile("new", {"name": "new"})
+        environ = dict(config.build_env("old"))  # no XTP_ENV_KEYS
+        unset, _ = activate.diff(environ, config.build_env("new"))
+        assert "AWS_PROFILE" in unset
+
+    def test_strip_active_removes_profile_vars(self, fake_profile):
+        fake_profile("old", {"aws": {"profile": "old-dev"}})
+        environ = {"HOME": "/home/x", "GITHUB_TOKEN": "t",
+                   **activate.with_keys(config.build_env("old"))}
+        assert activate.strip_active(environ) == {"HOME": "/home/x"}
+
+
+    def test_switch_restores_pre_activation_values(self, fake_profile):
+        fake_profile("a", {"env": {"EDITOR": "vim", "PATH": "/a/bin"}})
+        fake_profile("a2", {"env": {"EDITOR": "nano"}})
+        fake_profile("b", {"name": "b"})
+        before = {"HOME": "/home/x", "EDITOR": "code", "PATH": "/bin"}
+        environ = activate.switched(before, config.build_env("a"))
+        assert environ["EDITOR"] == "vim"
+        assert environ["XTP_SAVED_EDITOR"] == "code"
+
+        unset, changed = activate.diff(environ, config.build_env("a2"))
+        assert changed["EDITOR"] == "nano"
+        assert changed["PATH"] == "/bin"
+        assert "XTP_SAVED_EDITOR" not in unset and "XTP_SAVED_EDITOR" not in changed
+
+        unset, changed = activate.diff(environ, config.build_env("b"))
+        assert (changed["EDITOR"], changed["PATH"]) == ("code", "/bin")
+        assert {"XTP_SAVED_EDITOR", "XTP_SAVED_PATH"} <= set(unset)
+        assert "EDITOR" not in unset
+        assert activate.strip_active(environ) == before
+
+
+class TestWriteScripts:
+    def test_writes_all_shells(self, fake_profile):
+        fake_profile("acme", {"git": {"author_email": "a@acme.com"}})
+        activate.write_scripts("acme")
+        for shell in activate.SHELLS:
+            text = activate.script_path("acme", shell).read_text()
+            assert "a@acme.com" in text
+            assert "profile.toml" in text
+
+    def test_unchanged_script_not_rewritten(self, fake_profile):
+        fake_profile("acme", {"name": "acme"})
+        activate.write_scripts("acme", ("bash",))
+        path = activate.script_path("acme", "bash")
+        ino = path.stat().st_ino
+        activate.write_scripts("acme", ("bash",))
+        assert path.stat().st_ino == ino
+
+    def test_rewritten_when_toml_changes(self, fake_profile):
+        fake_profile("acme", {"git": {"author_email": "old@acme.com"}})
+        activate.write_scripts("acme", ("bash",))
+        fake_profile("acme", {"git": {"author_email": "new@acme.com"}})
+        activate.write_scripts("acme", ("bash",))
+        assert "new@acme.com" in activate.script_path("acme", "bash").read_text()
+
+    @pytest.mark.skipif(shutil.which("bash") is None, reason="bash not installed")
+    def test_sourcing_sets_env_without_python(self, fake_profile):
+        fake_profile("acme", {"git": {"author_name": "O'Brien"}})
+        activate.write_scripts("acme", ("bash",))
+        path = activate.script_path("acme", "bash")
+        # Make sure the staleness guard doesn't fire and call xtp.
+        toml = config.profile_toml("acme")
+        st = toml.stat()
+        os.utime(toml, ns=(st.st_atime_ns, st.st_mtime_ns - 10_000_000_000))
+        result = subprocess.run(
+            ["bash", "-c", f'source "{path}" && echo "$GIT_AUTHOR_NAME|${{GITHUB_TOKEN-unset}}"'],
+            capture_output=True, text=True, env={"PATH": "/usr/bin:/bin", "GITHUB_TOKEN": "x"},
+        )
+        assert result.stdout.strip() == "O'Brien|unset"
+
+    @pytest.mark.skipif(shutil.which("bash") is None, reason="bash not installed")
+    def test_sourcing_in_place_unsets_previous_profile(self, fake_profile):
+        fake_profile("old", {"aws": {"profile": "old-dev"}})
+        fake_profile("new", {"name": "new"})
+        scripts = []
+        for name in ("old", "new"):
+            toml = config.profile_toml(name)
+            st = toml.stat()
+            os.utime(toml, ns=(st.st_atime_ns, st.st_mtime_ns - 10_000_000_000))
+            activate.write_scripts(name, ("bash",))
+            scripts.append(activate.script_path(name, "bash"))
+        result = subprocess.run(
+            ["bash", "-c",
+             f'source "{scripts[0]}"; source "{scripts[1]}"; '
+             'echo "$XTP_PROFILE|${AWS_PROFILE-unset}"'],
+            capture_output=True, text=True, env={"PATH": "/usr/bin:/bin"},
+        )
+        assert result.stdout.strip() == "new|unset"
+
+    @pytest.mark.skipif(shutil.which("bash") is None, reason="bash not installed")
+    def test_sourcing_in_place_restores_user_values(self, fake_profile):
+        fake_profile("a", {"env": {"EDITOR": "vim", "PAGER": "most"}})
+        fake_profile("b", {"env": {"PAGER": "less"}})
+        scripts = []
+        for name in ("a", "b"):
+            toml = config.profile_toml(name)
+            st = toml.stat()
+            os.utime(toml, ns=(st.st_atime_ns, st.st_mtime_ns - 10_000_000_000))
+            activate.write_scripts(name, ("bash",))
+            scripts.append(activate.script_path(name, "bash"))
+        result = subprocess.run(
+            ["bash", "-c",
+             f'source "{scripts[0]}"; echo "$EDITOR|$XTP_SAVED_EDITOR"; '
+             f'source "{scripts[1]}"; source "{scripts[1]}"; '
+             'echo "$EDITOR|${XTP_SAVED_EDITOR-unset}|$PAGER|${XTP_SAVED_PAGER-unset}"'],
+            capture_output=True, text=True, env={"PATH": "/usr/bin:/bin", "EDITOR": "code"},
+        )
+        assert result.stdout.splitlines() == ["vim|code", "code|unset|less|unset"]
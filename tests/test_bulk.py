@@ -0,0 +1,190 @@
+"""Tests for xtp.bulk."""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from xtp import bulk, config, index, toml_writer
+
+# `xtp set` should handle hundreds of profiles in well under a second
+BUDGET_MS = float(os.environ.get("XTP_SET_BUDGET_MS", "1000"))
+
+
+@pytest.fixture()
+def clients(fake_profile):
+    for name, domain in (("acme", "acme.com"), ("beta", "acme.com"), ("other", "other.org")):
+        fake_profile(name, {
+            "git": {"author_name": "Alice", "author_email": f"alice@{domain}"},
+            "aws": {"profile": name},
+        })
+    toml = config.profile_toml("acme")
+    toml.write_text("# keep me\n" + toml.read_text())
+    return ["acme", "beta", "other"]
+
+
+def _email(name: str) -> str:
+    return config.load_profile(name)["git"]["author_email"]
+
+
+def _age(*names: str) -> None:
+    """Move profile.toml mtimes past the racy window, as for any real profile."""
+    for name in names:
+        os.utime(config.profile_toml(name), (1_000_000_000, 1_000_000_000))
+
+
+class TestPlan:
+    def test_changes_matching_profiles_only(self, clients):
+        changes, errors = bulk.plan(clients, ["git.author_email=alice@new.com"],
+                                    where=["git.author_email=alice@acme.com"])
+        assert errors == []
+        assert [c.name for c in changes] == ["acme", "beta"]
+        assert changes[0].new.startswith("# keep me\n")
+        assert '+author_email = "alice@new.com"\n' in changes[0].diff()
+
+    def test_skips_profiles_that_already_match(self, clients):
+        changes, _ = bulk.plan(clients, ["git.author_name=Alice"])
+        assert changes == []
+
+    def test_where_matches_typed_and_string_values(self, fake_profile):
+        fake_profile("a", {"npm": {"isolate": True}, "env": {"N": "1"}})
+        assert bulk.plan(["a"], ["aws.profile=x"], where=["npm.isolate=true"])[0]
+        assert bulk.plan(["a"], ["aws.profile=x"], where=["env.N=1"])[0]
+        assert not bulk.plan(["a"], ["aws.profile=x"], where=["env.missing=1"])[0]
+
+    def test_reports_unreadable_profiles(self, clients):
+        config.profile_toml("beta").write_text("not toml [")
+        changes, errors = bulk.plan(clients, ["aws.profile=x"])
+        assert [c.name for c in changes] == ["acme", "other"]
+        assert errors and errors[0].startswith("beta: ")
+
+    def test_invalid_assignment(self, clients):
+        with pytest.raises(ValueError):
+            bulk.plan(clients, ["git.author_email"])
+
+    def test_parses_each_profile_once(self, clients, monkeypatch):
+        import tomllib
+
+        parsed = []
+        loads = tomllib.loads
+        monkeypatch.setattr(tomllib, "loads", lambda text: parsed.append(text) or loads(text))
+        changes, _ = bulk.plan(clients, ["git.author_email=alice@new.com", "aws.region=eu"])
+        assert len(changes) == 3
+        # One per profile, plus one per assignment value.
+        assert len(parsed) == len(clients) + 2
+
+
+class TestApply:
+    def test_writes_changes(self, clients):
+        before = config.store_generation()
+        changes, _ = bulk.plan(clients, ["git.author_email=alice@new.com"])
+        bulk.apply(changes)
+        assert [_email(n) for n in clients] == ["alice@new.com"] * 3
+        assert config.profile_toml("acme").read_text().startswith("# keep me\n")
+        assert not bulk.journal_path().exists()
+        assert config.generation("acme") == 1
+        assert config.store_generation() == before + 1
+        assert index.load()["beta"]["author_email"] == "alice@new.com"
+
+    def test_conflict_rolls_back(self, clients):
+        changes, _ = bulk.plan(clients, ["git.author_email=alice@new.com"])
+        config.profile_toml("other").write_text('[git]\nauthor_email = "edited@other.org"\n')
+        with pytest.raises(bulk.Conflict):
+            bulk.apply(changes, jobs=1)
+        assert _email("acme") == "alice@acme.com"
+        assert _email("beta") == "alice@acme.com"
+        assert _email("other") == "edited@other.org"
+        assert config.profile_toml("acme").read_text().startswith("# keep me\n")
+        assert not bulk.journal_path().exists()
+
+    def test_trusts_stat_keys_of_old_profiles(self, clients, monkeypatch):
+        _age(*clients)
+        changes, _ = bulk.plan(clients, ["git.author_email=alice@new.com"])
+        assert all(c.stat is not None for c in changes)
+        read_text = Path.read_text
+
+        def no_profile_reads(self):
+            assert self.name != "profile.toml", f"read {self}"
+            return read_text(self)
+
+        with monkeypatch.context() as m:
+            m.setattr(Path, "read_text", no_profile_reads)
+            bulk.apply(changes)
+        assert [_email(n) for n in clients] == ["alice@new.com"] * 3
+
+    def test_conflict_detected_by_stat_key(self, clients):
+        _age(*clients)
+        changes, _ = bulk.plan(clients, ["git.author_email=alice@new.com"])
+        config.profile_toml("other").write_text('[git]\nauthor_email = "edited@other.org"\n')
+        with pytest.raises(bulk.Conflict):
+            bulk.apply(changes)
+        assert _email("other") == "edited@other.org"
+        assert _email("acme") == "alice@acme.com"
+
+
+class TestBudget:
+    def test_hundreds_of_profiles(self, profiles_dir):
+        names = [f"client-{i:03d}" for i in range(300)]
+        for i, name in enumerate(names):
+            config.profile_dir(name).mkdir()
+            config.profile_toml(name).write_text("# client config\n" + toml_writer.dumps({
+                "profile": {"description": f"Client {i}"},
+                "git": {"author_name": "Bench", "author_email": f"bench@client{i}.com"},
+                "env": {f"VAR_{k}": str(k) for k in range(20)},
+            }))
+        _age(*names)
+        start = time.perf_counter()
+        changes, _ = bulk.plan(names, ["git.author_name=Renamed", "env.NEW=1"])
+        bulk.apply(changes)
+        elapsed = (time.perf_counter() - start) * 1000
+        assert len(changes) == len(names)
+        assert elapsed < BUDGET_MS, f"{len(names)} profiles took {elapsed:.0f} ms"
+
+
+class TestRecover:
+    def _interrupt(self, clients):
+        """Leave the state of a run killed after writing acme and beta."""
+        changes, _ = bulk.plan(clients, ["git.author_email=alice@new.com"])
+        bulk._write_journal(changes)
+        for change in changes[:2]:
+            config.write_atomic(config.profile_toml(change.name), change.new)
+        return changes
+
+    def test_restores_written_profiles(self, clients):
+        self._interrupt(clients)
+        assert bulk.recover() == ["acme", "beta"]
+        assert [_email(n) for n in clients] == ["alice@acme.com", "alice@acme.com", "alice@other.org"]
+        assert config.profile_toml("acme").read_text().startswith("# keep me\n")
+        assert not bulk.journal_path().exists()
+        assert config.generation("acme") == 1
+
+    def test_keeps_profiles_edited_since(self, clients):
+        self._interrupt(clients)
+        config.profile_toml("beta").write_text('[git]\nauthor_email = "edited@acme.com"\n')
+        assert bulk.recover() == ["acme"]
+        assert _email("beta") == "edited@acme.com"
+
+    def test_next_apply_recovers_first(self, clients):
+        self._interrupt(clients)
+        changes, _ = bulk.plan(["other"], ["aws.profile=changed"])
+        bulk.apply(changes)
+        assert _email("acme") == "alice@acme.com"
+        assert config.load_profile("other")["aws"]["profile"] == "changed"
+
+    def test_nothing_to_recover(self, clients):
+        assert bulk.recover() == []
+
+    def test_ignores_unreadable_journal(self, clients):
+        bulk.journal_path().write_text("{")
+        assert bulk.recover() == []
+        assert not bulk.journal_path().exists()
+
+    def test_journal_holds_old_and_new_text(self, clients):
+        changes = self._interrupt(clients)
+        data = json.loads(bulk.journal_path().read_text())
+        assert [c["name"] for c in data["changes"]] == [c.name for c in changes]
+        assert data["changes"][0]["old"] == changes[0].old
@@ -8,7 +8,7 @@ from unittest.mock import patch
 
 import pytest
 
-from xtp.cli import main
+from xtp.cli import _fast_path, main
 
 
 class TestVersion:
@@ -55,3 +55,77 @@ class TestCurrent:
         with patch("sys.argv", ["xtp", "current"]):
             main()
         assert "none" in capsys.readouterr().out
+
+
+class TestVerifyDispatch:
+    def test_no_name_or_all_exits_1(self, capsys):
+        with pytest.raises(SystemExit) as exc_info:
+            with patch("sys.argv", ["xtp", "verify"]):
+                main()
+        assert exc_info.value.code == 1
+        assert "--all" in capsys.readouterr().err
+
+
+class TestSetDispatch:
+    def test_no_profiles_exits_1(self, capsys, monkeypatch):
+        monkeypatch.delenv("XTP_PROFILE", raising=False)
+        with pytest.raises(SystemExit) as exc_info:
+            with patch("sys.argv", ["xtp", "set", "aws.profile=x"]):
+                main()
+        assert exc_info.value.code == 1
+        assert "--all" in capsys.readouterr().err
+
+    def test_defaults_to_active_profile(self, monkeypatch, profiles_dir, fake_profile):
+        fake_profile("envprof", {"aws": {"profile": "old"}})
+        monkeypatch.setenv("XTP_PROFILE", "envprof")
+        with patch("sys.argv", ["xtp", "set", "aws.profile=new"]):
+            main()
+        from xtp import config
+
+        assert config.load_profile("envprof")["aws"]["profile"] == "new"
+
+
+class TestFastPath:
+    def test_unrecognized_falls_through(self, monkeypatch):
+        monkeypatch.delenv("XTP_PROFILE", raising=False)
+        assert not _fast_path(["show"])
+        assert not _fast_path(["show", "--help"])
+        assert not _fast_path(["edit", "work"])
+        assert not _fast_path(["list", "--help"])
+        assert not _fast_path(["env", "work", "--shell", "zsh"])
+        assert not _fast_path(["env", "work", "--export", "--shell", "tcsh"])
+        assert not _fast_path(["env", "work", "--export", "--verbose"])
+
+    @pytest.mark.parametrize("argv", [
+        ["env", "work", "--export", "--shell", "bash"],
+        ["env", "work", "--shell", "bash", "--export"],
+        ["env", "work", "--export", "--shell=bash"],
+    ])
+    def test_env_export_spellings(self, argv):
+        with patch("xtp.commands.env.run") as run:
+            assert _fast_path(argv)
+        run.assert_called_once_with("work", export=True, shell="bash")
+
+    def test_show_defaults_to_active_profile(self, monkeypatch):
+        monkeypatch.setenv("XTP_PROFILE", "work")
+        with patch("xtp.commands.show.run") as run:
+            assert _fast_path(["show"])
+        run.assert_called_once_with("work")
+
+    def test_daemon_reply_is_printed(self, capsys):
+        reply = {"code": 1, "out": "", "err": "Error: Profile 'work' not found.\n"}
+        with patch("xtp.daemon.query", return_value=reply) as query:
+            with pytest.raises(SystemExit) as exc_info:
+                _fast_path(["env", "work"])
+        query.assert_called_once_with(
+            {"command": "env", "name": "work", "export": False, "shell": None}
+        )
+        assert exc_info.value.code == 1
+        assert "not found" in capsys.readouterr().err
+
+    def test_bad_shell_reported_by_argparse(self, capsys):
+        with pytest.raises(SystemExit) as exc_info:
+            with patch("sys.argv", ["xtp", "env", "work", "--export", "--shell", "tcsh"]):
+                main()
+        assert exc_info.value.code == 2
+        assert "invalid choice" in capsys.readouterr().err
@@ -2,6 +2,10 @@
 
 from __future__ import annotations
 
+import json
+import os
+import tomllib
+
 import pytest
 
 from xtp import config
@@ -40,6 +44,99 @@ class TestLoadSaveProfile:
         loaded = config.load_profile("test")
         assert loaded == data
 
+    def test_save_keeps_comments(self, profiles_dir):
+        config.save_profile("test", {"git": {"author_name": "Alice"}})
+        toml = config.profile_toml("test")
+        toml.write_text("# mine\n[git]\nauthor_name = 'Alice'  # me\n")
+        config.save_profile("test", {"git": {"author_name": "Bob"}})
+        assert toml.read_text() == '# mine\n[git]\nauthor_name = "Bob"  # me\n'
+
+    def test_write_atomic_mode_is_set_before_writing(self, tmp_path, monkeypatch):
+        modes = []
+        real_fchmod = os.fchmod
+
+        def fchmod(fd, mode):
+            modes.append((os.fstat(fd).st_size, mode))  # nothing written yet
+            real_fchmod(fd, mode)
+
+        monkeypatch.setattr(os, "fchmod", fchmod)
+        path = tmp_path / "secret.json"
+        config.write_atomic(path, "{}", mode=0o600)
+        assert modes == [(0, 0o600)]
+        assert path.stat().st_mode & 0o777 == 0o600
+
+    def test_save_leaves_no_temp_files(self, profiles_dir):
+        config.save_profile("test", {"name": "test"})
+        assert sorted(p.name for p in (profiles_dir / "test").iterdir()) == [
+            config.GENERATION_NAME, config.LOCK_NAME, "profile.toml",
+        ]
+
+    def test_failed_write_keeps_old_content(self, profiles_dir, monkeypatch):
+        config.save_profile("test", {"name": "old"})
+        monkeypatch.setattr(os, "fsync", lambda fd: (_ for _ in ()).throw(OSError("disk full")))
+        with pytest.raises(OSError):
+            config.save_profile("test", {"name": "new"})
+        assert config.load_profile("test") == {"name": "old"}
+        assert config.generation("test") == 1
+
+
+class TestOverrides:
+    def test_parse_values(self):
+        assert config.parse_override("git.author_email=bob@x.com") == (["git", "author_email"], "bob@x.com")
+        assert config.parse_override("npm.isolate=false") == (["npm", "isolate"], False)
+        assert config.parse_override('profile.description="Acme 2"') == (["profile", "description"], "Acme 2")
+
+    @pytest.mark.parametrize("text", ["git.author_email", "=x", "git..email=x"])
+    def test_parse_invalid(self, text):
+        with pytest.raises(ValueError):
+            config.parse_override(text)
+
+    def test_apply_creates_tables(self):
+        data = config.apply_overrides({"git": {"author_name": "A"}}, [(["aws", "profile"], "p")])
+        assert data == {"git": {"author_name": "A"}, "aws": {"profile": "p"}}
+
+    def test_apply_refuses_scalar_as_table(self):
+        with pytest.raises(ValueError):
+            config.apply_overrides({"git": "x"}, [(["git", "email"], "e")])
+
+
+class TestGenerations:
+    def test_save_bumps_profile_and_store(self, profiles_dir):
+        assert (config.generation("a"), config.store_generation()) == (0, 0)
+        config.save_profile("a", {})
+        config.save_profile("a", {})
+        config.save_profile("b", {})
+        assert (config.generation("a"), config.generation("b")) == (2, 1)
+        assert config.store_generation() == 3
+
+    def test_store_generation_file_replaced_on_bump(self, profiles_dir):
+        config.bump_generation()
+        before = config.store_generation_path().stat().st_ino
+        config.bump_generation()
+        assert config.store_generation_path().stat().st_ino != before
+
+    def test_lock_is_reentrant(self, profiles_dir):
+        with config.profile_lock("a"):
+            with config.profile_lock("a"):
+                config.save_profile("a", {})
+        assert config.generation("a") == 1
+
+    def test_lock_excludes_other_processes(self, profiles_dir):
+        import fcntl
+
+        with config.profile_lock("a"):
+            fd = os.open(profiles_dir / "a" / config.LOCK_NAME, os.O_RDWR)
+            pid = os.fork()
+            if pid == 0:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    os._exit(0)
+                except BlockingIOError:
+                    os._exit(1)
+            os.close(fd)
+            _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 1
+
 
 class TestEnsureProfileDirs:
     def test_creates_subdirs(self, profiles_dir):
@@ -116,6 +213,119 @@ class TestBuildEnv:
         assert "~" not in env["MY_PATH"]
 
 
+class TestEnvCache:
+    def _age(self, path, seconds=10):
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns - seconds * 1_000_000_000))
+
+    def test_writes_cache_file(self, fake_profile):
+        fake_profile("cached", {"git": {"author_name": "Alice"}})
+        env = config.build_env("cached")
+        assert config.env_cache_path("cached").is_file()
+        assert config.build_env("cached") == env
+
+    def test_warm_hit_skips_toml_parse(self, fake_profile, monkeypatch):
+        fake_profile("warm", {"git": {"author_name": "Alice"}})
+        self._age(config.profile_toml("warm"))
+        config.build_env("warm")
+
+        def boom(*args, **kwargs):
+            raise AssertionError("profile.toml was parsed")
+
+        monkeypatch.setattr(tomllib, "loads", boom)
+        monkeypatch.setattr(tomllib, "load", boom)
+        assert config.build_env("warm")["GIT_AUTHOR_NAME"] == "Alice"
+
+    def test_touch_without_change_reuses_env(self, fake_profile, monkeypatch):
+        fake_profile("touched", {"git": {"author_name": "Alice"}})
+        config.build_env("touched")
+        os.utime(config.profile_toml("touched"))
+        monkeypatch.setattr(tomllib, "loads", None)
+        assert config.build_env("touched")["GIT_AUTHOR_NAME"] == "Alice"
+
+    def test_invalidated_by_toml_change(self, fake_profile):
+        fake_profile("changing", {"git": {"author_name": "Alice"}})
+        assert config.build_env("changing")["GIT_AUTHOR_NAME"] == "Alice"
+        fake_profile("changing", {"git": {"author_name": "Bob"}})
+        assert config.build_env("changing")["GIT_AUTHOR_NAME"] == "Bob"
+
+    def test_invalidated_by_global_config_change(self, fake_profile):
+        fake_profile("glob", {"name": "glob"})
+        config.build_env("glob")
+        before = config.env_cache_path("glob").read_text()
+        config.GLOBAL_CONFIG.write_text("# touched\n")
+        config.build_env("glob")
+        assert config.env_cache_path("glob").read_text() != before
+
+    def test_corrupt_cache_is_rebuilt(self, fake_profile):
+        fake_profile("corrupt", {"git": {"author_name": "Alice"}})
+        config.env_cache_path("corrupt").write_text("{not json")
+        assert config.build_env("corrupt")["GIT_AUTHOR_NAME"] == "Alice"
+
+    def test_missing_profile_raises(self, profiles_dir):
+        with pytest.raises(FileNotFoundError):
+            config.build_env("nonexistent")
+
+
+class TestSeedClaudeConfig:
+    @pytest.fixture()
+    def home(self, tmp_path, monkeypatch):
+        home = tmp_path / "home"
+        home.mkdir()
+        monkeypatch.setenv("HOME", str(home))
+        return home
+
+    def _write_source(self, home):
+        big = {
+            "numStartups": 812,
+            "hasCompletedOnboarding": True,
+            "projects": {
+                f"/work/repo-{i}": {"history": [{"display": "x" * 200} for _ in range(20)]}
+                for i in range(500)
+            },
+            "lastOnboardingVersion": "1.0.0",
+            "oauthAccount": {"emailAddress": "me@example.com", "accountUuid": "abc"},
+            "cachedChangelog": "y" * 100_000,
+        }
+        (home / ".claude.json").write_text(json.dumps(big))
+
+    def test_seeds_only_onboarding_keys(self, home, fake_profile):
+        self._write_source(home)
+        fake_profile("demo", {})
+        config.seed_claude_config("demo")
+        dest = config.profile_dir("demo") / "claude" / ".claude.json"
+        assert (home / ".claude.json").stat().st_size > 1_000_000
+        assert dest.stat().st_size < 1_000
+        seeded = json.loads(dest.read_text())
+        assert seeded["hasCompletedOnboarding"] is True
+        assert seeded["lastOnboardingVersion"] == "1.0.0"
+        assert seeded["oauthAccount"]["emailAddress"] == "me@example.com"
+        assert "projects" not in seeded
+        assert dest.stat().st_mode & 0o777 == 0o600
+
+    def test_allowlist_from_global_config(self, home, fake_profile):
+        self._write_source(home)
+        fake_profile("demo", {})
+        config.GLOBAL_CONFIG.write_text('[claude]\nseed_keys = ["numStartups"]\n')
+        config.seed_claude_config("demo")
+        dest = config.profile_dir("demo") / "claude" / ".claude.json"
+        assert json.loads(dest.read_text()) == {"numStartups": 812}
+
+    def test_existing_file_kept(self, home, fake_profile):
+        self._write_source(home)
+        pdir = fake_profile("demo", {})
+        (pdir / "claude").mkdir()
+        (pdir / "claude" / ".claude.json").write_text("{}")
+        config.seed_claude_config("demo")
+        assert (pdir / "claude" / ".claude.json").read_text() == "{}"
+
+    def test_malformed_source_skipped(self, home, fake_profile):
+        (home / ".claude.json").write_text('{"hasCompletedOnboarding": tr')
+        fake_profile("demo", {})
+        config.seed_claude_config("demo")
+        assert not (config.profile_dir("demo") / "claude" / ".claude.json").exists()
+
+
 class TestGenerateBrowserScript:
     def test_creates_executable_script(self, fake_profile):
         fake_profile("browser", {
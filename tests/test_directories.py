@@ -0,0 +1,89 @@
+"""Tests for xtp.directories."""
+
+from __future__ import annotations
+
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from xtp import activate, config, directories
+
+
+def _write_global(text: str) -> None:
+    config.GLOBAL_CONFIG.write_text(text)
+
+
+class TestTrie:
+    def test_deepest_prefix_wins(self):
+        trie = directories.compile_trie({
+            "/work/acme": "acme",
+            "/work/acme/oss": "personal",
+        })
+        assert directories.resolve(trie, "/work/acme") == "acme"
+        assert directories.resolve(trie, "/work/acme/api/src/deep/dir") == "acme"
+        assert directories.resolve(trie, "/work/acme/oss/lib") == "personal"
+
+    def test_component_boundaries(self):
+        trie = directories.compile_trie({"/work/acme": "acme"})
+        assert directories.resolve(trie, "/work/acme2") is None
+        assert directories.resolve(trie, "/work") is None
+
+    def test_path_is_normalized(self):
+        trie = directories.compile_trie({"/work/acme": "acme"})
+        assert directories.resolve(trie, "/work/other/../acme/./x/") == "acme"
+
+    def test_root_prefix(self):
+        trie = directories.compile_trie({"/": "default"})
+        assert directories.resolve(trie, "/anything") == "default"
+
+
+class TestLoadMapping:
+    def test_expands_home(self, profiles_dir, monkeypatch, tmp_path):
+        monkeypatch.setenv("HOME", str(tmp_path))
+        _write_global('[directories]\n"~/work/acme/" = "acme"\n')
+        assert directories.load_mapping() == {str(tmp_path / "work" / "acme"): "acme"}
+
+    def test_registers_resolved_symlink(self, profiles_dir, tmp_path):
+        real = tmp_path / "real"
+        real.mkdir()
+        link = tmp_path / "link"
+        link.symlink_to(real)
+        _write_global(f'[directories]\n"{link}" = "acme"\n')
+        assert directories.load_mapping() == {str(link): "acme", str(real): "acme"}
+
+    def test_no_global_config(self, profiles_dir):
+        assert directories.load_mapping() == {}
+
+
+class TestHook:
+    def test_arms_deepest_first(self, profiles_dir):
+        text = directories.render_hook({"/work/acme": "acme", "/work/acme/oss": "personal"})
+        assert text.index("'/work/acme/oss'|") < text.index("'/work/acme'|")
+        assert "add-zsh-hook chpwd _xtp_chpwd" in text
+
+    def test_write_hook(self, profiles_dir, fake_profile, tmp_path):
+        fake_profile("acme", {"git": {"author_name": "A"}})
+        _write_global(f'[directories]\n"{tmp_path}/acme" = "acme"\n"{tmp_path}/gone" = "gone"\n')
+        path = directories.write_hook()
+        text = path.read_text()
+        assert str(activate.script_path("acme", "zsh")) in text
+        assert "gone" not in text
+        assert activate.script_path("acme", "zsh").is_file()
+        assert path.stat().st_mtime_ns >= config.GLOBAL_CONFIG.stat().st_mtime_ns
+
+    @pytest.mark.skipif(shutil.which("bash") is None, reason="needs bash")
+    def test_case_lookup_in_shell(self, profiles_dir):
+        text = directories.render_hook({"/work/acme": "acme", "/work/acme/oss": "personal"})
+        lookup = text[text.index("_xtp_dir_script() {"):text.index("_xtp_chpwd() {")]
+        script = (
+            'print() { shift 2; echo "$@"; }\n' + lookup +
+            'for d in /work/acme/x /work/acme/oss/y /work/acme2 /tmp; do\n'
+            '  PWD=$d; _xtp_dir_script || echo none\n'
+            'done\n'
+        )
+        out = subprocess.run(["bash", "-c", script], capture_output=True, text=True).stdout
+        acme = activate.script_path("acme", "zsh")
+        personal = activate.script_path("personal", "zsh")
+        assert out.split() == [str(acme), str(personal), "none", "none"]
@@ -0,0 +1,97 @@
+"""Tests for xtp.fileops."""
+
+from __future__ import annotations
+
+import os
+from unittest.mock import patch
+
+import pytest
+
+from xtp import fileops
+
+
+@pytest.fixture()
+def src(tmp_path):
+    root = tmp_path / "src"
+    (root / "projects" / "app").mkdir(parents=True)
+    (root / "projects" / "app" / "a.jsonl").write_text("one\n")
+    (root / "settings.json").write_text("{}")
+    (root / "latest").symlink_to("projects/app")
+    return root
+
+
+class TestSyncTree:
+    def test_copies_tree(self, src, tmp_path):
+        dst = tmp_path / "dst"
+        stats = fileops.sync_tree(src, dst)
+        assert (dst / "projects" / "app" / "a.jsonl").read_text() == "one\n"
+        assert os.readlink(dst / "latest") == "projects/app"
+        assert stats.files == 2
+        assert stats.written == 2
+        st_src, st_dst = (src / "settings.json").stat(), (dst / "settings.json").stat()
+        assert st_dst.st_mtime_ns == st_src.st_mtime_ns
+
+    def test_rerun_only_touches_changes(self, src, tmp_path):
+        dst = tmp_path / "dst"
+        fileops.sync_tree(src, dst)
+        (src / "projects" / "app" / "a.jsonl").write_text("one\ntwo\n")
+        stats = fileops.sync_tree(src, dst)
+        assert (stats.written, stats.unchanged) == (1, 1)
+        assert (dst / "projects" / "app" / "a.jsonl").read_text() == "one\ntwo\n"
+
+    def test_keeps_destination_only_files(self, src, tmp_path):
+        dst = tmp_path / "dst"
+        dst.mkdir()
+        (dst / "mine.txt").write_text("keep")
+        fileops.sync_tree(src, dst)
+        assert (dst / "mine.txt").read_text() == "keep"
+
+    def test_resumes_after_partial_copy(self, src, tmp_path):
+        dst = tmp_path / "dst"
+        (dst / "projects" / "app").mkdir(parents=True)
+        (dst / "projects" / "app" / f"a.jsonl{fileops.PARTIAL_SUFFIX}").write_text("o")
+        stats = fileops.sync_tree(src, dst)
+        assert stats.errors == []
+        assert not (dst / "projects" / "app" / f"a.jsonl{fileops.PARTIAL_SUFFIX}").exists()
+        assert (dst / "projects" / "app" / "a.jsonl").read_text() == "one\n"
+
+    def test_hardlink(self, src, tmp_path):
+        dst = tmp_path / "dst"
+        stats = fileops.sync_tree(src, dst, hardlink=True)
+        assert stats.linked == 2
+        assert (dst / "settings.json").samefile(src / "settings.json")
+        assert fileops.sync_tree(src, dst, hardlink=True).written == 0
+
+    def test_skip(self, src, tmp_path):
+        dst = tmp_path / "dst"
+        fileops.sync_tree(src, dst, skip=lambda rel: rel == "projects")
+        assert not (dst / "projects").exists()
+        assert (dst / "settings.json").exists()
+
+    def test_progress(self, src, tmp_path):
+        calls = []
+        fileops.sync_tree(src, tmp_path / "dst", progress=lambda *a: calls.append(a))
+        assert calls[0] == (0, 2, 0)
+        assert calls[-1][:2] == (2, 2)
+
+    def test_errors_are_collected(self, src, tmp_path):
+        with patch("xtp.fileops.shutil.copyfile", side_effect=PermissionError(13, "denied")), \
+                patch("xtp.fileops._reflink", return_value=False):
+            stats = fileops.sync_tree(src, tmp_path / "dst")
+        assert len(stats.errors) == 2
+        assert "denied" in stats.errors[0]
+
+
+class TestCopyFile:
+    def test_falls_back_to_copy_without_reflink(self, src, tmp_path):
+        target = tmp_path / "out"
+        st = (src / "settings.json").stat()
+        with patch("xtp.fileops._reflink", return_value=False):
+            assert fileops.copy_file(str(src / "settings.json"), str(target), st) == "copied"
+        assert target.read_text() == "{}"
+
+    def test_cross_device_hardlink_copies(self, src, tmp_path):
+        st = (src / "settings.json").stat()
+        with patch("xtp.fileops.os.link", side_effect=OSError(18, "Invalid cross-device link")):
+            how = fileops.copy_file(str(src / "settings.json"), str(tmp_path / "out"), st, hardlink=True)
+        assert how in ("copied", "cloned")
@@ -0,0 +1,102 @@
+"""Tests for xtp.index — the cached profile index."""
+
+from __future__ import annotations
+
+import os
+import tomllib
+
+import pytest
+
+from xtp import config, index
+
+
+def _age(path, seconds=10):
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns - seconds * 1_000_000_000))
+
+
+class TestLoad:
+    def test_empty(self, profiles_dir):
+        assert index.load() == {}
+
+    def test_missing_profiles_dir(self, profiles_dir):
+        profiles_dir.rmdir()
+        assert index.load() == {}
+
+    def test_lists_profiles_with_fields(self, fake_profile):
+        fake_profile("beta", {"profile": {"description": "Beta Inc"}})
+        fake_profile("alpha", {"git": {"author_email": "a@alpha.com"}})
+        profiles = index.load()
+        assert list(profiles) == ["alpha", "beta"]
+        assert profiles["beta"]["description"] == "Beta Inc"
+        assert profiles["alpha"]["author_email"] == "a@alpha.com"
+        assert index.index_path().is_file()
+
+    def test_warm_load_parses_nothing(self, fake_profile, profiles_dir, monkeypatch):
+        fake_profile("alpha", {"profile": {"description": "A"}})
+        _age(config.profile_toml("alpha"))
+        _age(profiles_dir)
+        index.load()
+
+        def boom(*args, **kwargs):
+            raise AssertionError("profile.toml was parsed")
+
+        monkeypatch.setattr(tomllib, "load", boom)
+        assert index.load()["alpha"]["description"] == "A"
+
+    def test_picks_up_hand_edits(self, fake_profile):
+        fake_profile("alpha", {"profile": {"description": "Old"}})
+        index.load()
+        fake_profile("alpha", {"profile": {"description": "Newer"}})
+        assert index.load()["alpha"]["description"] == "Newer"
+
+    def test_new_and_removed_profiles(self, fake_profile, profiles_dir):
+        pdir = fake_profile("alpha", {"name": "a"})
+        index.load()
+        (pdir / "profile.toml").unlink()
+        pdir.rmdir()
+        fake_profile("beta", {"name": "b"})
+        assert list(index.load()) == ["beta"]
+
+    def test_dir_gains_toml_later(self, profiles_dir):
+        (profiles_dir / "late").mkdir()
+        _age(profiles_dir)
+        assert index.load() == {}
+        (profiles_dir / "late" / "profile.toml").write_text("")
+        assert list(index.load()) == ["late"]
+
+    def test_unparseable_toml_recorded(self, profiles_dir):
+        (profiles_dir / "bad").mkdir()
+        (profiles_dir / "bad" / "profile.toml").write_text("not = [valid")
+        entry = index.load()["bad"]
+        assert entry["description"] == ""
+        assert "error" in entry
+
+    def test_invalid_utf8_recorded(self, profiles_dir):
+        for name in ("a", "b"):
+            (profiles_dir / name).mkdir()
+        (profiles_dir / "a" / "profile.toml").write_bytes(b'x = "\xff"\n')
+        (profiles_dir / "b" / "profile.toml").write_text('[profile]\ndescription = "ok"\n')
+        entries = index.load()
+        assert list(entries) == ["a", "b"]
+        assert "error" in entries["a"]
+        assert entries["b"]["description"] == "ok"
+
+
+class TestUpdateRemove:
+    def test_save_profile_updates_index(self, profiles_dir):
+        config.save_profile("alpha", {"profile": {"description": "First"}})
+        config.save_profile("alpha", {"profile": {"description": "Second"}})
+        assert index.load()["alpha"]["description"] == "Second"
+
+    def test_remove(self, fake_profile):
+        fake_profile("alpha", {"name": "a"})
+        index.load()
+        index.remove("alpha")
+        assert "alpha" not in index._read()["profiles"]
+
+    @pytest.mark.parametrize("content", ["{not json", '{"version": 0}'])
+    def test_invalid_index_is_rebuilt(self, fake_profile, content):
+        fake_profile("alpha", {"name": "a"})
+        index.index_path().write_text(content)
+        assert list(index.load()) == ["alpha"]
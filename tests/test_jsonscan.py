@@ -0,0 +1,74 @@
+"""Tests for xtp.jsonscan — pure unit tests, no mocking."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from xtp import jsonscan
+
+DOC = json.dumps({
+    "a": [1, {"b": "}]"}, "x\"y"],
+    "num": -1.5e3,
+    "flag": True,
+    "nil": None,
+    "profile": {"other": {"info_cache": 1}, "info_cache": {"Default": {"name": "Me"}}},
+}).encode()
+
+
+class TestMembers:
+    def test_top_level_keys(self):
+        assert jsonscan.extract_keys(DOC, ["num", "flag", "nil", "zzz"]) == {
+            "num": -1500.0, "flag": True, "nil": None,
+        }
+
+    def test_members_cover_whole_document(self):
+        keys = [k for k, _, _ in jsonscan.iter_members(DOC)]
+        assert keys == ["a", "num", "flag", "nil", "profile"]
+
+    def test_empty_object(self):
+        assert list(jsonscan.iter_members(b" { } ")) == []
+
+    @pytest.mark.parametrize("doc", [b"[1]", b'{"a": 1', b'{"a" 1}', b'{"a": [1, 2}'])
+    def test_malformed(self, doc):
+        with pytest.raises(ValueError):
+            list(jsonscan.iter_members(doc))
+
+
+class TestFind:
+    def test_finds_nested_key(self):
+        assert jsonscan.find(DOC, "info_cache") == 1
+
+    def test_accept_skips_look_alikes(self):
+        value = jsonscan.find(DOC, "info_cache", accept=lambda v: isinstance(v, dict))
+        assert value == {"Default": {"name": "Me"}}
+
+    def test_ignores_key_text_inside_strings(self):
+        doc = json.dumps({"s": '"k": 1', "k": 2}).encode()
+        assert jsonscan.find(doc, "k") == 2
+
+    def test_matches_at_any_depth(self):
+        # Not anchored: a look-alike of the same shape deeper in the
+        # document wins if it comes first, so *accept* must tell them apart.
+        doc = json.dumps({"a": {"b": {"k": {"x": 1}}}, "k": {"y": 2}}).encode()
+        assert jsonscan.find(doc, "k", accept=lambda v: isinstance(v, dict)) == {"x": 1}
+        assert jsonscan.find(doc, "k", accept=lambda v: "y" in v) == {"y": 2}
+
+    def test_missing(self):
+        with pytest.raises(KeyError):
+            jsonscan.find(DOC, "absent")
+
+
+class TestMapped:
+    def test_mapped_file(self, tmp_path):
+        path = tmp_path / "doc.json"
+        path.write_bytes(DOC)
+        with jsonscan.mapped(path) as buf:
+            assert jsonscan.extract_keys(buf, ["num"]) == {"num": -1500.0}
+
+    def test_empty_file(self, tmp_path):
+        path = tmp_path / "empty.json"
+        path.write_bytes(b"")
+        with jsonscan.mapped(path) as buf:
+            assert buf == b""
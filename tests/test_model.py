@@ -0,0 +1,93 @@
+"""Tests for xtp.model."""
+
+from __future__ import annotations
+
+import os
+import time
+
+import pytest
+
+from xtp import config, model
+
+
+def _age(path):
+    old = time.time() - 60
+    os.utime(path, (old, old))
+
+
+class TestParse:
+    def test_sections(self):
+        p = model.parse("acme", {
+            "profile": {"description": "Acme"},
+            "git": {"author_name": "Alice", "ssh_key": "~/.ssh/k"},
+            "npm": {"isolate": True},
+            "gcloud": {"config_dir": "~/gc"},
+            "env": {"A": "x", "N": 3},
+        })
+        assert p.profile.description == "Acme"
+        assert p.git == model.Git(author_name="Alice", ssh_key="~/.ssh/k")
+        assert p.npm.isolate is True
+        assert p.chrome.profile_directory == ""
+        assert p.env == {"A": "x", "N": "3"}
+        assert p.diagnostics == ()
+
+    def test_unknown_keys_suggest(self):
+        p = model.parse("acme", {"git": {"author_emial": "a@b.c"}, "chorme": {}})
+        assert [str(d) for d in p.diagnostics] == [
+            "git.author_emial: unknown key (did you mean 'author_email'?)",
+            "chorme: unknown key (did you mean 'chrome'?)",
+        ]
+        assert p.git.author_email == ""
+
+    def test_type_errors_keep_defaults(self):
+        p = model.parse("acme", {
+            "npm": {"isolate": "yes"}, "aws": "dev", "git": {"author_name": 42},
+            "env": {"LIST": [1, 2]},
+        })
+        assert [str(d) for d in p.diagnostics] == [
+            "npm.isolate: expected a boolean, got a string",
+            "aws: expected a table, got a string",
+            "git.author_name: expected a string, got an integer",
+            "env.LIST: expected a string, got an array",
+        ]
+        assert p.npm.isolate is False
+        assert p.env == {}
+
+    def test_slotted(self):
+        p = model.parse("acme", {})
+        for obj in (p, p.git, p.chrome, p.aws, p.npm, p.gcloud, p.profile):
+            assert not hasattr(obj, "__dict__")
+
+
+class TestLoad:
+    def test_missing(self, profiles_dir):
+        with pytest.raises(FileNotFoundError):
+            model.load("nope")
+
+    def test_memoized_until_changed(self, fake_profile, monkeypatch):
+        pdir = fake_profile("acme", {"git": {"author_name": "Alice"}})
+        _age(pdir / "profile.toml")
+        first = model.load("acme")
+        calls = []
+        real = model.parse
+        monkeypatch.setattr(model, "parse", lambda *a: calls.append(1) or real(*a))
+        assert model.load("acme") is first
+        assert calls == []
+
+        config.save_profile("acme", {"git": {"author_name": "Bob"}})
+        assert model.load("acme").git.author_name == "Bob"
+
+    def test_racy_file_not_memoized(self, fake_profile):
+        fake_profile("acme", {})
+        assert model.load("acme") is not model.load("acme")
+
+    def test_build_env_and_browser_script_parse_once(self, fake_profile, monkeypatch):
+        pdir = fake_profile("acme", {"chrome": {"profile_directory": "Profile 1"}})
+        _age(pdir / "profile.toml")
+        monkeypatch.setattr("xtp.commands.chrome.launcher", lambda: ["chrome"])
+        calls = []
+        real = model.parse
+        monkeypatch.setattr(model, "parse", lambda *a: calls.append(1) or real(*a))
+        config.build_env("acme")
+        config.generate_browser_script("acme")
+        assert calls == [1]
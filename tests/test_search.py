@@ -0,0 +1,118 @@
+"""Tests for xtp.search."""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+
+import pytest
+
+from xtp import search, transcripts
+
+
+def _line(kind, content, ts="2026-09-01T10:00:00Z"):
+    return json.dumps({"type": kind, "timestamp": ts, "message": {"role": kind, "content": content}}) + "\n"
+
+
+@pytest.fixture()
+def transcript(fake_profile):
+    path = fake_profile("acme", {}) / "claude" / "projects" / "-work-api" / "s1.jsonl"
+    path.parent.mkdir(parents=True)
+    path.write_text(
+        _line("user", "Which retry policy should the billing worker use?")
+        + _line("assistant", [{"type": "thinking", "thinking": "secret retry musings"},
+                              {"type": "text", "text": "Use exponential backoff, capped at five tries."}])
+        + _line("user", [{"type": "tool_result", "content": "retry output"}])
+        + json.dumps({"type": "summary", "summary": "Billing retries"}) + "\n"
+    )
+    return path
+
+
+class TestExtractText:
+    def test_text_blocks_only(self):
+        record = json.loads(_line("assistant", [
+            {"type": "text", "text": "a"}, {"type": "tool_use", "input": {}}, {"type": "text", "text": "b"},
+        ]))
+        assert search.extract_text(record) == ("assistant", "a\nb")
+
+    def test_skips_other_records(self):
+        assert search.extract_text({"type": "attachment"}) is None
+        assert search.extract_text(json.loads(_line("user", [{"type": "tool_result"}]))) is None
+
+
+class TestSearch:
+    def test_finds_conversation_text(self, transcript):
+        search.update("acme")
+        hits = search.search("acme", "retry policy")
+        assert [(h.path, h.role, h.offset) for h in hits] == [("-work-api/s1.jsonl", "user", 0)]
+        assert "[retry]" in hits[0].snippet
+        assert hits[0].timestamp.startswith("2026-09-01")
+
+    def test_thinking_and_tool_output_not_indexed(self, transcript):
+        search.update("acme")
+        assert search.search("acme", "musings") == []
+        assert search.search("acme", "output") == []
+        assert [h.role for h in search.search("acme", "billing")] in (
+            ["user", "summary"], ["summary", "user"],
+        )
+
+    def test_plain_query_tolerates_syntax(self, transcript):
+        search.update("acme")
+        assert search.search("acme", 'backoff, "capped') != []
+        with pytest.raises(ValueError):
+            search.search("acme", '"unclosed', raw=True)
+        assert len(search.search("acme", "expon*", raw=True)) == 1
+
+
+class TestIncremental:
+    def test_appended_lines_read_from_offset(self, transcript):
+        search.update("acme")
+        size = transcript.stat().st_size
+        with open(transcript, "a") as f:
+            f.write(_line("user", "What about the invoice queue?"))
+            f.write('{"type": "user", "message": {"content": "partial')
+        stats = search.update("acme")
+        assert (stats.read, stats.rows) == (1, 1)
+        assert stats.bytes == len(_line("user", "What about the invoice queue?"))
+        assert search.search("acme", "invoice")[0].offset == size
+        assert search.search("acme", "retry policy")  # earlier rows kept
+
+        with open(transcript, "a") as f:
+            f.write(' line"}}\n')
+        search.update("acme")
+        assert search.search("acme", "partial")
+
+    def test_unchanged_files_not_read(self, transcript):
+        search.update("acme")
+        assert search.update("acme").read == 0
+
+    def test_replaced_file_reindexed(self, transcript):
+        search.update("acme")
+        tmp = transcript.with_name("tmp")
+        tmp.write_text(_line("user", "completely different"))
+        os.replace(tmp, transcript)
+        search.update("acme")
+        assert search.search("acme", "retry") == []
+        assert search.search("acme", "different")
+
+    def test_deleted_file_dropped(self, transcript):
+        search.update("acme")
+        transcript.unlink()
+        search.update("acme")
+        assert search.search("acme", "retry") == []
+
+    def test_archived_file_stays_searchable(self, transcript, monkeypatch):
+        monkeypatch.setitem(__import__("sys").modules, "zstandard", None)
+        search.update("acme")
+        old = time.time() - 90 * 86400
+        os.utime(transcript, (old, old))
+        transcripts.compact("acme", transcripts.cutoff(30))
+        assert not transcript.exists()
+        search.update("acme")
+        assert search.search("acme", "retry policy")
+
+    def test_profiles_are_separate(self, transcript, fake_profile):
+        fake_profile("other", {})
+        search.update("other")
+        assert search.search("other", "retry") == []
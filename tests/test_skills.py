@@ -0,0 +1,116 @@
+"""Tests for xtp.skills."""
+
+from __future__ import annotations
+
+import pytest
+
+from xtp import skills
+
+
+@pytest.fixture()
+def store(profiles_dir):
+    root = skills.store_dir()
+    (root / "pdf" / "scripts").mkdir(parents=True)
+    (root / "pdf" / "SKILL.md").write_text("# pdf\n")
+    (root / "pdf" / "scripts" / "run.sh").write_text("echo\n")
+    (root / "review").mkdir()
+    (root / "review" / "SKILL.md").write_text("# review\n")
+    (root / ".hidden").mkdir()
+    return root
+
+
+@pytest.fixture()
+def profile(fake_profile):
+    return fake_profile("acme", {})
+
+
+class TestAvailable:
+    def test_lists_skill_dirs(self, store):
+        assert skills.available() == ["pdf", "review"]
+
+    def test_no_store(self, profiles_dir):
+        assert skills.available() == []
+
+
+class TestSymlink:
+    def test_link_points_at_store(self, store, profile):
+        skills.link("acme", "pdf")
+        dest = profile / "claude" / "skills" / "pdf"
+        assert dest.is_symlink()
+        assert dest.resolve() == (store / "pdf").resolve()
+        assert skills.links("acme") == [skills.Link("pdf", "symlink", skills.OK)]
+
+    def test_store_edits_show_through(self, store, profile):
+        skills.link("acme", "pdf")
+        (store / "pdf" / "SKILL.md").write_text("# updated\n")
+        assert (profile / "claude" / "skills" / "pdf" / "SKILL.md").read_text() == "# updated\n"
+
+    def test_removed_from_store_is_broken(self, store, profile):
+        import shutil
+
+        skills.link("acme", "review")
+        shutil.rmtree(store / "review")
+        assert skills.links("acme") == [skills.Link("review", "symlink", skills.BROKEN)]
+        assert skills.sync("acme") == [("review", "removed (no longer in the store)")]
+        assert not (profile / "claude" / "skills" / "review").is_symlink()
+
+
+class TestHardlink:
+    def test_files_share_inodes(self, store, profile):
+        skills.link("acme", "pdf", hardlink=True)
+        dest = profile / "claude" / "skills" / "pdf"
+        assert not dest.is_symlink()
+        assert (dest / "scripts" / "run.sh").stat().st_ino == (store / "pdf" / "scripts" / "run.sh").stat().st_ino
+        assert skills.links("acme") == [skills.Link("pdf", "hardlink", skills.OK)]
+
+    def test_replaced_file_is_stale_until_sync(self, store, profile):
+        skills.link("acme", "pdf", hardlink=True)
+        (store / "pdf" / "SKILL.md").unlink()
+        (store / "pdf" / "SKILL.md").write_text("# new\n")
+        assert skills.links("acme")[0].status == skills.STALE
+
+        assert skills.sync("acme") == [("pdf", "relinked")]
+        assert skills.links("acme")[0].status == skills.OK
+        assert (profile / "claude" / "skills" / "pdf" / "SKILL.md").read_text() == "# new\n"
+
+    def test_new_store_file_is_stale(self, store, profile):
+        skills.link("acme", "pdf", hardlink=True)
+        (store / "pdf" / "extra.md").write_text("x")
+        assert skills.links("acme")[0].status == skills.STALE
+
+
+class TestOwnership:
+    def test_own_skill_is_not_listed_or_replaced(self, store, profile):
+        own = profile / "claude" / "skills" / "pdf"
+        own.mkdir(parents=True)
+        (own / "SKILL.md").write_text("mine")
+        assert skills.links("acme") == []
+        with pytest.raises(FileExistsError):
+            skills.link("acme", "pdf")
+        with pytest.raises(KeyError):
+            skills.unlink("acme", "pdf")
+        assert (own / "SKILL.md").read_text() == "mine"
+
+    def test_foreign_symlink_left_alone(self, store, profile, tmp_path):
+        elsewhere = tmp_path / "elsewhere"
+        elsewhere.mkdir()
+        (profile / "claude" / "skills").mkdir(parents=True)
+        (profile / "claude" / "skills" / "pdf").symlink_to(elsewhere)
+        assert skills.links("acme") == []
+        with pytest.raises(FileExistsError):
+            skills.link("acme", "pdf")
+
+    def test_relink_switches_kind(self, store, profile):
+        skills.link("acme", "pdf", hardlink=True)
+        skills.link("acme", "pdf")
+        assert skills.links("acme") == [skills.Link("pdf", "symlink", skills.OK)]
+
+    def test_unknown_skill(self, store, profile):
+        with pytest.raises(KeyError):
+            skills.link("acme", "nope")
+
+    def test_unlink_keeps_store(self, store, profile):
+        skills.link("acme", "pdf", hardlink=True)
+        skills.unlink("acme", "pdf")
+        assert not (profile / "claude" / "skills" / "pdf").exists()
+        assert (store / "pdf" / "SKILL.md").is_file()
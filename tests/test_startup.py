@@ -0,0 +1,179 @@
+"""Startup regression tests for the hot commands, using python -X importtime.
+
+Each command runs in a fresh interpreter against a throwaway HOME. The
+module checks are exact: each fast path may only import an allow-listed
+set of modules, so any new import onto it fails here. The time budget is
+deliberately loose (override with XTP_STARTUP_BUDGET_MS) and only backs
+that up.
+"""
+
+from __future__ import annotations
+
+import os
+import socket
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+import xtp
+from xtp import config, daemon
+from xtp.commands.daemon import State, serve
+
+SRC = str(Path(xtp.__file__).resolve().parent.parent)
+BUDGET_MS = float(os.environ.get("XTP_STARTUP_BUDGET_MS", "75"))
+
+# Never needed by current, list or a warm env --export
+HEAVY = {
+    "argparse", "tomllib", "subprocess", "hashlib", "shutil",
+    "dataclasses", "inspect", "datetime", "xtp.toml_writer", "xtp.model",
+}
+
+# Standard library packages the fast paths may load beyond the bare
+# interpreter: json, pathlib and what pathlib pulls in on 3.11-3.13.
+# Private C accelerators (_json, _sre, ...) are not listed.
+STDLIB_ALLOWED = {
+    "__future__", "collections", "contextlib", "copyreg", "enum", "errno",
+    "fnmatch", "functools", "glob", "ipaddress", "itertools", "json",
+    "keyword", "nt", "ntpath", "operator", "pathlib", "posixpath", "re",
+    "reprlib", "stat", "string", "types", "urllib", "warnings",
+}
+
+
+def _imports(argv: list[str], home: Path) -> dict[str, int]:
+    """Run xtp *argv* under -X importtime; return {module: cumulative_us}.
+
+    Nested imports are listed with 0 so that the sum over all modules is
+    the total cumulative time of the top-level imports.
+    """
+    code = f"import sys; sys.argv = ['xtp', *{argv!r}]; from xtp.cli import main; main()"
+    env = {
+        "HOME": str(home),
+        "PATH": os.environ.get("PATH", ""),
+        "PYTHONPATH": SRC,
+        "SHELL": "/bin/zsh",
+    }
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    modules: dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        top_level = not name.startswith("  ")
+        modules[name.strip()] = int(cumulative) if top_level else 0
+    return modules
+
+
+def _unexpected(modules: dict[str, int], baseline: set[str], xtp_modules: set[str]) -> list[str]:
+    """Modules loaded beyond the bare interpreter that aren't allow-listed."""
+    return sorted(
+        name for name in modules.keys() - baseline
+        if name not in xtp_modules
+        and not name.startswith("_")
+        and (name.startswith("xtp") or name.partition(".")[0] not in STDLIB_ALLOWED)
+    )
+
+
+def _startup_ms(modules: dict[str, int], baseline: dict[str, int]) -> float:
+    """Cumulative import time of everything the bare interpreter doesn't load."""
+    return sum(us for name, us in modules.items() if name not in baseline) / 1000
+
+
+def _make_home(home: Path) -> Path:
+    pdir = home / ".config" / "xtp" / "profiles" / "work"
+    pdir.mkdir(parents=True)
+    (pdir / "profile.toml").write_text(
+        '[profile]\ndescription = "Work"\n\n[git]\nauthor_name = "W"\nauthor_email = "w@example.com"\n'
+    )
+    # Age everything past the racy window so the caches are trusted
+    old = 1_000_000_000
+    for path in (pdir / "profile.toml", pdir, pdir.parent):
+        os.utime(path, (old, old))
+    return home
+
+
+@pytest.fixture(scope="module")
+def home(tmp_path_factory):
+    """A HOME with one profile whose caches are already warm."""
+    home = _make_home(tmp_path_factory.mktemp("home"))
+    _imports(["list"], home)
+    _imports(["env", "work", "--export", "--shell", "zsh"], home)
+    return home
+
+
+@pytest.fixture(scope="module")
+def baseline(home):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "pass"],
+        env={"HOME": str(home), "PYTHONPATH": SRC}, capture_output=True, text=True, check=True,
+    )
+    return {line.split("|")[-1].strip() for line in proc.stderr.splitlines()}
+
+
+class TestHotCommands:
+    def test_current_skips_config(self, home, baseline):
+        modules = _imports(["current"], home)
+        assert not HEAVY & modules.keys()
+        assert _unexpected(modules, baseline, {"xtp", "xtp.cli"}) == []
+        assert "xtp.config" not in modules
+        assert "pathlib" not in modules or "pathlib" in baseline
+        assert _startup_ms(modules, baseline) < BUDGET_MS
+
+    def test_list_reads_index_only(self, home, baseline):
+        modules = _imports(["list"], home)
+        assert not HEAVY & modules.keys()
+        xtp_modules = {
+            "xtp", "xtp.cli", "xtp.commands", "xtp.commands.list",
+            "xtp.config", "xtp.daemon", "xtp.index",
+        }
+        assert _unexpected(modules, baseline, xtp_modules) == []
+        assert _startup_ms(modules, baseline) < BUDGET_MS
+
+    def test_warm_env_export(self, home, baseline):
+        modules = _imports(["env", "work", "--export", "--shell", "zsh"], home)
+        assert not HEAVY & modules.keys()
+        xtp_modules = {
+            "xtp", "xtp.cli", "xtp.commands", "xtp.commands.env",
+            "xtp.activate", "xtp.config", "xtp.daemon",
+        }
+        assert _unexpected(modules, baseline, xtp_modules) == []
+        assert _startup_ms(modules, baseline) < BUDGET_MS
+
+
+class TestDaemonClient:
+    def test_forwarded_query_skips_config(self, home, monkeypatch):
+        config_dir = home / ".config" / "xtp"
+        monkeypatch.setattr(config, "CONFIG_DIR", config_dir)
+        monkeypatch.setattr(config, "PROFILES_DIR", config_dir / "profiles")
+        monkeypatch.setattr(config, "GLOBAL_CONFIG", config_dir / "config.toml")
+        path = str(config_dir / daemon.SOCKET_NAME)
+        monkeypatch.setattr(daemon, "SOCKET", path)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(path)
+        server.listen()
+        thread = threading.Thread(target=serve, args=(server, State()), daemon=True)
+        thread.start()
+        try:
+            modules = _imports(["env", "work", "--export", "--shell", "zsh"], home)
+        finally:
+            daemon.query({"command": "stop"})
+            thread.join(timeout=5)
+            server.close()
+            os.unlink(path)
+        assert "xtp.daemon" in modules
+        assert not {"xtp.config", "pathlib", "json", "socket"} & modules.keys()
+
+
+class TestColdPaths:
+    def test_other_commands_use_argparse(self, home):
+        assert "argparse" in _imports(["du", "work"], home)
+
+    def test_cold_env_parses_toml(self, tmp_path):
+        home = _make_home(tmp_path)
+        modules = _imports(["env", "work", "--export", "--shell", "zsh"], home)
+        assert "tomllib" in modules
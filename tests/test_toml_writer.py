@@ -2,11 +2,12 @@
 
 from __future__ import annotations
 
+import random
 import tomllib
 
 import pytest
 
-from xtp.toml_writer import dumps
+from xtp.toml_writer import dumps, patch
 
 
 class TestFormatValues:
@@ -31,7 +32,7 @@ class TestFormatValues:
 
     def test_unsupported_type(self):
         with pytest.raises(TypeError, match="Unsupported TOML value type"):
-            dumps({"bad": [1, 2, 3]})
+            dumps({"bad": None})
 
 
 class TestSections:
@@ -63,3 +64,233 @@ class TestRoundTrip:
 
     def test_empty_dict(self):
         assert tomllib.loads(dumps({})) == {}
+
+
+class TestNestedValues:
+    def test_array(self):
+        assert "xs = [1, 2, 3]\n" == dumps({"xs": [1, 2, 3]})
+
+    def test_nested_tables(self):
+        data = {"a": {"b": {"c": 1}, "d": "x"}}
+        text = dumps(data)
+        assert "[a.b]" in text
+        assert tomllib.loads(text) == data
+
+    def test_array_of_tables(self):
+        data = {"hosts": [{"name": "a"}, {"name": "b", "tags": {"x": 1}}]}
+        text = dumps(data)
+        assert text.count("[[hosts]]") == 2
+        assert tomllib.loads(text) == data
+
+    def test_inline_table_in_array(self):
+        data = {"xs": [{"a": 1}, 2]}
+        assert tomllib.loads(dumps(data)) == data
+
+    def test_quoted_keys_and_control_chars(self):
+        data = {"env": {"MY VAR": "a\nb\tc\x01", "a.b": "é"}}
+        assert tomllib.loads(dumps(data)) == data
+
+
+PROFILE = """\
+# Work profile — keep in sync with the wiki.
+[profile]
+description = "Work"   # shown by xtp list
+
+[git]
+author_name  = 'Alice'
+author_email = "alice@example.com"
+
+# Machine-specific
+[env]
+EDITOR = "vim"
+PATHS = [
+    "/a",  # first
+    "/b",
+]
+"""
+
+
+class TestPatch:
+    def test_unchanged_text_is_returned_as_is(self):
+        assert patch(PROFILE, tomllib.loads(PROFILE)) == PROFILE
+
+    def test_changes_only_the_value_span(self):
+        data = tomllib.loads(PROFILE)
+        data["git"]["author_email"] = "alice@work.example"
+        result = patch(PROFILE, data)
+        assert result == PROFILE.replace('"alice@example.com"', '"alice@work.example"')
+
+    def test_keeps_trailing_comment(self):
+        data = tomllib.loads(PROFILE)
+        data["profile"]["description"] = "Job"
+        assert 'description = "Job"   # shown by xtp list\n' in patch(PROFILE, data)
+
+    def test_replaces_multiline_array(self):
+        data = tomllib.loads(PROFILE)
+        data["env"]["PATHS"] = ["/c"]
+        result = patch(PROFILE, data)
+        assert 'PATHS = ["/c"]\n' in result
+        assert tomllib.loads(result) == data
+
+    def test_adds_key_after_its_siblings(self):
+        data = tomllib.loads(PROFILE)
+        data["git"]["ssh_key"] = "~/.ssh/id_work"
+        result = patch(PROFILE, data)
+        assert 'author_email = "alice@example.com"\nssh_key = "~/.ssh/id_work"\n' in result
+        assert result.startswith("# Work profile")
+
+    def test_adds_new_table_at_end(self):
+        data = tomllib.loads(PROFILE)
+        data["aws"] = {"profile": "work"}
+        result = patch(PROFILE, data)
+        assert result.startswith(PROFILE)
+        assert result.endswith('\n[aws]\nprofile = "work"\n')
+
+    def test_removes_key_line(self):
+        data = tomllib.loads(PROFILE)
+        del data["git"]["author_name"]
+        assert patch(PROFILE, data) == PROFILE.replace("author_name  = 'Alice'\n", "")
+
+    def test_removes_table(self):
+        data = tomllib.loads(PROFILE)
+        del data["git"]
+        result = patch(PROFILE, data)
+        assert "[git]" not in result
+        assert "# Work profile" in result
+        assert tomllib.loads(result) == data
+
+    def test_dotted_keys(self):
+        text = 'a.b = 1\na.c = 2  # c\n'
+        result = patch(text, {"a": {"b": 1, "c": 3, "d": 4}})
+        assert result == 'a.b = 1\na.c = 3  # c\na.d = 4\n'
+
+    def test_root_key_goes_before_first_table(self):
+        result = patch("[git]\nx = 1\n", {"name": "n", "git": {"x": 1}})
+        assert tomllib.loads(result) == {"name": "n", "git": {"x": 1}}
+
+    def test_type_change_keeps_the_new_type(self):
+        result = patch("x = 1\n", {"x": True})
+        assert tomllib.loads(result)["x"] is True
+
+    def test_table_becoming_a_value(self):
+        data = tomllib.loads(PROFILE)
+        data["git"] = "nope"
+        result = patch(PROFILE, data)
+        assert tomllib.loads(result) == data
+        assert "# Machine-specific" in result
+
+    def test_array_of_tables_change(self):
+        text = "[[hosts]]\nname = 'a'  # first\n\n[[hosts]]\nname = 'b'\n"
+        data = {"hosts": [{"name": "a"}, {"name": "c"}]}
+        assert tomllib.loads(patch(text, data)) == data
+
+    def test_invalid_text_is_replaced(self):
+        assert patch("not toml [", {"a": 1}) == "a = 1\n"
+
+
+def _random_key(rng: random.Random) -> str:
+    return rng.choice([
+        lambda: f"K{rng.randrange(10**6)}",
+        lambda: rng.choice(["a b", "x.y", "é", "quote\"d", ""]) + str(rng.randrange(100)),
+    ])()
+
+
+def _random_value(rng: random.Random, depth: int = 0) -> object:
+    kinds = ["str", "int", "float", "bool"] + (["list", "table"] if depth < 2 else [])
+    kind = rng.choice(kinds)
+    if kind == "str":
+        return "".join(rng.choice("ab \"'\\\n\t#=[]{}é\x01") for _ in range(rng.randrange(8)))
+    if kind == "int":
+        return rng.randrange(-10**12, 10**12)
+    if kind == "float":
+        return rng.uniform(-1e6, 1e6)
+    if kind == "bool":
+        return rng.random() < 0.5
+    if kind == "list":
+        return [_random_value(rng, depth + 2) for _ in range(rng.randrange(4))]
+    return _random_table(rng, depth + 1, rng.randrange(1, 5))
+
+
+def _random_table(rng: random.Random, depth: int, size: int) -> dict:
+    return {_random_key(rng): _random_value(rng, depth) for _ in range(size)}
+
+
+def _mutate(rng: random.Random, table: dict) -> None:
+    for _ in range(rng.randrange(1, 6)):
+        op = rng.random()
+        keys = list(table)
+        if op < 0.4 and keys:
+            key = rng.choice(keys)
+            if isinstance(table[key], dict) and rng.random() < 0.7:
+                _mutate(rng, table[key])
+            else:
+                table[key] = _random_value(rng, 1)
+        elif op < 0.7:
+            table[_random_key(rng)] = _random_value(rng, 1)
+        elif keys:
+            del table[rng.choice(keys)]
+
+
+def _decorate(rng: random.Random, text: str) -> str:
+    """Sprinkle comments over a document, so patching has something to preserve."""
+    out = []
+    for i, line in enumerate(text.splitlines(keepends=True)):
+        if rng.random() < 0.3:
+            out.append(f"# comment {i}\n")
+        if rng.random() < 0.3 and " = " in line and not line.rstrip().endswith(("[", "{")):
+            line = line.rstrip("\n") + f"  # trailing {i}\n"
+        out.append(line)
+    return "".join(out)
+
+
+HAND_WRITTEN = [
+    PROFILE,
+    'a = """multi\nline "" quotes"""\nb = \'\'\'raw \\ text\'\'\'\n[t]\nc.d = 1  # dotted\nc."e f" = 2\n',
+    "point = { x = 1, y = [1, 2], z = { w = 'a#b' } }  # inline\n[[arr]]\nk = 1\n\n[other]\nv = 'x'\n",
+    "[a.b.c]\nx = 1\n[a]\ny = 2\n[d]\n\n# trailing comment\n",
+    'date = 1979-05-27 07:32:00Z\nt = 07:32:00\n"quoted key" = -inf\nhex = 0xdead_beef\n',
+]
+
+
+class TestPatchFuzz:
+    @pytest.mark.parametrize("seed", range(200))
+    def test_round_trip(self, seed):
+        rng = random.Random(seed)
+        old = _random_table(rng, 0, rng.randrange(1, 8))
+        text = _decorate(rng, dumps(old))
+        assert tomllib.loads(text) == old
+        new = tomllib.loads(text)
+        _mutate(rng, new)
+        result = patch(text, new)
+        assert tomllib.loads(result) == new
+        # Standalone comments above the first table are never in a removed span.
+        head = ("\n" + text).split("\n[", 1)[0].splitlines()
+        assert all(line in result for line in head if line.startswith("# comment"))
+
+    @pytest.mark.parametrize("seed", range(50))
+    def test_hand_written_documents(self, seed):
+        rng = random.Random(seed)
+        text = HAND_WRITTEN[seed % len(HAND_WRITTEN)]
+        new = tomllib.loads(text)
+        _mutate(rng, new)
+        assert tomllib.loads(patch(text, new)) == new
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_large_env_table(self, seed):
+        rng = random.Random(seed)
+        env = {f"VAR_{i}": f"value {i} {rng.random()}" for i in range(5000)}
+        data = {"profile": {"description": "big"}, "env": env}
+        text = "# header comment\n" + dumps(data)
+        new = tomllib.loads(text)
+        changed = rng.sample(sorted(env), 20)
+        for key in changed[:10]:
+            new["env"][key] = "changed"
+        for key in changed[10:]:
+            del new["env"][key]
+        new["env"]["ADDED"] = "x"
+        result = patch(text, new)
+        assert tomllib.loads(result) == new
+        assert result.startswith("# header comment\n")
+        # Untouched lines are byte-for-byte the same.
+        kept = set(text.splitlines()) & set(result.splitlines())
+        assert len(kept) == len(text.splitlines()) - 20
@@ -0,0 +1,177 @@
+"""Tests for xtp.transcripts."""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+
+import pytest
+
+from xtp import transcripts
+
+OLD = time.time() - 90 * 86400
+
+
+@pytest.fixture(autouse=True)
+def _gzip_only(monkeypatch):
+    monkeypatch.setitem(__import__("sys").modules, "zstandard", None)
+
+
+@pytest.fixture()
+def profile(fake_profile):
+    pdir = fake_profile("acme", {})
+    projects = pdir / "claude" / "projects"
+    _transcript(projects / "-work-api" / "s1.jsonl", '{"n": 1}\n' * 50, OLD)
+    _transcript(projects / "-work-api" / "s2" / "subagents" / "a.jsonl", '{"n": 2}\n', OLD)
+    _transcript(projects / "-work-web" / "s3.jsonl", '{"n": 3}\n', OLD)
+    _transcript(projects / "-work-web" / "recent.jsonl", '{"n": 4}\n', time.time())
+    (projects / "-work-web" / "memory.md").write_text("keep")
+    os.utime(projects / "-work-web" / "memory.md", (OLD, OLD))
+    return pdir
+
+
+def _transcript(path, text, mtime):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    os.utime(path, (mtime, mtime))
+
+
+class TestCompact:
+    def test_dry_run_counts_only(self, profile):
+        stats = transcripts.compact("acme", transcripts.cutoff(30), dry_run=True)
+        assert stats.files == 3
+        assert stats.bytes == len('{"n": 1}\n') * 50 + len('{"n": 2}\n') * 2
+        assert (profile / "claude" / "projects" / "-work-api" / "s1.jsonl").exists()
+        assert not (profile / transcripts.ARCHIVE_DIR).exists()
+
+    def test_archives_old_transcripts(self, profile):
+        stats = transcripts.compact("acme", transcripts.cutoff(30))
+        assert (stats.files, stats.codec, stats.errors) == (3, "gzip", [])
+        projects = profile / "claude" / "projects"
+        assert not (projects / "-work-api" / "s1.jsonl").exists()
+        assert not (projects / "-work-api" / "s2").exists()  # emptied dirs pruned
+        assert (projects / "-work-api").is_dir()
+        assert (projects / "-work-web" / "recent.jsonl").exists()
+        assert (projects / "-work-web" / "memory.md").exists()
+        archive = profile / transcripts.ARCHIVE_DIR
+        assert sorted(p.name for p in archive.iterdir()) == [
+            "-work-api.jsonl.gz", "-work-web.jsonl.gz", "index.json",
+        ]
+        assert [s.key for s in transcripts.sessions("acme")] == [
+            "-work-api/s1.jsonl", "-work-api/s2/subagents/a.jsonl", "-work-web/s3.jsonl",
+        ]
+
+    def test_second_run_appends(self, profile):
+        transcripts.compact("acme", transcripts.cutoff(30))
+        _transcript(profile / "claude" / "projects" / "-work-api" / "s4.jsonl", "late\n", OLD)
+        transcripts.compact("acme", transcripts.cutoff(30))
+        (s4,) = transcripts.find("acme", "s4")
+        (s1,) = transcripts.find("acme", "s1")
+        assert s4.archive == s1.archive
+        transcripts.extract("acme", s1)
+        transcripts.extract("acme", s4)
+        assert (profile / "claude" / "projects" / "-work-api" / "s4.jsonl").read_text() == "late\n"
+
+    def test_interrupted_append_is_truncated(self, profile):
+        transcripts.compact("acme", transcripts.cutoff(30))
+        archive = profile / transcripts.ARCHIVE_DIR / "-work-web.jsonl.gz"
+        with open(archive, "ab") as f:
+            f.write(b"garbage from a crash")
+        _transcript(profile / "claude" / "projects" / "-work-web" / "s5.jsonl", "five\n", OLD)
+        transcripts.compact("acme", transcripts.cutoff(30))
+        (s5,) = transcripts.find("acme", "s5")
+        assert transcripts.extract("acme", s5).read_text() == "five\n"
+
+    def test_unreadable_index_leaves_archives_alone(self, profile):
+        transcripts.compact("acme", transcripts.cutoff(30))
+        archive = profile / transcripts.ARCHIVE_DIR / "-work-web.jsonl.gz"
+        size = archive.stat().st_size
+        (profile / transcripts.ARCHIVE_DIR / "index.json").write_text("{not json")
+        _transcript(profile / "claude" / "projects" / "-work-web" / "s5.jsonl", "five\n", OLD)
+        stats = transcripts.compact("acme", transcripts.cutoff(30))
+        assert stats.errors and "unreadable" in stats.errors[0]
+        assert archive.stat().st_size == size
+        assert (profile / "claude" / "projects" / "-work-web" / "s5.jsonl").exists()
+        with pytest.raises(ValueError):
+            transcripts.sessions("acme")
+
+    def test_archive_missing_from_index_is_not_truncated(self, profile):
+        transcripts.compact("acme", transcripts.cutoff(30))
+        archive = profile / transcripts.ARCHIVE_DIR / "-work-web.jsonl.gz"
+        size = archive.stat().st_size
+        (profile / transcripts.ARCHIVE_DIR / "index.json").unlink()
+        _transcript(profile / "claude" / "projects" / "-work-web" / "s5.jsonl", "five\n", OLD)
+        stats = transcripts.compact("acme", transcripts.cutoff(30))
+        assert stats.errors == ["-work-web.jsonl.gz is not in index.json; left untouched"]
+        assert archive.stat().st_size == size
+        assert (profile / "claude" / "projects" / "-work-web" / "s5.jsonl").exists()
+
+    def test_transcript_changed_after_reading_is_kept(self, profile, monkeypatch):
+        path = profile / "claude" / "projects" / "-work-web" / "s3.jsonl"
+        real_append = transcripts._append
+
+        def append_then_write(name, index, archive, *rest):
+            done = real_append(name, index, archive, *rest)
+            if archive.startswith("-work-web"):
+                with open(path, "a") as f:
+                    f.write('{"n": "late"}\n')  # a live session appends meanwhile
+            return done
+
+        monkeypatch.setattr(transcripts, "_append", append_then_write)
+        transcripts.compact("acme", transcripts.cutoff(30))
+        assert path.read_text() == '{"n": 3}\n{"n": "late"}\n'
+        assert not (profile / "claude" / "projects" / "-work-api" / "s1.jsonl").exists()
+
+    def test_cutoff_from_global_config(self, profile):
+        from xtp import config
+
+        config.GLOBAL_CONFIG.write_text("[claude_gc]\nolder_than_days = 1000\n")
+        assert transcripts.compact("acme", transcripts.cutoff(), dry_run=True).files == 0
+
+
+class TestExtract:
+    def test_restores_content_and_mtime(self, profile):
+        path = profile / "claude" / "projects" / "-work-api" / "s1.jsonl"
+        original = path.read_text()
+        mtime_ns = path.stat().st_mtime_ns
+        transcripts.compact("acme", transcripts.cutoff(30))
+
+        (session,) = transcripts.find("acme", "s1")
+        assert transcripts.extract("acme", session) == path
+        assert path.read_text() == original
+        assert path.stat().st_mtime_ns == mtime_ns
+        with pytest.raises(FileExistsError):
+            transcripts.extract("acme", session)
+
+    def test_recompacting_unchanged_restore_only_deletes(self, profile):
+        transcripts.compact("acme", transcripts.cutoff(30))
+        archive = profile / transcripts.ARCHIVE_DIR / "-work-api.jsonl.gz"
+        size = archive.stat().st_size
+        transcripts.extract("acme", transcripts.find("acme", "s1")[0])
+        transcripts.compact("acme", transcripts.cutoff(30))
+        assert archive.stat().st_size == size
+        assert not (profile / "claude" / "projects" / "-work-api" / "s1.jsonl").exists()
+
+    def test_find_by_path(self, profile):
+        transcripts.compact("acme", transcripts.cutoff(30))
+        assert len(transcripts.find("acme", "-work-api/s2/subagents/a.jsonl")) == 1
+        assert transcripts.find("acme", "nope") == []
+
+
+class TestCodec:
+    def test_existing_archive_keeps_its_codec(self, profile, monkeypatch):
+        transcripts.compact("acme", transcripts.cutoff(30))
+        fake = transcripts.Codec("fake", ".zst", bytes, bytes)
+        monkeypatch.setattr(transcripts, "default_codec", lambda: fake)
+        _transcript(profile / "claude" / "projects" / "-work-api" / "s6.jsonl", "six\n", OLD)
+        transcripts.compact("acme", transcripts.cutoff(30))
+        assert transcripts.find("acme", "s6")[0].archive == "-work-api.jsonl.gz"
+
+    def test_index_records_member_offsets(self, profile):
+        transcripts.compact("acme", transcripts.cutoff(30))
+        index = json.loads((profile / transcripts.ARCHIVE_DIR / "index.json").read_text())
+        api = [e for k, e in index["sessions"].items() if k.startswith("-work-api/")]
+        assert api[0]["offset"] == 0
+        assert api[1]["offset"] == api[0]["length"]
+        assert index["archives"]["-work-api.jsonl.gz"]["size"] == api[0]["length"] + api[1]["length"]
@@ -0,0 +1,118 @@
+"""Tests for xtp.trash."""
+
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from xtp import config, fileops, trash
+
+
+@pytest.fixture()
+def big_profile(fake_profile):
+    pdir = fake_profile("acme", {"name": "acme"})
+    for project in range(3):
+        sub = pdir / "claude" / "projects" / f"p{project}" / "s" / "subagents"
+        sub.mkdir(parents=True)
+        for i in range(5):
+            (sub / f"{i}.jsonl").write_text("x")
+    (pdir / "link").symlink_to(pdir / "claude")
+    return pdir
+
+
+class TestMove:
+    def test_move_hides_profile(self, big_profile):
+        assert config.list_profiles() == ["acme"]
+        entry = trash.move("acme")
+        assert not big_profile.exists()
+        assert config.list_profiles() == []
+        assert (entry.path / "profile.toml").is_file()
+        assert trash.entries() == [entry]
+
+    def test_move_and_restore_bump_generations(self, big_profile):
+        store = config.store_generation()
+        trash.move("acme")
+        assert config.store_generation() == store + 1
+        trash.restore("acme")
+        assert config.store_generation() == store + 2
+        assert config.generation("acme") == 1
+
+    def test_restore_latest(self, big_profile, fake_profile):
+        trash.move("acme")
+        fake_profile("acme", {"name": "second"})
+        second = trash.move("acme")
+        assert trash.restore("acme") == second
+        assert "second" in config.profile_toml("acme").read_text()
+        assert config.list_profiles() == ["acme"]
+
+    def test_restore_refuses_existing(self, big_profile, fake_profile):
+        trash.move("acme")
+        fake_profile("acme", {})
+        with pytest.raises(FileExistsError):
+            trash.restore("acme")
+        with pytest.raises(KeyError):
+            trash.restore("nope")
+
+    def test_dotted_names(self, fake_profile):
+        fake_profile("a.b", {})
+        trash.move("a.b")
+        assert [e.name for e in trash.entries()] == ["a.b"]
+
+
+class TestPurge:
+    def test_keeps_recent_entries(self, big_profile):
+        trash.move("acme")
+        assert trash.purge() == ([], [])
+        assert len(trash.entries()) == 1
+
+    def test_purges_expired(self, big_profile):
+        entry = trash.move("acme")
+        purged, errors = trash.purge(0)
+        assert (purged, errors) == ([entry], [])
+        assert trash.entries() == []
+        assert list((trash.trash_dir() / trash.PURGING_NAME).iterdir()) == []
+
+    def test_dry_run(self, big_profile):
+        entry = trash.move("acme")
+        assert trash.purge(0, dry_run=True) == ([entry], [])
+        assert entry.path.is_dir()
+
+    def test_keep_days_from_global_config(self, big_profile):
+        config.GLOBAL_CONFIG.write_text("[trash]\nkeep_days = 0\n")
+        trash.move("acme")
+        assert len(trash.purge()[0]) == 1
+
+    def test_finishes_interrupted_purge(self, big_profile):
+        entry = trash.move("acme")
+        purging = trash.trash_dir() / trash.PURGING_NAME
+        purging.mkdir()
+        dead = 2**22 + 12345  # beyond pid_max
+        os.rename(entry.path, purging / f"{entry.path.name}.{dead}")
+        assert trash.purge() == ([], [])
+        assert list(purging.iterdir()) == []
+
+    def test_leaves_live_purges_alone(self, big_profile):
+        entry = trash.move("acme")
+        purging = trash.trash_dir() / trash.PURGING_NAME
+        purging.mkdir()
+        target = purging / f"{entry.path.name}.1"  # pid 1 is always alive
+        os.rename(entry.path, target)
+        trash.purge()
+        assert target.is_dir()
+
+
+class TestRemoveTree:
+    def test_removes_everything(self, big_profile, tmp_path):
+        outside = tmp_path / "outside"
+        outside.mkdir()
+        (big_profile / "out").symlink_to(outside)
+        removed, errors = fileops.remove_tree(big_profile, jobs=4)
+        assert errors == []
+        assert removed == 3 * 5 + 3  # transcripts, profile.toml, two symlinks
+        assert not big_profile.exists()
+        assert outside.is_dir()  # symlinks are unlinked, not followed
+
+    def test_reports_errors(self, tmp_path):
+        removed, errors = fileops.remove_tree(tmp_path / "missing")
+        assert removed == 0 and len(errors) == 2
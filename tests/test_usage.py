@@ -0,0 +1,72 @@
+"""Tests for xtp.usage — the incremental disk usage index."""
+
+from __future__ import annotations
+
+import os
+
+from xtp import usage
+
+
+def _age_tree(root, seconds=10):
+    for path in [root, *root.rglob("*")]:
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns - seconds * 1_000_000_000))
+
+
+def _make_tree(root):
+    (root / "claude" / "projects" / "p1").mkdir(parents=True)
+    (root / "claude" / "skills").mkdir()
+    (root / "claude" / "projects" / "p1" / "a.jsonl").write_text("x" * 10)
+    (root / "claude" / "projects" / "p1" / "b.jsonl").write_text("y" * 5)
+    (root / "claude" / "skills" / "SKILL.md").write_text("s")
+    (root / "gh").mkdir()
+
+
+class TestScan:
+    def test_totals(self, tmp_path):
+        _make_tree(tmp_path)
+        totals = usage.scan(tmp_path)
+        assert totals["claude/projects"] == usage.Usage(2, 15)
+        assert totals["claude"] == usage.Usage(3, 16)
+        assert totals["gh"] == usage.Usage(0, 0)
+        assert totals[""].files == 3
+        assert (tmp_path / usage.INDEX_NAME).is_file()
+
+    def test_unchanged_dirs_not_listed(self, tmp_path, monkeypatch):
+        _make_tree(tmp_path)
+        _age_tree(tmp_path)
+        usage.scan(tmp_path)
+
+        listed = []
+        real_scandir = os.scandir
+
+        def spy(path):
+            listed.append(path)
+            return real_scandir(path)
+
+        monkeypatch.setattr(usage.os, "scandir", spy)
+        totals = usage.scan(tmp_path)
+        assert totals["claude"] == usage.Usage(3, 16)
+        assert not any("claude" in p for p in listed)
+
+    def test_new_file_picked_up(self, tmp_path):
+        _make_tree(tmp_path)
+        _age_tree(tmp_path)
+        usage.scan(tmp_path)
+        (tmp_path / "claude" / "projects" / "p1" / "c.jsonl").write_text("zz")
+        assert usage.scan(tmp_path)["claude/projects"] == usage.Usage(3, 17)
+
+    def test_rescan_ignores_index(self, tmp_path):
+        _make_tree(tmp_path)
+        _age_tree(tmp_path)
+        usage.scan(tmp_path)
+        target = tmp_path / "claude" / "projects" / "p1" / "a.jsonl"
+        st = target.stat()
+        target.write_text("x" * 20)  # in-place rewrite, dir mtime unchanged
+        os.utime(target.parent, ns=(st.st_atime_ns, target.parent.stat().st_mtime_ns))
+        assert usage.scan(tmp_path, rescan=True)["claude/projects"].bytes == 25
+
+    def test_index_file_not_counted(self, tmp_path):
+        (tmp_path / "f").write_text("1")
+        usage.scan(tmp_path)
+        assert usage.scan(tmp_path, rescan=True)[""] == usage.Usage(1, 1)